@@ -11,7 +11,7 @@ from raiden.blockchain.events import (
     get_all_netting_channel_events,
     get_all_channel_manager_events,
 )
-from raiden.transfer import views
+from raiden.transfer import node, views
 from raiden.transfer.events import (
     EventTransferSentSuccess,
     EventTransferSentFailed,
@@ -66,6 +66,23 @@ class RaidenAPI:
             if channel.identifier == channel_address:
                 return channel
 
+        # Settled channels are removed from the node state after the retention
+        # period and are only available from the archive
+        archived = self.raiden.wal.storage.get_archived_state(
+            node.DEADLINE_CHANNEL,
+            channel_address,
+        )
+        if archived is not None:
+            _, channel = archived
+
+            # The archive is shared by all the payment networks
+            payment_network = views.search_payment_network_by_token_network_id(
+                views.state_from_raiden(self.raiden),
+                channel.token_network_identifier,
+            )
+            if payment_network is not None and payment_network.address == registry_address:
+                return channel
+
         raise ChannelNotFound()
 
     def token_network_register(
@@ -393,20 +410,22 @@ class RaidenAPI:
 
                 self.raiden.handle_state_change(channel_close)
 
-            msg = 'After {} seconds the closing transactions were not properly processed.'.format(
-                poll_timeout,
-            )
+        # The close transactions are sent by the transaction manager, the
+        # locks are released so that it can operate on the channels
+        msg = 'After {} seconds the closing transactions were not properly processed.'.format(
+            poll_timeout,
+        )
 
-            channel_ids = [channel_state.identifier for channel_state in channels_to_close]
+        channel_ids = [channel_state.identifier for channel_state in channels_to_close]
 
-            with gevent.Timeout(poll_timeout, EthNodeCommunicationError(msg)):
-                waiting.wait_for_close(
-                    self.raiden,
-                    registry_address,
-                    token_address,
-                    channel_ids,
-                    self.raiden.alarm.wait_time,
-                )
+        with gevent.Timeout(poll_timeout, EthNodeCommunicationError(msg)):
+            waiting.wait_for_close(
+                self.raiden,
+                registry_address,
+                token_address,
+                channel_ids,
+                self.raiden.alarm.wait_time,
+            )
 
     def get_channel_list(self, registry_address, token_address=None, partner_address=None):
         """Returns a list of channels associated with the optionally given
@@ -561,6 +580,7 @@ class RaidenAPI:
             events=ALL_EVENTS,
             from_block=from_block,
             to_block=to_block,
+            log_cache=self.raiden.log_cache,
         )
 
     def get_channel_events(self, channel_address, from_block, to_block='latest'):
@@ -574,6 +594,7 @@ class RaidenAPI:
             events=ALL_EVENTS,
             from_block=from_block,
             to_block=to_block,
+            log_cache=self.raiden.log_cache,
         )
         raiden_events = self.raiden.wal.storage.get_events_by_block(
             from_block=from_block,
@@ -609,6 +630,7 @@ class RaidenAPI:
             events=ALL_EVENTS,
             from_block=from_block,
             to_block=to_block,
+            log_cache=self.raiden.log_cache,
         )
 
         raiden_events = self.raiden.wal.storage.get_events_by_block(
@@ -14,6 +14,14 @@ from raiden.settings import (
     DEFAULT_NAT_INVITATION_TIMEOUT,
     DEFAULT_NAT_KEEPALIVE_RETRIES,
     DEFAULT_NAT_KEEPALIVE_TIMEOUT,
+    DEFAULT_LOG_CONFIRMATION_BLOCKS,
+    DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE,
+    DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT,
+    DEFAULT_TRANSPORT_HEALTHCHECK_BATCH_WINDOW,
+    DEFAULT_TRANSPORT_HEALTHCHECK_SPACING,
+    DEFAULT_TRANSPORT_INGRESS_POLICY,
+    DEFAULT_TRANSPORT_INGRESS_QUEUE_SIZE,
+    DEFAULT_TRANSPORT_INGRESS_WORKERS,
     DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
     DEFAULT_TRANSPORT_THROTTLE_CAPACITY,
     DEFAULT_TRANSPORT_THROTTLE_FILL_RATE,
@@ -21,6 +29,12 @@ from raiden.settings import (
     DEFAULT_REVEAL_TIMEOUT,
     DEFAULT_SETTLE_TIMEOUT,
     DEFAULT_SHUTDOWN_TIMEOUT,
+    DEFAULT_STARTUP_SYNC_POOL_SIZE,
+    DEFAULT_STARTUP_SYNC_RETRIES,
+    DEFAULT_STARTUP_SYNC_RETRY_TIMEOUT,
+    DEFAULT_CONNECTION_MANAGER_POOL_SIZE,
+    DEFAULT_STATE_RETENTION_BLOCKS,
+    DEFAULT_STATE_SIZE_REPORT_BLOCKS,
     INITIAL_PORT,
 )
 from raiden.utils import (
@@ -59,11 +73,30 @@ class App:  # pylint: disable=too-few-public-methods
             'nat_invitation_timeout': DEFAULT_NAT_INVITATION_TIMEOUT,
             'nat_keepalive_retries': DEFAULT_NAT_KEEPALIVE_RETRIES,
             'nat_keepalive_timeout': DEFAULT_NAT_KEEPALIVE_TIMEOUT,
+            'delivered_batch_size': DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE,
+            'delivered_batch_timeout': DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT,
+            'ingress_queue_size': DEFAULT_TRANSPORT_INGRESS_QUEUE_SIZE,
+            'ingress_workers': DEFAULT_TRANSPORT_INGRESS_WORKERS,
+            'ingress_policy': DEFAULT_TRANSPORT_INGRESS_POLICY,
+            'healthcheck_spacing': DEFAULT_TRANSPORT_HEALTHCHECK_SPACING,
+            'healthcheck_batch_window': DEFAULT_TRANSPORT_HEALTHCHECK_BATCH_WINDOW,
         },
         'rpc': True,
         'console': False,
         'shutdown_timeout': DEFAULT_SHUTDOWN_TIMEOUT,
         'transport_type': 'udp',
+        'shard_state_by_token_network': False,
+        'state_retention_blocks': DEFAULT_STATE_RETENTION_BLOCKS,
+        'state_size_report_blocks': DEFAULT_STATE_SIZE_REPORT_BLOCKS,
+        'log_confirmation_blocks': DEFAULT_LOG_CONFIRMATION_BLOCKS,
+        'startup_sync': {
+            'pool_size': DEFAULT_STARTUP_SYNC_POOL_SIZE,
+            'retries': DEFAULT_STARTUP_SYNC_RETRIES,
+            'retry_timeout': DEFAULT_STARTUP_SYNC_RETRY_TIMEOUT,
+        },
+        'connection_manager': {
+            'pool_size': DEFAULT_CONNECTION_MANAGER_POOL_SIZE,
+        },
         'matrix': {
             'server': 'auto',
             'available_servers': [
@@ -24,14 +24,11 @@ from raiden.blockchain.abi import (
     EVENT_CHANNEL_SETTLED,
     EVENT_CHANNEL_SECRET_REVEALED,
 )
+from raiden.blockchain.log_cache import get_log_event_id
 from raiden.exceptions import AddressWithoutCode
 from raiden.utils import pex
 from raiden.network.rpc.smartcontract_proxy import decode_event
 
-EventListener = namedtuple(
-    'EventListener',
-    ('event_name', 'filter', 'abi', 'filter_creation_function'),
-)
 Proxies = namedtuple(
     'Proxies',
     ('registry', 'channel_managers', 'channelmanager_nettingchannels'),
@@ -43,6 +40,8 @@ Proxies2 = namedtuple(
 
 # `new_filter` uses None to signal the absence of topics filters
 ALL_EVENTS = None
+# Number of contracts queried by a single eth_getLogs request
+LOGS_ADDRESSES_PER_QUERY = 1000
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
@@ -52,17 +51,29 @@ def get_contract_events(
         contract_address,
         topics,
         from_block,
-        to_block):
+        to_block,
+        log_cache=None):
     """ Query the blockchain for all events of the smart contract at
     `contract_address` that match the filters `topics`, `from_block`, and
     `to_block`.
+
+    If `log_cache` is given the logs are read from it, and only the blocks
+    which are not cached are fetched from the blockchain.
     """
-    events = chain.client.get_filter_events(
-        contract_address,
-        topics=topics,
-        from_block=from_block,
-        to_block=to_block,
-    )
+    if log_cache is not None:
+        events = log_cache.get_logs(
+            contract_address,
+            topics,
+            from_block,
+            to_block,
+        )
+    else:
+        events = chain.client.get_filter_events(
+            contract_address,
+            topics=topics,
+            from_block=from_block,
+            to_block=to_block,
+        )
 
     result = []
     for event in events:
@@ -81,7 +92,8 @@ def get_all_channel_manager_events(
         channel_manager_address,
         events=ALL_EVENTS,
         from_block=0,
-        to_block='latest'):
+        to_block='latest',
+        log_cache=None):
     """ Helper to get all events of the ChannelManagerContract at
     `token_address`.
     """
@@ -93,6 +105,7 @@ def get_all_channel_manager_events(
         events,
         from_block,
         to_block,
+        log_cache,
     )
 
 
@@ -101,7 +114,8 @@ def get_all_registry_events(
         registry_address,
         events=ALL_EVENTS,
         from_block=0,
-        to_block='latest'):
+        to_block='latest',
+        log_cache=None):
     """ Helper to get all events of the Registry contract at
     `registry_address`.
     """
@@ -112,6 +126,7 @@ def get_all_registry_events(
         events,
         from_block,
         to_block,
+        log_cache,
     )
 
 
@@ -120,7 +135,8 @@ def get_all_netting_channel_events(
         netting_channel_address,
         events=ALL_EVENTS,
         from_block=0,
-        to_block='latest'):
+        to_block='latest',
+        log_cache=None):
     """ Helper to get all events of a NettingChannelContract at
     `channel_identifier`.
     """
@@ -132,6 +148,7 @@ def get_all_netting_channel_events(
         events,
         from_block,
         to_block,
+        log_cache,
     )
 
 
@@ -252,85 +269,198 @@ class Event:
         )
 
 
+class EventListener:
+    """ A contract watched by the log poller.
+
+    Args:
+        event_name: Description of the listener, used for logging.
+        address: Address of the contract.
+        topics: The event ids of the logs to process, None for all the logs.
+        abi: Used to decode the logs.
+        from_block: The next block for which the logs of the contract must
+            be fetched, None to start from the latest polled block.
+    """
+
+    __slots__ = (
+        'event_name',
+        'address',
+        'topics',
+        'abi',
+        'from_block',
+    )
+
+    def __init__(self, event_name, address, topics, abi, from_block):
+        self.event_name = event_name
+        self.address = address
+        self.topics = topics
+        self.abi = abi
+        self.from_block = from_block
+
+    def __repr__(self):
+        return '<EventListener {} from_block:{}>'.format(self.event_name, self.from_block)
+
+
 class BlockchainEvents:
-    """ Events polling. """
+    """ Events polling.
+
+    The logs of all the watched contracts are fetched with range queries of
+    eth_getLogs, instead of polling one filter per contract. Every listener
+    keeps the next block to fetch, the listeners which are up-to-date share
+    the same queries. The logs are only fetched up to `confirmation_blocks`
+    behind the latest block, so that they are not reverted by a reorg.
+
+    The fetched logs are saved in the `log_cache`, if it is set.
+    """
 
-    def __init__(self):
+    def __init__(self, client, confirmation_blocks=0):
+        self.client = client
+        self.confirmation_blocks = confirmation_blocks
         self.event_listeners = list()
+        self.log_cache = None
+
+        # Next block to fetch for the listeners added with from_block None
+        self.next_block = None
+
+    def get_confirmed_block_number(self, block_number):
+        return block_number - self.confirmation_blocks
 
-    def poll_blockchain_events(self):
+    def poll_blockchain_events(self, block_number):
+        """ Fetch the logs of all the listeners up to the confirmed block
+        for `block_number`, and yield the decoded events in the order they
+        were emitted.
+        """
+        to_block = self.get_confirmed_block_number(block_number)
+
+        fromblocks_to_listeners = defaultdict(list)
         for event_listener in self.event_listeners:
-            for log_event in event_listener.filter.get_new_entries():
-                decoded_event = dict(decode_event(
-                    event_listener.abi,
-                    log_event,
-                ))
-
-                if decoded_event is not None:
-                    decoded_event['block_number'] = log_event.get('blockNumber', 0)
-                    event = Event(
-                        to_canonical_address(log_event['address']),
-                        decoded_event,
-                    )
-                    yield decode_event_to_internal(event)
+            if event_listener.from_block is None:
+                if self.next_block is None:
+                    event_listener.from_block = max(to_block, 0)
+                else:
+                    event_listener.from_block = self.next_block
+
+            if event_listener.from_block <= to_block:
+                fromblocks_to_listeners[event_listener.from_block].append(event_listener)
+
+        log_events = list()
+        addresses_to_listeners = dict()
+        for from_block, event_listeners in fromblocks_to_listeners.items():
+            addresses = list()
+            for event_listener in event_listeners:
+                addresses_to_listeners[event_listener.address] = event_listener
+                addresses.append(event_listener.address)
+
+            for start in range(0, len(addresses), LOGS_ADDRESSES_PER_QUERY):
+                query_addresses = addresses[start:start + LOGS_ADDRESSES_PER_QUERY]
+                query_logs = self.client.get_logs(query_addresses, from_block, to_block)
+
+                if self.log_cache is not None:
+                    self.log_cache.add_logs(query_addresses, from_block, to_block, query_logs)
+
+                log_events.extend(query_logs)
+
+        log_events.sort(key=lambda log_event: (
+            log_event.get('blockNumber', 0),
+            log_event.get('logIndex', 0),
+        ))
+
+        for log_event in log_events:
+            contract_address = to_canonical_address(log_event['address'])
+            event_listener = addresses_to_listeners[contract_address]
+
+            topics = event_listener.topics
+            if topics is not None:
+                if get_log_event_id(log_event) not in topics:
+                    continue
+
+            decoded_event = dict(decode_event(
+                event_listener.abi,
+                log_event,
+            ))
+
+            if decoded_event is not None:
+                decoded_event['block_number'] = log_event.get('blockNumber', 0)
+                event = Event(
+                    contract_address,
+                    decoded_event,
+                )
+                yield decode_event_to_internal(event)
+
+        for event_listeners in fromblocks_to_listeners.values():
+            for event_listener in event_listeners:
+                event_listener.from_block = to_block + 1
+
+        # The listeners added while the events were processed start from the
+        # first block of this poll, so that the logs emitted in the same
+        # block as the event that created them are not lost
+        if fromblocks_to_listeners:
+            poll_from_block = min(fromblocks_to_listeners)
+
+            for event_listener in self.event_listeners:
+                if event_listener.from_block is None:
+                    event_listener.from_block = poll_from_block
+
+        if self.next_block is None or self.next_block <= to_block:
+            self.next_block = to_block + 1
 
     def uninstall_all_event_listeners(self):
-        for listener in self.event_listeners:
-            listener.filter.web3.eth.uninstallFilter(listener.filter.filter_id)
-
         self.event_listeners = list()
 
-    def add_event_listener(self, event_name, eth_filter, abi, filter_creation_function):
+    def add_event_listener(self, event_name, address, topics, abi, from_block):
+        if topics is not None:
+            topics = {topic.lower() for topic in topics}
+
         event = EventListener(
             event_name,
-            eth_filter,
+            address,
+            topics,
             abi,
-            filter_creation_function,
+            from_block,
         )
         self.event_listeners.append(event)
 
     def add_registry_listener(self, registry_proxy, from_block=None):
-        tokenadded = registry_proxy.tokenadded_filter(from_block)
         registry_address = registry_proxy.address
 
         self.add_event_listener(
             'Registry {}'.format(pex(registry_address)),
-            tokenadded,
+            registry_address,
+            [CONTRACT_MANAGER.get_event_id(EVENT_TOKEN_ADDED)],
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_REGISTRY),
-            registry_proxy.tokenadded_filter,
+            from_block,
         )
 
     def add_channel_manager_listener(self, channel_manager_proxy, from_block=None):
-        channelnew = channel_manager_proxy.channelnew_filter(from_block)
         manager_address = channel_manager_proxy.address
 
         self.add_event_listener(
             'ChannelManager {}'.format(pex(manager_address)),
-            channelnew,
+            manager_address,
+            [CONTRACT_MANAGER.get_event_id(EVENT_CHANNEL_NEW)],
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_CHANNEL_MANAGER),
-            channel_manager_proxy.channelnew_filter,
+            from_block,
         )
 
     def add_token_network_listener(self, token_network_proxy, from_block=None):
-        channel_new_filter = token_network_proxy.channelnew_filter(from_block=from_block)
         token_network_address = token_network_proxy.address
 
         self.add_event_listener(
             'TokenNetwork {}'.format(pex(token_network_address)),
-            channel_new_filter,
+            token_network_address,
+            [CONTRACT_MANAGER.get_event_id(EVENT_CHANNEL_NEW2)],
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_TOKEN_NETWORK),
-            token_network_proxy.channelnew_filter,
+            from_block,
         )
 
     def add_netting_channel_listener(self, netting_channel_proxy, from_block=None):
-        netting_channel_events = netting_channel_proxy.all_events_filter(from_block)
         channel_address = netting_channel_proxy.address
 
         self.add_event_listener(
             'NettingChannel Event {}'.format(pex(channel_address)),
-            netting_channel_events,
+            channel_address,
+            None,
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_NETTING_CHANNEL),
-            netting_channel_proxy.all_events_filter,
+            from_block,
         )
 
     def add_proxies_listeners(self, proxies, from_block=None):
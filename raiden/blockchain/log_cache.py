@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import structlog
+from eth_utils import encode_hex, to_canonical_address
+
+from raiden.utils import pex, typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+def get_log_event_id(log_event: typing.Dict) -> typing.Optional[str]:
+    """ Return the first topic of the log, which identifies the event. """
+    if not log_event['topics']:
+        return None
+
+    topic = log_event['topics'][0]
+    if isinstance(topic, str):
+        return topic.lower()
+
+    return encode_hex(topic)
+
+
+def get_topics_event_ids(topics: typing.Optional[typing.List]) -> typing.Optional[typing.List]:
+    """ Return the event ids of a `topics` filter, None for all the events. """
+    if not topics or topics[0] is None:
+        return None
+
+    event_ids = topics[0]
+    if isinstance(event_ids, str):
+        event_ids = [event_ids]
+
+    return [event_id.lower() for event_id in event_ids]
+
+
+class LogCache:
+    """ Local cache of the logs of the contracts.
+
+    The logs fetched by the event poller are saved in the storage, together
+    with the range of blocks fetched for each contract. Queries for the logs
+    of a contract are answered from the storage, and only the blocks which are
+    not cached are fetched from the ethereum node.
+
+    Only the logs which are `confirmation_blocks` behind the latest block are
+    cached, the newer blocks may still be reorganized.
+    """
+
+    def __init__(self, client, storage, confirmation_blocks: int):
+        self.client = client
+        self.storage = storage
+        self.confirmation_blocks = confirmation_blocks
+
+    def add_logs(
+            self,
+            contract_addresses: typing.List[typing.Address],
+            from_block: typing.BlockNumber,
+            to_block: typing.BlockNumber,
+            log_events: typing.List[typing.Dict],
+    ):
+        """ Save all the `log_events` of `contract_addresses` in the range
+        `from_block` to `to_block`, inclusive.
+        """
+        logs = [
+            (
+                to_canonical_address(log_event['address']),
+                log_event['blockNumber'],
+                log_event['logIndex'],
+                get_log_event_id(log_event),
+                # Convert the AttributeDict and copy the topics, which are
+                # changed in place by the decoding
+                dict(log_event, topics=list(log_event['topics'])),
+            )
+            for log_event in log_events
+        ]
+        self.storage.write_blockchain_logs(contract_addresses, from_block, to_block, logs)
+
+    def fetch(self, contract_address: typing.Address, from_block, to_block):
+        log_events = self.client.get_logs([contract_address], from_block, to_block)
+        self.add_logs([contract_address], from_block, to_block, log_events)
+
+    def get_logs(
+            self,
+            contract_address: typing.Address,
+            topics: typing.Optional[typing.List],
+            from_block: typing.BlockSpecification,
+            to_block: typing.BlockSpecification,
+    ) -> typing.List[typing.Dict]:
+        """ Return the logs of `contract_address` which match `topics`, from
+        the cache when possible.
+        """
+        latest_block = self.client.block_number()
+
+        if from_block == 'earliest':
+            from_block = 0
+        if to_block == 'latest':
+            to_block = latest_block
+
+        if not isinstance(from_block, int) or not isinstance(to_block, int):
+            return self.client.get_filter_events(
+                contract_address,
+                topics=topics,
+                from_block=from_block,
+                to_block=to_block,
+            )
+
+        confirmed_block = min(to_block, latest_block - self.confirmation_blocks)
+
+        if from_block <= confirmed_block:
+            cached_range = self.storage.get_blockchain_logs_range(contract_address)
+
+            # The missing blocks are fetched so that the cached range stays
+            # contiguous
+            if cached_range is None:
+                self.fetch(contract_address, from_block, confirmed_block)
+            else:
+                cached_from, cached_to = cached_range
+
+                if from_block < cached_from:
+                    self.fetch(contract_address, from_block, cached_from - 1)
+
+                if confirmed_block > cached_to:
+                    self.fetch(contract_address, cached_to + 1, confirmed_block)
+
+            log.debug(
+                'Reading logs from the cache',
+                contract=pex(contract_address),
+                from_block=from_block,
+                to_block=confirmed_block,
+            )
+
+        event_ids = get_topics_event_ids(topics)
+        result = self.storage.get_blockchain_logs(
+            contract_address,
+            from_block,
+            confirmed_block,
+            event_ids,
+        )
+
+        if to_block > confirmed_block:
+            unconfirmed_from_block = max(from_block, confirmed_block + 1)
+            result.extend(
+                log_event
+                for log_event in self.client.get_logs(
+                    [contract_address],
+                    unconfirmed_from_block,
+                    to_block,
+                )
+                if event_ids is None or get_log_event_id(log_event) in event_ids
+            )
+
+        return result
@@ -17,7 +17,15 @@ def get_channel_state(
         reveal_timeout,
         netting_channel_proxy,
 ):
-    channel_details = netting_channel_proxy.detail()
+    # The calls share a batch request
+    with netting_channel_proxy.client.batch() as batch:
+        channel_details = batch.spawn(netting_channel_proxy.detail)
+        opened_block_number = batch.spawn(netting_channel_proxy.opened)
+        closed_block_number = batch.spawn(netting_channel_proxy.closed)
+
+    channel_details = channel_details.get()
+    opened_block_number = opened_block_number.get()
+    closed_block_number = closed_block_number.get()
 
     our_state = NettingChannelEndState(
         channel_details['our_address'],
@@ -32,9 +40,6 @@ def get_channel_state(
     reveal_timeout = reveal_timeout
     settle_timeout = channel_details['settle_timeout']
 
-    opened_block_number = netting_channel_proxy.opened()
-    closed_block_number = netting_channel_proxy.closed()
-
     # ignore bad open block numbers
     if opened_block_number <= 0:
         return None
@@ -78,13 +83,25 @@ def get_channel_state(
     return channel
 
 
+def make_token_network_state(manager_address, token_address, edge_list, partner_channels):
+    graph = make_graph(edge_list)
+    network_graph = TokenNetworkGraphState(graph)
+
+    network = TokenNetworkState(
+        manager_address,
+        token_address,
+        network_graph,
+        partner_channels,
+    )
+
+    return network
+
+
 def get_token_network_state_from_proxies(raiden, manager_proxy, netting_channel_proxies):
     manager_address = manager_proxy.address
     token_address = manager_proxy.token_address()
 
     edge_list = manager_proxy.channels_addresses()
-    graph = make_graph(edge_list)
-    network_graph = TokenNetworkGraphState(graph)
 
     partner_channels = list()
     for channel_proxy in netting_channel_proxies:
@@ -96,15 +113,13 @@ def get_token_network_state_from_proxies(raiden, manager_proxy, netting_channel_
         )
         partner_channels.append(channel_state)
 
-    network = TokenNetworkState(
+    return make_token_network_state(
         manager_address,
         token_address,
-        network_graph,
+        edge_list,
         partner_channels,
     )
 
-    return network
-
 
 def create_new_token_network_state(raiden, token_network_proxy):
     token_network_address = token_network_proxy.address
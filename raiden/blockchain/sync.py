@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+import gevent
+from gevent.pool import Pool
+import structlog
+
+from raiden.blockchain.events import Proxies
+from raiden.blockchain.state import get_channel_state, make_token_network_state
+from raiden.exceptions import AddressWithoutCode, EthNodeCommunicationError
+from raiden.utils import pex, typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# Failures of the connection with the ethereum node, other errors are not
+# transient and are not retried
+RETRYABLE_ERRORS = (EthNodeCommunicationError, IOError)
+
+
+class StartupSync:
+    """ Fetches the on-chain state of a payment network at startup.
+
+    The proxies and the details of the channel managers and netting channels
+    are fetched concurrently by at most `pool_size` greenlets, the requests
+    issued together share JSON-RPC batches. A failed fetch is retried alone,
+    up to `retries` times. The results are assembled in the order of the
+    sequential `get_relevant_proxies` and
+    `get_token_network_state_from_proxies`, so the resulting state is the
+    same.
+    """
+
+    def __init__(
+            self,
+            chain,
+            node_address: typing.Address,
+            reveal_timeout: int,
+            pool_size: int,
+            retries: int,
+            retry_timeout: float,
+    ):
+        self.chain = chain
+        self.node_address = node_address
+        self.reveal_timeout = reveal_timeout
+        self.pool = Pool(pool_size)
+        self.retries = retries
+        self.retry_timeout = retry_timeout
+
+    def map(self, stage: str, function: typing.Callable, items: typing.List) -> typing.List:
+        """ Returns the result of `function` for every item, in order. """
+        total = len(items)
+        progress = {'done': 0}
+        report_interval = max(total // 10, 1)
+
+        def fetch(item):
+            for attempt in range(self.retries + 1):
+                try:
+                    result = function(item)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.retries:
+                        raise
+
+                    log.warning(
+                        'Startup sync fetch failed, retrying',
+                        node=pex(self.node_address),
+                        stage=stage,
+                        attempt=attempt + 1,
+                        error=str(e),
+                    )
+                    gevent.sleep(self.retry_timeout)
+                else:
+                    break
+
+            progress['done'] += 1
+            if progress['done'] % report_interval == 0 or progress['done'] == total:
+                log.info(
+                    'Startup sync progress',
+                    node=pex(self.node_address),
+                    stage=stage,
+                    done=progress['done'],
+                    total=total,
+                )
+
+            return result
+
+        return self.pool.map(fetch, items)
+
+    def get_netting_channel(self, channel_identifier: typing.Address):
+        # FIXME: implement proper cleanup of self-killed channel after close+settle
+        try:
+            return self.chain.netting_channel(channel_identifier)
+        except AddressWithoutCode:
+            log.debug(
+                'Settled channel found when starting raiden. Safely ignored',
+                channel_identifier=pex(channel_identifier),
+            )
+            return None
+
+    def get_relevant_proxies(self, registry_address: typing.Address) -> Proxies:
+        registry = self.chain.registry(registry_address)
+
+        channel_managers = self.map(
+            'channel managers',
+            registry.manager,
+            registry.manager_addresses(),
+        )
+        managers_participating_channels = self.map(
+            'participating channels',
+            lambda manager: manager.channels_by_participant(self.node_address),
+            channel_managers,
+        )
+
+        channel_identifiers = [
+            channel_identifier
+            for participating_channels in managers_participating_channels
+            for channel_identifier in participating_channels
+        ]
+        channel_proxies = iter(self.map(
+            'netting channels',
+            self.get_netting_channel,
+            channel_identifiers,
+        ))
+
+        manager_channels = defaultdict(list)
+        for channel_manager, participating_channels in zip(
+                channel_managers,
+                managers_participating_channels,
+        ):
+            netting_channel_proxies = list()
+            for _ in participating_channels:
+                channel_proxy = next(channel_proxies)
+
+                if channel_proxy is not None:
+                    netting_channel_proxies.append(channel_proxy)
+
+            manager_channels[channel_manager.address] = netting_channel_proxies
+
+        return Proxies(
+            registry,
+            channel_managers,
+            manager_channels,
+        )
+
+    def get_token_network_states(self, proxies: Proxies) -> typing.List:
+        channel_managers = proxies.channel_managers
+
+        managers_details = self.map(
+            'channel manager details',
+            lambda manager: (manager.token_address(), manager.channels_addresses()),
+            channel_managers,
+        )
+
+        channels_arguments = [
+            (token_address, channel_manager.address, channel_proxy)
+            for channel_manager, (token_address, _) in zip(channel_managers, managers_details)
+            for channel_proxy in proxies.channelmanager_nettingchannels[channel_manager.address]
+        ]
+        channel_states = iter(self.map(
+            'channel states',
+            lambda arguments: get_channel_state(
+                arguments[0],
+                arguments[1],
+                self.reveal_timeout,
+                arguments[2],
+            ),
+            channels_arguments,
+        ))
+
+        token_network_list = list()
+        for channel_manager, (token_address, edge_list) in zip(channel_managers, managers_details):
+            manager_address = channel_manager.address
+            netting_channel_proxies = proxies.channelmanager_nettingchannels[manager_address]
+            partner_channels = [next(channel_states) for _ in netting_channel_proxies]
+
+            network = make_token_network_state(
+                manager_address,
+                token_address,
+                edge_list,
+                partner_channels,
+            )
+            token_network_list.append(network)
+
+        return token_network_list
@@ -144,7 +144,9 @@ def handle_channel_new(raiden, event, current_block_number):
             participant1,
             participant2,
         )
-        raiden.handle_state_change(new_route, current_block_number)
+        # Routes are only used for path finding, during the startup sync there
+        # are many of them and they are dispatched in batches
+        raiden.defer_state_change(new_route, current_block_number)
 
 
 def handle_channel_new_balance(raiden, event, current_block_number):
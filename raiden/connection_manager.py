@@ -4,6 +4,7 @@ from binascii import unhexlify
 import gevent
 from gevent.lock import Semaphore
 from gevent.event import AsyncResult
+from gevent.pool import Pool
 
 import structlog
 
@@ -64,6 +65,8 @@ class ConnectionManager:
         self.funds = 0
         self.initial_channel_target = 0
         self.joinable_funds_target = 0
+        # Funds of the deposits which are not mined yet
+        self.pending_deposits = 0
 
         self.raiden = raiden
         self.registry_address = registry_address
@@ -72,6 +75,10 @@ class ConnectionManager:
         self.lock = Semaphore()  #: protects self.funds and self.initial_channel_target
         self.api = RaidenAPI(raiden)
 
+        # Limits the number of channels opened and funded concurrently, the
+        # transactions of a batch can then be mined in the same blocks
+        self.pool = Pool(raiden.config['connection_manager']['pool_size'])
+
     def connect(
             self,
             funds: int,
@@ -199,18 +206,24 @@ class ConnectionManager:
             if joining_funds <= 0 or self._leaving_state:
                 return
 
-            self.api.set_total_channel_deposit(
-                registry_address,
-                self.token_address,
-                partner_address,
-                joining_funds,
-            )
-            log.debug(
-                'joined a channel!',
-                funds=joining_funds,
-                me=pex(self.raiden.address),
-                partner=pex(partner_address),
+            # The lock is not held while the deposit is mined, the funds are
+            # reserved so that concurrent joins don't exceed them
+            self.pending_deposits += joining_funds
+
+        try:
+            self.pool.apply(
+                self.api.set_total_channel_deposit,
+                (registry_address, self.token_address, partner_address, joining_funds),
             )
+        finally:
+            self.pending_deposits -= joining_funds
+
+        log.debug(
+            'joined a channel!',
+            funds=joining_funds,
+            me=pex(self.raiden.address),
+            partner=pex(partner_address),
+        )
 
     def retry_connect(self, registry_address):
         """Will be called when new channels in the token network are detected.
@@ -278,29 +291,36 @@ class ConnectionManager:
         if qty_channels_to_open <= 0:
             return
 
-        for partner in self.find_new_partners(qty_channels_to_open):
-            try:
-                self.api.channel_open(
-                    registry_address,
-                    self.token_address,
-                    partner,
-                )
-            except DuplicatedChannelError:
-                # This can fail because of a race condition, where the channel
-                # partner opens first.
-                log.info('partner opened channel first')
+        funding = self._initial_funding_per_partner
+        greenlets = [
+            self.pool.spawn(self._open_and_deposit, registry_address, partner, funding)
+            for partner in self.find_new_partners(qty_channels_to_open)
+        ]
+        gevent.joinall(greenlets, raise_error=True)
 
-            try:
-                self.api.set_total_channel_deposit(
-                    registry_address,
-                    self.token_address,
-                    partner,
-                    self._initial_funding_per_partner,
-                )
-            except AddressWithoutCode:
-                log.warn('connection manager: channel closed just after it was created')
-            except TransactionThrew:
-                log.exception('connection manager: deposit failed')
+    def _open_and_deposit(self, registry_address, partner, funding: int):
+        try:
+            self.api.channel_open(
+                registry_address,
+                self.token_address,
+                partner,
+            )
+        except DuplicatedChannelError:
+            # This can fail because of a race condition, where the channel
+            # partner opens first.
+            log.info('partner opened channel first')
+
+        try:
+            self.api.set_total_channel_deposit(
+                registry_address,
+                self.token_address,
+                partner,
+                funding,
+            )
+        except AddressWithoutCode:
+            log.warn('connection manager: channel closed just after it was created')
+        except TransactionThrew:
+            log.exception('connection manager: deposit failed')
 
     @property
     def _initial_funding_per_partner(self) -> int:
@@ -332,7 +352,7 @@ class ConnectionManager:
                 self.token_address,
             )
 
-            remaining = self.funds - sum_deposits
+            remaining = self.funds - sum_deposits - self.pending_deposits
             return remaining
 
         return 0
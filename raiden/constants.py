@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+UINT16_MAX = 2 ** 16 - 1
+
 UINT64_MAX = 2 ** 64 - 1
 UINT64_MIN = 0
 
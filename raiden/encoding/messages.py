@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import structlog
 
-from raiden.constants import UINT64_MAX, UINT256_MAX
+from raiden.constants import UINT16_MAX, UINT64_MAX, UINT256_MAX
 from raiden.encoding.encoders import integer, optional_bytes
 from raiden.encoding.format import (
     buffer_for,
@@ -35,6 +35,8 @@ LOCKEDTRANSFER = 7
 REFUNDTRANSFER = 8
 REVEALSECRET = 11
 DELIVERED = 12
+DELIVEREDBATCH = 13
+BUNDLE = 14
 
 
 # pylint: disable=invalid-name
@@ -50,6 +52,9 @@ delivered_message_identifier = make_field(
     '8s',
     integer(0, UINT64_MAX),
 )
+delivered_count = make_field('delivered_count', 2, '2s', integer(0, UINT16_MAX))
+message_count = make_field('message_count', 2, '2s', integer(0, UINT16_MAX))
+message_length = make_field('message_length', 2, '2s', integer(0, UINT16_MAX))
 expiration = make_field('expiration', 32, '32s', integer(0, UINT256_MAX))
 
 token_network_address = make_field('token_network_address', 20, '20s')
@@ -93,6 +98,36 @@ Delivered = namedbuffer(
     ],
 )
 
+# The DeliveredBatch message has a variable length, this header is followed by
+# `delivered_count` 8 bytes message identifiers and the 65 bytes signature.
+DeliveredBatchHeader = namedbuffer(
+    'delivered_batch_header',
+    [
+        cmdid(DELIVEREDBATCH),
+        pad(1),
+        delivered_count,
+    ],
+)
+
+# The Bundle message has a variable length, this header is followed by
+# `message_count` entries, each entry is a BundleEntryHeader followed by
+# `message_length` bytes of an encoded message.
+BundleHeader = namedbuffer(
+    'bundle_header',
+    [
+        cmdid(BUNDLE),
+        pad(1),
+        message_count,
+    ],
+)
+
+BundleEntryHeader = namedbuffer(
+    'bundle_entry_header',
+    [
+        message_length,
+    ],
+)
+
 Ping = namedbuffer(
     'ping',
     [
@@ -39,7 +39,9 @@ from raiden.transfer.mediated_transfer.events import (
 )
 
 __all__ = (
+    'Bundle',
     'Delivered',
+    'DeliveredBatch',
     'DirectTransfer',
     'Lock',
     'LockedTransfer',
@@ -252,9 +254,14 @@ class EnvelopeMessage(SignedMessage):
         self.locksroot = EMPTY_MERKLE_ROOT
         self.channel = b''
         self.token_network_address = b''
+        # Set by decode, the fields of a received message are not modified
+        self._message_hash = None
 
     @property
     def message_hash(self):
+        if self._message_hash is not None:
+            return self._message_hash
+
         packed = self.packed()
         klass = type(packed)
 
@@ -347,6 +354,7 @@ class EnvelopeMessage(SignedMessage):
 
         message = cls.unpack(packed)  # pylint: disable=no-member
         message.sender = address
+        message._message_hash = message_hash  # pylint: disable=protected-access
         return message
 
 
@@ -452,6 +460,232 @@ class Delivered(SignedMessage):
         return delivered
 
 
+class DeliveredBatch(SignedMessage):
+    """ Message used to inform the partner node that a group of messages was
+    received *and* persisted.
+
+    This is equivalent to a `Delivered` for each of the identifiers, but
+    requires a single signature and a single packet.
+    """
+    cmdid = messages.DELIVEREDBATCH
+
+    def __init__(self, delivered_message_identifiers):
+        super().__init__()
+        self.delivered_message_identifiers = list(delivered_message_identifiers)
+
+        identifier_encoder = messages.delivered_message_identifier.encoder
+        for message_identifier in self.delivered_message_identifiers:
+            identifier_encoder.validate(message_identifier)
+
+        messages.delivered_count.encoder.validate(len(self.delivered_message_identifiers))
+
+    @staticmethod
+    def max_identifiers_for(max_message_size):
+        """ Returns how many identifiers fit in a message of `max_message_size` bytes. """
+        fixed_size = messages.DeliveredBatchHeader.size + messages.signature.size_bytes
+        return (max_message_size - fixed_size) // messages.delivered_message_identifier.size_bytes
+
+    @property
+    def hash(self):
+        return sha3(self.encode())
+
+    def _data_to_sign(self):
+        klass = messages.DeliveredBatchHeader
+        header = klass(buffer_for(klass))
+        header.cmdid = self.cmdid
+        header.delivered_count = len(self.delivered_message_identifiers)
+
+        field = messages.delivered_message_identifier
+        identifiers = b''.join(
+            field.encoder.encode(message_identifier, field.size_bytes)
+            for message_identifier in self.delivered_message_identifiers
+        )
+
+        return bytes(header.data) + identifiers
+
+    def encode(self):
+        signature_size = messages.signature.size_bytes
+        signature = self.signature.rjust(signature_size, b'\x00')
+        return self._data_to_sign() + signature
+
+    def sign(self, private_key, node_address):
+        """ Sign message using `private_key`. """
+        self.signature = signing.sign(self._data_to_sign(), private_key)
+        self.sender = node_address
+
+    @classmethod
+    def decode(cls, data):
+        klass = messages.DeliveredBatchHeader
+        header_size = klass.size
+        signature_size = messages.signature.size_bytes
+        field = messages.delivered_message_identifier
+
+        if len(data) < header_size + signature_size:
+            log.error('trying to decode invalid message')
+            return None
+
+        header = klass(bytearray(data[:header_size]))
+        count = header.delivered_count
+
+        if len(data) != header_size + count * field.size_bytes + signature_size:
+            log.error('trying to decode invalid message')
+            return None
+
+        data_that_was_signed = data[:-signature_size]
+        message_signature = data[-signature_size:]
+
+        address = signing.recover_address(data_that_was_signed, message_signature)
+
+        if address is None:
+            return None
+
+        identifiers_end = header_size + count * field.size_bytes
+        delivered_message_identifiers = [
+            field.encoder.decode(data[start:start + field.size_bytes])
+            for start in range(header_size, identifiers_end, field.size_bytes)
+        ]
+
+        delivered_batch = cls(delivered_message_identifiers)
+        delivered_batch.signature = bytes(message_signature)
+        delivered_batch.sender = address
+        return delivered_batch
+
+    def __repr__(self):
+        return '<{} [delivered_msgids:{}]>'.format(
+            self.__class__.__name__,
+            self.delivered_message_identifiers,
+        )
+
+    def to_dict(self):
+        return {
+            'type': self.__class__.__name__,
+            'delivered_message_identifiers': self.delivered_message_identifiers,
+            'signature': data_encoder(self.signature),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        assert data['type'] == cls.__name__
+        delivered_batch = cls(
+            delivered_message_identifiers=data['delivered_message_identifiers'],
+        )
+        delivered_batch.signature = data_decoder(data['signature'])
+        return delivered_batch
+
+
+class Bundle(Message):
+    """ Container used by the transport to send multiple messages for the same
+    recipient in a single packet.
+
+    The bundle itself is not signed, each of the messages is signed and must
+    be decoded and validated individually. Bundles cannot be nested.
+    """
+    cmdid = messages.BUNDLE
+
+    def __init__(self, messages_data):
+        super().__init__()
+        self.messages_data = [bytes(message_data) for message_data in messages_data]
+
+        length_encoder = messages.message_length.encoder
+        for message_data in self.messages_data:
+            length_encoder.validate(len(message_data))
+
+        messages.message_count.encoder.validate(len(self.messages_data))
+
+    @staticmethod
+    def size_for(messages_data):
+        """ Returns the size of the encoded bundle containing `messages_data`. """
+        entry_header_size = messages.BundleEntryHeader.size
+        return messages.BundleHeader.size + sum(
+            entry_header_size + len(message_data)
+            for message_data in messages_data
+        )
+
+    @property
+    def hash(self):
+        return sha3(self.encode())
+
+    def encode(self):
+        klass = messages.BundleHeader
+        header = klass(buffer_for(klass))
+        header.cmdid = self.cmdid
+        header.message_count = len(self.messages_data)
+
+        data = [bytes(header.data)]
+
+        entry_klass = messages.BundleEntryHeader
+        for message_data in self.messages_data:
+            entry_header = entry_klass(buffer_for(entry_klass))
+            entry_header.message_length = len(message_data)
+
+            data.append(bytes(entry_header.data))
+            data.append(message_data)
+
+        return b''.join(data)
+
+    @classmethod
+    def decode(cls, data):
+        klass = messages.BundleHeader
+        entry_klass = messages.BundleEntryHeader
+
+        if len(data) < klass.size:
+            log.error('trying to decode invalid message')
+            return None
+
+        header = klass(bytearray(data[:klass.size]))
+
+        messages_data = list()
+        start = klass.size
+        for _ in range(header.message_count):
+            entry_end = start + entry_klass.size
+            if entry_end > len(data):
+                log.error('trying to decode invalid message')
+                return None
+
+            entry_header = entry_klass(bytearray(data[start:entry_end]))
+            message_end = entry_end + entry_header.message_length
+
+            # empty entries, truncated entries and nested bundles are invalid
+            message_data = bytes(data[entry_end:message_end])
+            if not message_data or message_end > len(data) or message_data[0] == cls.cmdid:
+                log.error('trying to decode invalid message')
+                return None
+
+            messages_data.append(message_data)
+            start = message_end
+
+        if start != len(data):
+            log.error('trying to decode invalid message')
+            return None
+
+        return cls(messages_data)
+
+    def __repr__(self):
+        return '<{} [messages:{}]>'.format(
+            self.__class__.__name__,
+            len(self.messages_data),
+        )
+
+    def to_dict(self):
+        return {
+            'type': self.__class__.__name__,
+            'messages_data': [
+                data_encoder(message_data)
+                for message_data in self.messages_data
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        assert data['type'] == cls.__name__
+        return cls(
+            messages_data=[
+                data_decoder(message_data)
+                for message_data in data['messages_data']
+            ],
+        )
+
+
 class Pong(SignedMessage):
     """ Response to a Ping message. """
     cmdid = messages.PONG
@@ -980,6 +1214,7 @@ class Lock:
         self.expiration = expiration
         self.secrethash = secrethash
         self._asbytes = None
+        self._lockhash = None
 
     @property
     def as_bytes(self):
@@ -996,17 +1231,23 @@ class Lock:
 
     @property
     def lockhash(self):
-        return sha3(self.as_bytes)
+        if self._lockhash is None:
+            self._lockhash = sha3(self.as_bytes)
+
+        return self._lockhash
 
     @classmethod
     def from_bytes(cls, serialized):
         packed = messages.Lock(serialized)
 
-        return cls(
+        lock = cls(
             amount=packed.amount,
             expiration=packed.expiration,
             secrethash=packed.secrethash,
         )
+        lock._asbytes = bytes(serialized)  # pylint: disable=protected-access
+
+        return lock
 
     @classmethod
     def from_state(cls, state):
@@ -1016,6 +1257,10 @@ class Lock:
             secrethash=state.secrethash,
         )
 
+        # the state already has the encoding and its hash
+        lock._asbytes = state.encoded  # pylint: disable=protected-access
+        lock._lockhash = state.lockhash  # pylint: disable=protected-access
+
         return lock
 
     def __eq__(self, other):
@@ -1455,7 +1700,9 @@ class RefundTransfer(LockedTransfer):
 
 
 CMDID_TO_CLASS = {
+    messages.BUNDLE: Bundle,
     messages.DELIVERED: Delivered,
+    messages.DELIVEREDBATCH: DeliveredBatch,
     messages.DIRECTTRANSFER: DirectTransfer,
     messages.LOCKEDTRANSFER: LockedTransfer,
     messages.PING: Ping,
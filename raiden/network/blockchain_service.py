@@ -95,7 +95,7 @@ class BlockChainService:
         return delta / interval
 
     def get_block_header(self, block_number: int):
-        return self.client.web3.getBlock(block_number, False)
+        return self.client.get_block(block_number)
 
     def next_block(self) -> int:
         target_block_number = self.block_number() + 1
@@ -31,6 +31,7 @@ from raiden.exceptions import (
 from raiden.messages import (
     decode as message_from_bytes,
     Delivered,
+    DeliveredBatch,
     from_dict as message_from_dict,
     Ping,
     SignedMessage,
@@ -40,11 +41,19 @@ from raiden.messages import (
 from raiden.network.transport.udp import udp_utils
 from raiden.network.utils import get_http_rtt
 from raiden.raiden_service import RaidenService
+from raiden.settings import (
+    DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE,
+    DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT,
+)
 from raiden.transfer import events as transfer_events
 from raiden.transfer.architecture import Event
 from raiden.transfer.mediated_transfer import events as mediated_transfer_events
 from raiden.transfer.state import NODE_NETWORK_REACHABLE, NODE_NETWORK_UNREACHABLE
-from raiden.transfer.state_change import ActionChangeNodeNetworkState, ReceiveDelivered
+from raiden.transfer.state_change import (
+    ActionChangeNodeNetworkState,
+    ReceiveDelivered,
+    ReceiveDeliveredBatch,
+)
 from raiden.udp_message_handler import on_udp_message
 from raiden.utils import (
     data_decoder,
@@ -94,6 +103,19 @@ class MatrixTransport:
         self._login_retry_wait = config.get('login_retry_wait', 0.5)
         self._logout_timeout = config.get('logout_timeout', 10)
 
+        # Delivered messages for the same sender are coalesced into a single
+        # DeliveredBatch, as done by the UDP transport
+        self._delivered_batch_size = config.get(
+            'delivered_batch_size',
+            DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE,
+        )
+        self._delivered_batch_timeout = config.get(
+            'delivered_batch_timeout',
+            DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT,
+        )
+        self._senders_to_pending_delivered: Dict[typing.Address, List[int]] = dict()
+        self._senders_to_delivered_flushes: Dict[typing.Address, gevent.Greenlet] = dict()
+
         self._bound_logger = None
         self._running = False
 
@@ -182,7 +204,7 @@ class MatrixTransport:
             raise ValueError('Invalid address {}'.format(pex(receiver_address)))
 
         # These are not protocol messages, but transport specific messages
-        if isinstance(message, (Delivered, Ping, Pong)):
+        if isinstance(message, (Delivered, DeliveredBatch, Ping, Pong)):
             raise ValueError(
                 'Do not use send_async for {} messages'.format(message.__class__.__name__),
             )
@@ -201,6 +223,11 @@ class MatrixTransport:
 
     def stop_and_wait(self):
         if self._running:
+            # Acknowledge the messages that were already processed, this also
+            # cancels the pending flushes
+            for sender in list(self._senders_to_pending_delivered.keys()):
+                self._send_delivered(sender)
+
             self._running = False
             self._client.set_presence_state(UserPresence.OFFLINE.value)
             self._client.stop_listener_thread()
@@ -412,6 +439,8 @@ class MatrixTransport:
 
         if isinstance(message, Delivered):
             self._receive_delivered(message)
+        elif isinstance(message, DeliveredBatch):
+            self._receive_delivered_batch(message)
         elif isinstance(message, Ping):
             self.log.warning(
                 'Not required Ping received',
@@ -431,8 +460,21 @@ class MatrixTransport:
             ReceiveDelivered(delivered.delivered_message_identifier),
         )
 
+        self._set_delivered(delivered.sender, delivered.delivered_message_identifier)
+
+    def _receive_delivered_batch(self, delivered_batch: DeliveredBatch):
+        message_identifiers = delivered_batch.delivered_message_identifiers
+
+        self._raiden_service.handle_state_change(
+            ReceiveDeliveredBatch(message_identifiers),
+        )
+
+        for message_identifier in message_identifiers:
+            self._set_delivered(delivered_batch.sender, message_identifier)
+
+    def _set_delivered(self, sender: typing.Address, message_identifier: int):
         async_result = self._messageids_to_asyncresult.pop(
-            delivered.delivered_message_identifier,
+            message_identifier,
             None,
         )
 
@@ -441,15 +483,15 @@ class MatrixTransport:
             self.log.debug(
                 'DELIVERED MESSAGE RECEIVED',
                 node=pex(self._raiden_service.address),
-                receiver=pex(delivered.sender),
-                message_identifier=delivered.delivered_message_identifier,
+                receiver=pex(sender),
+                message_identifier=message_identifier,
             )
 
         else:
             self.log.debug(
                 'DELIVERED MESSAGE UNKNOWN',
                 node=pex(self._raiden_service.address),
-                message_identifier=delivered.delivered_message_identifier,
+                message_identifier=message_identifier,
             )
 
     def _receive_message(self, message):
@@ -467,18 +509,55 @@ class MatrixTransport:
                 #       which means that message order is important which isn't guaranteed between
                 #       federated servers.
                 #       See: https://matrix.org/docs/spec/client_server/r0.3.0.html#id57
-                delivered_message = Delivered(message.message_identifier)
-                self._raiden_service.sign(delivered_message)
-                self._send_immediate(message.sender, json.dumps(delivered_message.to_dict()))
+                self._enqueue_delivered(message.sender, message.message_identifier)
 
         except (InvalidAddress, UnknownAddress, UnknownTokenAddress):
             self.log.warn('Exception while processing message', exc_info=True)
             return
+
+    def _enqueue_delivered(self, sender: typing.Address, message_identifier: int):
+        pending = self._senders_to_pending_delivered.get(sender)
+
+        if pending is None:
+            pending = list()
+            self._senders_to_pending_delivered[sender] = pending
+
+            if self._delivered_batch_timeout:
+                self._senders_to_delivered_flushes[sender] = gevent.spawn_later(
+                    self._delivered_batch_timeout,
+                    self._send_delivered,
+                    sender,
+                )
+
+        pending.append(message_identifier)
+
+        batch_is_full = len(pending) >= self._delivered_batch_size
+        if batch_is_full or not self._delivered_batch_timeout:
+            self._send_delivered(sender)
+
+    def _send_delivered(self, sender: typing.Address):
+        pending = self._senders_to_pending_delivered.pop(sender, None)
+
+        flush = self._senders_to_delivered_flushes.pop(sender, None)
+        if flush is not None and flush is not gevent.getcurrent():
+            flush.kill(block=False)
+
+        if not pending:
+            return
+
+        if len(pending) == 1:
+            delivered_message = Delivered(pending[0])
+        else:
+            delivered_message = DeliveredBatch(pending)
+
+        self._raiden_service.sign(delivered_message)
+        self._send_immediate(sender, json.dumps(delivered_message.to_dict()))
+
         self.log.debug(
             'DELIVERED',
             node=pex(self._raiden_service.address),
-            to=pex(message.sender),
-            message_identifier=message.message_identifier,
+            to=pex(sender),
+            message_identifiers=pending,
         )
 
     def _send_queued_messages(
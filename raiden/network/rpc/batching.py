@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import itertools
+from json.decoder import JSONDecodeError
+
+import gevent
+from gevent.event import AsyncResult
+import structlog
+from web3.utils.encoding import FriendlyJsonSerde
+from web3.utils.request import make_post_request
+
+from raiden.exceptions import EthNodeCommunicationError, RaidenShuttingDown
+from raiden.utils import typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# Methods without side effects, the order in which these are executed by the
+# node does not matter
+BATCHABLE_METHODS = frozenset((
+    'eth_blockNumber',
+    'eth_call',
+    'eth_gasPrice',
+    'eth_getBalance',
+    'eth_getBlockByHash',
+    'eth_getBlockByNumber',
+    'eth_getCode',
+    'eth_getStorageAt',
+    'eth_getTransactionByHash',
+    'eth_getTransactionCount',
+    'eth_getTransactionReceipt',
+))
+
+
+class RequestBatcher:
+    """ Sends the JSON-RPC requests issued by different greenlets within
+    `window` seconds as a single batch request.
+
+    A window of zero sends the requests issued during the same event loop
+    iteration together, without delaying them. Each batch has at most
+    `max_size` requests.
+    """
+
+    def __init__(self, provider, window: float, max_size: int):
+        if max_size <= 0:
+            raise ValueError('max_size must be a positive integer')
+
+        self.provider = provider
+        self.window = window
+        self.max_size = max_size
+
+        self.request_counter = itertools.count()
+        self.pending: typing.List[typing.Tuple[typing.Dict, AsyncResult]] = list()
+        self.flusher = None
+
+    def request(self, method: str, params: typing.List) -> typing.Dict:
+        """ Queues the request and blocks until its response is available. """
+        rpc_request = {
+            'jsonrpc': '2.0',
+            'method': method,
+            'params': params or [],
+            'id': next(self.request_counter),
+        }
+        async_result = AsyncResult()
+        self.pending.append((rpc_request, async_result))
+
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.flusher is None:
+            # The greenlet is only executed once the current one yields,
+            # allowing the other greenlets which are ready to run to queue
+            # their requests
+            if self.window:
+                self.flusher = gevent.spawn_later(self.window, self.flush)
+            else:
+                self.flusher = gevent.spawn(self.flush)
+
+        return async_result.get()
+
+    def flush(self):
+        """ Sends the pending requests. """
+        pending, self.pending = self.pending, list()
+        self.flusher = None
+
+        if not pending:
+            return
+
+        if len(pending) == 1:
+            rpc_request, async_result = pending[0]
+            try:
+                response = self.provider.make_request(
+                    rpc_request['method'],
+                    rpc_request['params'],
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                async_result.set_exception(e)
+            else:
+                async_result.set(response)
+            return
+
+        try:
+            responses = self.send_batch([rpc_request for rpc_request, _ in pending])
+        except Exception as e:  # pylint: disable=broad-except
+            for _, async_result in pending:
+                async_result.set_exception(e)
+            return
+
+        for rpc_request, async_result in pending:
+            response = responses.get(rpc_request['id'])
+
+            if response is None:
+                async_result.set_exception(EthNodeCommunicationError(
+                    'Batch response is missing the request {}'.format(rpc_request['id']),
+                ))
+            else:
+                async_result.set(response)
+
+    def send_batch(self, rpc_requests: typing.List[typing.Dict]) -> typing.Dict:
+        """ Sends `rpc_requests` in a single HTTP request and returns the
+        responses by request id.
+        """
+        log.debug('Sending batch request', size=len(rpc_requests))
+
+        serde = FriendlyJsonSerde()
+        try:
+            raw_response = make_post_request(
+                self.provider.endpoint_uri,
+                serde.json_encode(rpc_requests).encode(),
+                **self.provider.get_request_kwargs(),
+            )
+            responses = serde.json_decode(raw_response.decode())
+        except (IOError, JSONDecodeError) as e:
+            raise EthNodeCommunicationError('Batch request failed: {}'.format(e))
+
+        # A node without support for batches answers with a single error
+        if not isinstance(responses, list):
+            raise EthNodeCommunicationError('Invalid batch response {}'.format(responses))
+
+        return {
+            response.get('id'): response
+            for response in responses
+        }
+
+
+def make_batching_middleware(client, batcher: RequestBatcher):
+    def batching_middleware(make_request, web3):  # pylint: disable=unused-argument
+        """ Creates middleware that batches the read-only requests. """
+
+        def middleware(method, params):
+            if method not in BATCHABLE_METHODS:
+                return make_request(method, params)
+
+            # raise exception when shutting down
+            if client.stop_event and client.stop_event.is_set():
+                raise RaidenShuttingDown()
+
+            return batcher.request(method, params)
+
+        return middleware
+    return batching_middleware
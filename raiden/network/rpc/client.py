@@ -4,6 +4,7 @@ import time
 import os
 import copy
 from binascii import unhexlify
+from contextlib import contextmanager
 from typing import List, Dict
 from json.decoder import JSONDecodeError
 
@@ -11,15 +12,14 @@ from web3 import Web3, HTTPProvider
 from web3.middleware import geth_poa_middleware
 from web3.utils.filters import Filter
 from eth_utils import (
-    to_int,
     to_checksum_address,
     to_canonical_address,
     remove_0x_prefix,
     to_normalized_address,
 )
 import gevent
-import cachetools
 from gevent.lock import Semaphore
+from gevent.pool import Group
 import structlog
 
 from raiden.utils import typing
@@ -28,7 +28,14 @@ from raiden.exceptions import (
     EthNodeCommunicationError,
     RaidenShuttingDown,
 )
-from raiden.settings import GAS_PRICE, GAS_LIMIT, RPC_CACHE_TTL
+from raiden.settings import (
+    DEFAULT_RPC_BATCH_MAX_SIZE,
+    DEFAULT_RPC_BATCH_WINDOW,
+    DEFAULT_RPC_HEAD_MAX_AGE,
+    DEFAULT_RPC_POLL_INTERVAL,
+    GAS_PRICE,
+    GAS_LIMIT,
+)
 from raiden.utils import (
     data_encoder,
     privatekey_to_address,
@@ -36,7 +43,10 @@ from raiden.utils import (
     encode_hex,
 )
 from raiden.utils.typing import Address
+from raiden.network.rpc.batching import RequestBatcher, make_batching_middleware
+from raiden.network.rpc.head_tracker import HeadTracker
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
+from raiden.network.rpc.transactions import TransactionWatcher
 from raiden.utils.solc import (
     solidity_unresolved_symbols,
     solidity_library_symbol,
@@ -77,6 +87,24 @@ def make_connection_test_middleware(client):
     return connection_test_middleware
 
 
+def inject_rpc_middlewares(client, web3, batch_window: float, batch_max_size: int):
+    """ Add the batching and the connection test middlewares to `web3`.
+
+    The batched requests are sent directly to the endpoint and must not pay
+    for the connection test. The layer 0 is the innermost layer, the batching
+    middleware is injected first so that the connection test ends up inside of
+    it, and only the requests which are not batched go through the test.
+    """
+    provider = web3.providers[0]
+    if isinstance(provider, HTTPProvider):
+        batcher = RequestBatcher(provider, batch_window, batch_max_size)
+        batching = make_batching_middleware(client, batcher)
+        web3.middleware_stack.inject(batching, layer=0)
+
+    connection_test = make_connection_test_middleware(client)
+    web3.middleware_stack.inject(connection_test, layer=0)
+
+
 def check_address_has_code(
         client: 'JSONRPCClient',
         address: Address,
@@ -182,6 +210,11 @@ class JSONRPCClient:
         nonce_update_interval: Update the account nonce every
             `nonce_update_interval` seconds.
         nonce_offset: Network's default base nonce number.
+        batch_window: Read-only requests issued within `batch_window` seconds
+            are sent in a single batch request.
+        batch_max_size: Maximum number of requests in a batch request.
+        head_max_age: The latest block number published by the AlarmTask is
+            used for at most `head_max_age` seconds.
     """
 
     def __init__(
@@ -193,6 +226,9 @@ class JSONRPCClient:
             nonce_update_interval: float = 5.0,
             nonce_offset: int = 0,
             web3: Web3 = None,
+            batch_window: float = DEFAULT_RPC_BATCH_WINDOW,
+            batch_max_size: int = DEFAULT_RPC_BATCH_MAX_SIZE,
+            head_max_age: float = DEFAULT_RPC_HEAD_MAX_AGE,
     ):
 
         if privkey is None or len(privkey) != 32:
@@ -213,19 +249,8 @@ class JSONRPCClient:
         self.nonce_update_interval = nonce_update_interval
         self.nonce_offset = nonce_offset
         self.given_gas_price = gasprice
-
-        cache = cachetools.TTLCache(
-            maxsize=1,
-            ttl=RPC_CACHE_TTL,
-        )
-        cache_wrapper = cachetools.cached(cache=cache)
-        self.gaslimit = cache_wrapper(self._gaslimit)
-        cache = cachetools.TTLCache(
-            maxsize=1,
-            ttl=RPC_CACHE_TTL,
-        )
-        cache_wrapper = cachetools.cached(cache=cache)
-        self.gasprice = cache_wrapper(self._gasprice)
+        # Called with the hash of each transaction sent by the greenlet
+        self.greenlets_to_sent_callbacks = dict()
 
         # web3
         if web3 is None:
@@ -241,17 +266,41 @@ class JSONRPCClient:
             # scoped web3 instance is used for all clients
             pass
 
-        # create the connection test middleware (but only for non-tester chain)
+        # create the batching and connection test middlewares (but only for
+        # non-tester chain)
         if not hasattr(web3, 'testing'):
-            connection_test = make_connection_test_middleware(self)
-            self.web3.middleware_stack.inject(connection_test, layer=0)
+            inject_rpc_middlewares(self, self.web3, batch_window, batch_max_size)
+
+        self.head = HeadTracker(self.web3, head_max_age)
+        self.transaction_watcher = TransactionWatcher(self, DEFAULT_RPC_POLL_INTERVAL)
 
     def __repr__(self):
         return '<JSONRPCClient @%d>' % self.port
 
+    @contextmanager
+    def batch(self):
+        """ Context to issue calls concurrently, which allows the read-only
+        requests to share a batch request.
+
+        The calls are spawned with the returned group, e.g.
+        `detail = batch.spawn(proxy.detail)`, and the context exits once all
+        are done. The results are read with `detail.get()`, the first failure
+        is re-raised on exit.
+        """
+        group = Group()
+        yield group
+        group.join(raise_error=True)
+
     def block_number(self):
         """ Return the most recent block. """
-        return self.web3.eth.blockNumber
+        return self.head.block_number()
+
+    def get_block(self, block_number: typing.BlockNumber):
+        """ Return the header of the block `block_number`. """
+        return self.head.get_cached(
+            ('block', block_number),
+            lambda: self.web3.eth.getBlock(block_number, False),
+        )
 
     def nonce_needs_update(self):
         if self.nonce_available_value is None:
@@ -288,11 +337,30 @@ class JSONRPCClient:
 
     def nonce(self):
         with self.nonce_lock:
-            if self.nonce_needs_update():
-                self.nonce_update_from_node()
+            return self._next_nonce()
+
+    def _next_nonce(self):
+        """ Allocate a nonce, the nonce lock must be held. """
+        if self.nonce_needs_update():
+            self.nonce_update_from_node()
+
+        self.nonce_available_value += 1
+        return self.nonce_available_value - 1
+
+    @contextmanager
+    def observe_transactions(self, callback):
+        """ Context to call `callback` with the hash of each transaction
+        sent by the current greenlet, as soon as the node accepted it.
 
-            self.nonce_available_value += 1
-            return self.nonce_available_value - 1
+        The callers which send the transactions through the proxies use it to
+        know whether a call which failed had already broadcast a transaction.
+        """
+        greenlet = gevent.getcurrent()
+        self.greenlets_to_sent_callbacks[greenlet] = callback
+        try:
+            yield
+        finally:
+            del self.greenlets_to_sent_callbacks[greenlet]
 
     def inject_stop_event(self, event):
         self.stop_event = event
@@ -305,12 +373,21 @@ class JSONRPCClient:
         gas_limit = self.web3.eth.getBlock(location)['gasLimit']
         return gas_limit * 8 // 10
 
+    def gaslimit(self, location='latest') -> int:
+        if location != 'latest':
+            return self._gaslimit(location)
+
+        return self.head.get_cached('gaslimit', self._gaslimit)
+
     def _gasprice(self) -> int:
         if self.given_gas_price:
             return self.given_gas_price
 
         return self.web3.eth.gasPrice
 
+    def gasprice(self) -> int:
+        return self.head.get_cached('gasprice', self._gasprice)
+
     def check_startgas(self, startgas):
         if not startgas:
             return self.gaslimit()
@@ -479,7 +556,6 @@ class JSONRPCClient:
             warnings.warn('For contract creation the empty string must be used.')
 
         transaction = dict(
-            nonce=self.nonce(),
             gasPrice=self.gasprice(),
             gas=self.check_startgas(startgas),
             value=value,
@@ -490,9 +566,23 @@ class JSONRPCClient:
         if to != b'':
             transaction['to'] = to_checksum_address(to)
 
-        signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
+        # Concurrent transactions are sent in the order of their nonces, and
+        # the nonce of a transaction which could not be sent is reused,
+        # otherwise the gap would hold the later transactions in the pool
+        with self.nonce_lock:
+            transaction['nonce'] = self._next_nonce()
+            signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
+
+            try:
+                result = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+            except Exception:
+                self.nonce_available_value -= 1
+                raise
+
+        callback = self.greenlets_to_sent_callbacks.get(gevent.getcurrent())
+        if callback is not None:
+            callback(bytes(result))
 
-        result = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
         encoded_result = encode_hex(result)
         return remove_0x_prefix(encoded_result)
 
@@ -523,56 +613,7 @@ class JSONRPCClient:
             )
 
         transaction_hash = data_encoder(transaction_hash)
-
-        deadline = None
-        if timeout:
-            deadline = gevent.Timeout(timeout)
-            deadline.start()
-
-        try:
-            # used to check if the transaction was removed, this could happen
-            # if gas price is too low:
-            #
-            # > Transaction (acbca3d6) below gas price (tx=1 Wei ask=18
-            # > Shannon). All sequential txs from this address(7d0eae79)
-            # > will be ignored
-            #
-            last_result = None
-
-            while True:
-                # Could return None for a short period of time, until the
-                # transaction is added to the pool
-                transaction = self.web3.eth.getTransaction(transaction_hash)
-
-                # if the transaction was added to the pool and then removed
-                if transaction is None and last_result is not None:
-                    raise Exception('invalid transaction, check gas price')
-
-                # the transaction was added to the pool and mined
-                if transaction and transaction['blockNumber'] is not None:
-                    break
-
-                last_result = transaction
-
-                gevent.sleep(.5)
-
-            if confirmations:
-                # this will wait for both APPLIED and REVERTED transactions
-                transaction_block = to_int(hexstr=transaction['blockNumber'])
-                confirmation_block = transaction_block + confirmations
-
-                block_number = self.block_number()
-
-                while block_number < confirmation_block:
-                    gevent.sleep(.5)
-                    block_number = self.block_number()
-
-        except gevent.Timeout:
-            raise Exception('timeout when polling for transaction')
-
-        finally:
-            if deadline:
-                deadline.cancel()
+        self.transaction_watcher.wait(transaction_hash, confirmations, timeout)
 
     def new_filter(
             self,
@@ -606,3 +647,24 @@ class JSONRPCClient:
             })
         except BlockNotFound:
             return []
+
+    def get_logs(
+            self,
+            contract_addresses: List[Address],
+            from_block: typing.BlockSpecification,
+            to_block: typing.BlockSpecification,
+    ) -> List[Dict]:
+        """ Get the logs of all the contracts in `contract_addresses` with a
+        single query.
+        """
+        try:
+            return self.web3.eth.getLogs({
+                'fromBlock': from_block,
+                'toBlock': to_block,
+                'address': [
+                    to_normalized_address(contract_address)
+                    for contract_address in contract_addresses
+                ],
+            })
+        except BlockNotFound:
+            return []
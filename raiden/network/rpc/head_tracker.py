@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import time
+
+import structlog
+
+from raiden.utils import typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+class HeadTracker:
+    """ The latest block of the chain, shared by all the users of a client.
+
+    The AlarmTask calls `update` once per poll, which fetches the latest
+    block number. While the head is fresh, i.e. it was updated less than
+    `max_age` seconds ago, `block_number` returns it without a request.
+    Otherwise, e.g. before the AlarmTask is started, the block number is
+    fetched from the node.
+
+    The values which depend on the latest block, like the block headers and
+    the gas parameters, are cached with `get_cached` until the next block.
+    """
+
+    def __init__(self, web3, max_age: float, time_function=time.monotonic):
+        self.web3 = web3
+        self.max_age = max_age
+        self.time = time_function
+
+        self.head_number = None
+        self.head_time = None
+
+        # Values computed for the block `cache_number`
+        self.cache_number = None
+        self.cache = dict()
+
+    def update(self) -> typing.BlockNumber:
+        """ Fetch the latest block number and publish it to the users of the
+        client.
+        """
+        block_number = self.web3.eth.blockNumber
+
+        self.head_number = block_number
+        self.head_time = self.time()
+
+        return block_number
+
+    def is_fresh(self) -> bool:
+        return (
+            self.head_time is not None and
+            self.time() - self.head_time <= self.max_age
+        )
+
+    def block_number(self) -> typing.BlockNumber:
+        if self.is_fresh():
+            return self.head_number
+
+        return self.web3.eth.blockNumber
+
+    def get_cached(self, key, fetch: typing.Callable):
+        """ Return the value `fetch()` for the latest block, the value is
+        fetched once per block.
+        """
+        block_number = self.block_number()
+
+        if block_number != self.cache_number:
+            self.cache_number = block_number
+            self.cache = dict()
+
+        if key not in self.cache:
+            self.cache[key] = fetch()
+
+        return self.cache[key]
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
-from typing import Dict, List
+import functools
+import itertools
+from typing import Callable, Dict, List
 
+from eth_abi import decode_abi, decode_single
 from eth_utils import (
     to_canonical_address,
     decode_hex,
@@ -8,8 +11,19 @@ from eth_utils import (
     event_abi_to_log_topic,
 )
 from web3.utils.contracts import encode_transaction_data, find_matching_fn_abi
-from web3.utils.abi import get_abi_input_types, filter_by_type
-from web3.utils.events import get_event_data
+from web3.utils.abi import (
+    exclude_indexed_event_inputs,
+    filter_by_type,
+    get_abi_input_names,
+    get_abi_input_types,
+    get_indexed_event_inputs,
+    map_abi_data,
+    normalize_event_input_types,
+)
+from web3.utils.datastructures import AttributeDict
+from web3.utils.encoding import hexstr_if_str, to_bytes
+from web3.utils.events import get_event_abi_types_for_decoding
+from web3.utils.normalizers import BASE_RETURN_NORMALIZERS
 from web3.contract import Contract
 try:
     from eth_tester.exceptions import TransactionFailed
@@ -17,20 +31,141 @@ except ModuleNotFoundError:
     TransactionFailed = Exception()
 
 
+# The same addresses appear in many logs, e.g. the registry and the
+# participants of the channels, and the checksum requires a keccak
+cached_checksum_address = functools.lru_cache(maxsize=4096)(to_checksum_address)
+
+
+def make_return_normalizer(types: List[str]) -> Callable:
+    """ Returns a function which normalizes the decoded values of `types`
+    like `map_abi_data(BASE_RETURN_NORMALIZERS, types, values)`, without
+    walking the types for every call.
+    """
+    normalizers = list()
+    for type_str in types:
+        if type_str == 'address':
+            normalizers.append(cached_checksum_address)
+        elif type_str == 'string' or '[' in type_str or '(' in type_str:
+            # Not used by the raiden events, use the generic normalization
+            return lambda values: map_abi_data(BASE_RETURN_NORMALIZERS, types, values)
+        else:
+            normalizers.append(None)
+
+    def normalize(values):
+        return [
+            value if normalizer is None else normalizer(value)
+            for normalizer, value in zip(normalizers, values)
+        ]
+
+    return normalize
+
+
+class EventDecoder:
+    """ Decodes the logs of a single event, returns the same data as
+    `web3.utils.events.get_event_data`.
+
+    The types and names of the arguments are extracted from the ABI once,
+    instead of for every log.
+    """
+
+    def __init__(self, event_abi: Dict):
+        self.name = event_abi['name']
+        self.anonymous = event_abi['anonymous']
+
+        topics_abi = get_indexed_event_inputs(event_abi)
+        self.topic_types = get_event_abi_types_for_decoding(
+            normalize_event_input_types(topics_abi),
+        )
+        self.topic_names = get_abi_input_names({'inputs': topics_abi})
+        self.normalize_topics = make_return_normalizer(self.topic_types)
+
+        data_abi = exclude_indexed_event_inputs(event_abi)
+        self.data_types = get_event_abi_types_for_decoding(
+            normalize_event_input_types(data_abi),
+        )
+        self.data_names = get_abi_input_names({'inputs': data_abi})
+        self.normalize_data = make_return_normalizer(self.data_types)
+
+        duplicate_names = set(self.topic_names).intersection(self.data_names)
+        if duplicate_names:
+            raise ValueError(
+                'Invalid Event ABI:  The following argument names are duplicated '
+                "between event inputs: '{0}'".format(', '.join(duplicate_names)),
+            )
+
+    def decode(self, log: Dict) -> AttributeDict:
+        if self.anonymous:
+            log_topics = log['topics']
+        else:
+            log_topics = log['topics'][1:]
+
+        if len(log_topics) != len(self.topic_types):
+            raise ValueError('Expected {0} log topics.  Got {1}'.format(
+                len(self.topic_types),
+                len(log_topics),
+            ))
+
+        log_data = hexstr_if_str(to_bytes, log['data'])
+        decoded_data = self.normalize_data(decode_abi(self.data_types, log_data))
+        decoded_topics = self.normalize_topics([
+            decode_single(topic_type, topic_data)
+            for topic_type, topic_data in zip(self.topic_types, log_topics)
+        ])
+
+        event_args = dict(itertools.chain(
+            zip(self.topic_names, decoded_topics),
+            zip(self.data_names, decoded_data),
+        ))
+
+        return AttributeDict.recursive({
+            'args': event_args,
+            'event': self.name,
+            'logIndex': log['logIndex'],
+            'transactionIndex': log['transactionIndex'],
+            'transactionHash': log['transactionHash'],
+            'address': log['address'],
+            'blockHash': log['blockHash'],
+            'blockNumber': log['blockNumber'],
+        })
+
+
+class ContractEventsDecoder:
+    """ Decodes the logs of all the events of a contract ABI. """
+
+    def __init__(self, abi: List[Dict]):
+        self.topics_to_decoders = {
+            event_abi_to_log_topic(event_abi): EventDecoder(event_abi)
+            for event_abi in filter_by_type('event', abi)
+        }
+
+    def decode(self, log: Dict) -> AttributeDict:
+        if isinstance(log['topics'][0], str):
+            log['topics'][0] = decode_hex(log['topics'][0])
+        elif isinstance(log['topics'][0], int):
+            log['topics'][0] = decode_hex(hex(log['topics'][0]))
+        event_id = log['topics'][0]
+
+        return self.topics_to_decoders[event_id].decode(log)
+
+
+# The ABIs are lists, which are not hashable. The decoders are cached by the
+# identity of the ABI and keep a reference to it, so that the id is not reused
+ABIS_TO_DECODERS: Dict[int, tuple] = dict()
+
+
+def get_events_decoder(abi: List[Dict]) -> ContractEventsDecoder:
+    entry = ABIS_TO_DECODERS.get(id(abi))
+
+    if entry is None or entry[0] is not abi:
+        entry = (abi, ContractEventsDecoder(abi))
+        ABIS_TO_DECODERS[id(abi)] = entry
+
+    return entry[1]
+
+
 def decode_event(abi: Dict, log: Dict):
     """Helper function to unpack event data using a provided ABI"""
-    if isinstance(log['topics'][0], str):
-        log['topics'][0] = decode_hex(log['topics'][0])
-    elif isinstance(log['topics'][0], int):
-        log['topics'][0] = decode_hex(hex(log['topics'][0]))
-    event_id = log['topics'][0]
-    events = filter_by_type('event', abi)
-    topic_to_event_abi = {
-        event_abi_to_log_topic(event_abi): event_abi
-        for event_abi in events
-    }
-    event_abi = topic_to_event_abi[event_id]
-    return get_event_data(event_abi, log)
+    return get_events_decoder(abi).decode(log)
 
 
 class ContractProxy:
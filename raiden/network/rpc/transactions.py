@@ -1,4 +1,20 @@
 # -*- coding: utf-8 -*-
+import gevent
+from gevent.event import AsyncResult
+from gevent.pool import Group
+from eth_utils import to_int
+from requests.exceptions import RequestException
+import structlog
+
+from raiden.exceptions import EthNodeCommunicationError, RaidenShuttingDown
+from raiden.utils import typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# The errors of a request which may succeed if it is sent again
+TRANSIENT_ERRORS = (EthNodeCommunicationError, RequestException)
+
+
 def check_transaction_threw(client, transaction_hash):
     """Check if the transaction threw/reverted or if it executed properly
        Returns None in case of success and the transaction receipt if the
@@ -15,3 +31,165 @@ def check_transaction_threw(client, transaction_hash):
         return receipt
 
     return None
+
+
+class PendingTransaction:
+    """ A transaction waited for by `TransactionWatcher.wait`. """
+
+    __slots__ = (
+        'transaction_hash',
+        'confirmations',
+        'result',
+        'seen',
+        'mined_block',
+        'checked_block',
+    )
+
+    def __init__(self, transaction_hash: str, confirmations: int):
+        self.transaction_hash = transaction_hash
+        self.confirmations = confirmations
+        self.result = AsyncResult()
+
+        # Set once the transaction was added to the pool
+        self.seen = False
+        self.mined_block = None
+        self.checked_block = None
+
+
+class TransactionWatcher:
+    """ Waits for the transactions sent by a client to be mined.
+
+    A single greenlet checks all the pending transactions, it runs while
+    there are transactions to wait for. The transactions are checked once
+    per block, the requests for all of them are issued concurrently and share
+    a JSON-RPC batch, so the load on the node does not depend on the number
+    of pending transactions.
+
+    A request which fails because the node is not reachable is sent again on
+    the next interval. All the waiters fail on shutdown, otherwise a waiter
+    fails only with an error of its own transaction.
+    """
+
+    def __init__(self, client, interval: float):
+        self.client = client
+        self.interval = interval
+
+        self.pending: typing.List[PendingTransaction] = list()
+        self.greenlet = None
+
+    def wait(self, transaction_hash: str, confirmations: int = None, timeout: float = None):
+        """ Block until the transaction is mined and has `confirmations`
+        blocks on top of it.
+        """
+        pending = PendingTransaction(transaction_hash, confirmations or 0)
+        self.pending.append(pending)
+
+        if self.greenlet is None:
+            self.greenlet = gevent.spawn(self.run)
+
+        try:
+            pending.result.get(timeout=timeout)
+        except gevent.Timeout:
+            raise Exception('timeout when polling for transaction')
+        finally:
+            if pending in self.pending:
+                self.pending.remove(pending)
+
+    def run(self):
+        try:
+            while self.pending:
+                try:
+                    self.check()
+                except RaidenShuttingDown as e:
+                    self.fail_all(e)
+                except TRANSIENT_ERRORS as e:
+                    # The waiters are kept, the transactions are checked
+                    # again on the next interval
+                    log.warning('Checking the pending transactions failed', error=str(e))
+                except Exception:  # pylint: disable=broad-except
+                    log.exception('Checking the pending transactions failed')
+
+                if self.pending:
+                    gevent.sleep(self.interval)
+        finally:
+            self.greenlet = None
+
+    def check(self):
+        block_number = self.client.block_number()
+
+        # The state of a transaction changes only with a new block, the new
+        # transactions are checked once
+        unmined = [
+            pending
+            for pending in self.pending
+            if pending.mined_block is None and pending.checked_block != block_number
+        ]
+
+        def get_transaction(transaction_hash):
+            try:
+                return self.client.web3.eth.getTransaction(transaction_hash), None
+            except Exception as e:  # pylint: disable=broad-except
+                return None, e
+
+        # The concurrent requests are sent in a single batch
+        group = Group()
+        results = [
+            group.spawn(get_transaction, pending.transaction_hash)
+            for pending in unmined
+        ]
+        group.join()
+
+        for pending, result in zip(unmined, results):
+            transaction, exception = result.get()
+
+            if isinstance(exception, RaidenShuttingDown):
+                raise exception
+
+            if isinstance(exception, TRANSIENT_ERRORS):
+                # Checked again on the next interval
+                continue
+
+            pending.checked_block = block_number
+
+            if exception is not None:
+                self.fail(pending, exception)
+            else:
+                self.update(pending, transaction)
+
+        for pending in list(self.pending):
+            mined = pending.mined_block is not None
+            if mined and block_number >= pending.mined_block + pending.confirmations:
+                # this will resolve both APPLIED and REVERTED transactions
+                self.pending.remove(pending)
+                pending.result.set(block_number)
+
+    def update(self, pending: PendingTransaction, transaction: typing.Optional[typing.Dict]):
+        # Could return None for a short period of time, until the transaction
+        # is added to the pool. A transaction which was added to the pool and
+        # then removed could have a gas price that is too low:
+        #
+        # > Transaction (acbca3d6) below gas price (tx=1 Wei ask=18
+        # > Shannon). All sequential txs from this address(7d0eae79)
+        # > will be ignored
+        #
+        if transaction is None:
+            if pending.seen:
+                self.fail(pending, Exception('invalid transaction, check gas price'))
+            return
+
+        pending.seen = True
+
+        mined_block = transaction['blockNumber']
+        if mined_block is not None:
+            if isinstance(mined_block, str):
+                mined_block = to_int(hexstr=mined_block)
+
+            pending.mined_block = mined_block
+
+    def fail(self, pending: PendingTransaction, exception: Exception):
+        self.pending.remove(pending)
+        pending.result.set_exception(exception)
+
+    def fail_all(self, exception: Exception):
+        for pending in list(self.pending):
+            self.fail(pending, exception)
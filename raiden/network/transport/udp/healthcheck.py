@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import heapq
+import time
 from collections import namedtuple
-from itertools import repeat
 
+import gevent
 from gevent.event import Event
 import structlog
 
@@ -10,7 +12,6 @@ from raiden.exceptions import (
     RaidenShuttingDown,
 )
 from raiden.utils import pex, typing
-from raiden.transfer import views
 from raiden.transfer.state import (
     NODE_NETWORK_REACHABLE,
     NODE_NETWORK_UNKNOWN,
@@ -29,148 +30,238 @@ HealthEvents = namedtuple('HealthEvents', (
 ))
 
 
-def healthcheck(
-        transport: UDPTransport,
-        recipient: typing.Address,
-        event_stop: Event,
-        event_healthy: Event,
-        event_unhealthy: Event,
-        nat_keepalive_retries: int,
-        nat_keepalive_timeout: int,
-        nat_invitation_timeout: int,
-        ping_nonce: int,
-):
-    """ Sends a periodical Ping to `recipient` to check its health. """
-    # pylint: disable=too-many-branches
-
-    log.debug(
-        'starting healthcheck for',
-        node=pex(transport.raiden.address),
-        to=pex(recipient),
-    )
+class PeerHealth:
+    """ Health state of a single peer, one entry of the scheduler table. """
 
-    # The state of the node is unknown, the events are set to allow the tasks
-    # to do work.
-    last_state = NODE_NETWORK_UNKNOWN
-    transport.set_node_network_state(
-        recipient,
-        last_state,
+    __slots__ = (
+        'address',
+        'events',
+        'network_state',
+        'host_port',
+        'backoff',
+        'nonce',
+        'unanswered',
     )
 
-    # Always call `clear` before `set`, since only `set` does context-switches
-    # it's easier to reason about tasks that are waiting on both events.
-
-    # Wait for the end-point registration or for the node to quit
-    try:
-        transport.get_host_port(recipient)
-    except UnknownAddress:
-        log.debug(
-            'waiting for endpoint registration',
-            node=pex(transport.raiden.address),
-            to=pex(recipient),
+    def __init__(self, address: typing.Address):
+        self.address = address
+        self.events = HealthEvents(
+            event_healthy=Event(),
+            event_unhealthy=Event(),
         )
 
-        event_healthy.clear()
-        event_unhealthy.set()
+        # None until the first probe, which sets the state to unknown
+        self.network_state = None
+        self.host_port = None
 
-        backoff = udp_utils.timeout_exponential_backoff(
-            nat_keepalive_retries,
-            nat_keepalive_timeout,
-            nat_invitation_timeout,
-        )
-        sleep = next(backoff)
+        # Timeouts used while the endpoint is not registered
+        self.backoff = None
+
+        self.nonce = 0
+        # Number of Pings sent since the last Pong
+        self.unanswered = 0
+
+
+class HealthcheckScheduler:
+    """ Checks the health of all the peers from a single task.
+
+    The peers are kept in a heap ordered by the time of their next probe. The
+    first probe of each new peer is spaced by `spacing` seconds from the
+    previous new peer, so that adding all the neighbours at startup does not
+    send all the Pings at once, and the peers keep this phase afterwards. The
+    probes which are due within `batch_window` seconds are sent together, so
+    that the Pings to the same host share a datagram.
+
+    A Ping is sent to every reachable peer each `nat_keepalive_timeout`
+    seconds, which also keeps the NAT mappings alive. After
+    `nat_keepalive_retries` Pings without a Pong the peer is unreachable and
+    it is probed every `nat_invitation_timeout` seconds until it answers.
+    """
+
+    def __init__(
+            self,
+            transport: UDPTransport,
+            nat_keepalive_retries: int,
+            nat_keepalive_timeout: int,
+            nat_invitation_timeout: int,
+            spacing: float,
+            batch_window: float,
+            time_function: typing.Callable[[], float] = time.monotonic,
+    ):
+        self.transport = transport
+        self.nat_keepalive_retries = nat_keepalive_retries
+        self.nat_keepalive_timeout = nat_keepalive_timeout
+        self.nat_invitation_timeout = nat_invitation_timeout
+        self.spacing = spacing
+        self.batch_window = batch_window
+        self.time = time_function
+
+        self.addresses_to_peers: typing.Dict[typing.Address, PeerHealth] = dict()
+        # Heap of (deadline, address), there is exactly one entry per peer
+        self.schedule = list()
+        self.next_first_probe = 0
+
+        self.event_wakeup = Event()
+
+    def __len__(self):
+        return len(self.addresses_to_peers)
+
+    def start(self, event_stop: Event) -> gevent.Greenlet:
+        event_stop.rawlink(lambda _: self.event_wakeup.set())
+        return gevent.spawn(self.run, event_stop)
+
+    def add(self, address: typing.Address) -> HealthEvents:
+        """ Starts healthchecking `address` if it is not checked yet and
+        returns the HealthEvents of the peer.
+        """
+        peer = self.addresses_to_peers.get(address)
+
+        if peer is None:
+            peer = PeerHealth(address)
+            self.addresses_to_peers[address] = peer
+
+            deadline = max(self.time(), self.next_first_probe)
+            self.next_first_probe = deadline + self.spacing
+            heapq.heappush(self.schedule, (deadline, address))
+
+            # The scheduler may be sleeping until a later deadline
+            self.event_wakeup.set()
+
+            log.debug(
+                'starting healthcheck for',
+                node=pex(self.transport.raiden.address),
+                to=pex(address),
+            )
+
+        return peer.events
+
+    def run(self, event_stop: Event):
+        while not event_stop.is_set():
+            self.event_wakeup.clear()
 
-        while not event_stop.wait(sleep):
             try:
-                transport.get_host_port(recipient)
+                self.probe_due(event_stop)
+            except RaidenShuttingDown:  # For a clean shutdown process
+                return
+
+            timeout = None
+            if self.schedule:
+                timeout = max(self.schedule[0][0] - self.time(), 0)
+
+            self.event_wakeup.wait(timeout)
+
+    def probe_due(self, event_stop: Event):
+        """ Probes the peers whose deadline is within the batch window. """
+        now = self.time()
+        batch_deadline = now + self.batch_window
+
+        while self.schedule and self.schedule[0][0] <= batch_deadline:
+            if event_stop.is_set():
+                return
+
+            _, address = heapq.heappop(self.schedule)
+            delay = self.probe(self.addresses_to_peers[address])
+            heapq.heappush(self.schedule, (now + delay, address))
+
+    def probe(self, peer: PeerHealth) -> float:
+        """ Does the next health check step for `peer` and returns the delay
+        until its next probe.
+        """
+        # Always call `clear` before `set`, since only `set` does
+        # context-switches it's easier to reason about tasks that are waiting
+        # on both events.
+        if peer.network_state is None:
+            self.set_network_state(peer, NODE_NETWORK_UNKNOWN)
+
+        if peer.host_port is None:
+            try:
+                peer.host_port = self.transport.get_host_port(peer.address)
             except UnknownAddress:
-                sleep = next(backoff)
-            else:
-                break
-
-    # Don't wait to send the first Ping and to start sending messages if the
-    # endpoint is known
-    sleep = 0
-    event_unhealthy.clear()
-    event_healthy.set()
-
-    while not event_stop.wait(sleep):
-        sleep = nat_keepalive_timeout
-
-        ping_nonce['nonce'] += 1
-        messagedata = transport.get_ping(ping_nonce['nonce'])
-        message_id = ('ping', ping_nonce['nonce'], recipient)
-
-        # Send Ping a few times before setting the node as unreachable
-        try:
-            acknowledged = udp_utils.retry(
-                transport,
-                messagedata,
-                message_id,
-                recipient,
-                event_stop,
-                [nat_keepalive_timeout] * nat_keepalive_retries,
-            )
-        except RaidenShuttingDown:  # For a clean shutdown process
-            return
+                if peer.backoff is None:
+                    log.debug(
+                        'waiting for endpoint registration',
+                        node=pex(self.transport.raiden.address),
+                        to=pex(peer.address),
+                    )
 
-        if event_stop.is_set():
-            return
+                    peer.events.event_healthy.clear()
+                    peer.events.event_unhealthy.set()
+
+                    peer.backoff = udp_utils.timeout_exponential_backoff(
+                        self.nat_keepalive_retries,
+                        self.nat_keepalive_timeout,
+                        self.nat_invitation_timeout,
+                    )
+
+                return next(peer.backoff)
+
+            # Don't wait for the first Pong to start sending messages if the
+            # endpoint is known
+            peer.backoff = None
+            peer.events.event_unhealthy.clear()
+            peer.events.event_healthy.set()
 
-        if not acknowledged:
+        unresponsive = peer.unanswered >= self.nat_keepalive_retries
+        if unresponsive and peer.network_state != NODE_NETWORK_UNREACHABLE:
             log.debug(
                 'node is unresponsive',
-                node=pex(transport.raiden.address),
-                to=pex(recipient),
-                current_state=last_state,
+                node=pex(self.transport.raiden.address),
+                to=pex(peer.address),
+                current_state=peer.network_state,
                 new_state=NODE_NETWORK_UNREACHABLE,
-                retries=nat_keepalive_retries,
-                timeout=nat_keepalive_timeout,
+                retries=self.nat_keepalive_retries,
+                timeout=self.nat_keepalive_timeout,
             )
 
             # The node is not healthy, clear the event to stop all queue
             # tasks
-            last_state = NODE_NETWORK_UNREACHABLE
-            transport.set_node_network_state(
-                recipient,
-                last_state,
-            )
-            event_healthy.clear()
-            event_unhealthy.set()
+            self.set_network_state(peer, NODE_NETWORK_UNREACHABLE)
+            peer.events.event_healthy.clear()
+            peer.events.event_unhealthy.set()
 
-            # Retry until recovery, used for:
-            # - Checking node status.
-            # - Nat punching.
+            # The node may have registered a new endpoint
             try:
-                acknowledged = udp_utils.retry(
-                    transport,
-                    messagedata,
-                    message_id,
-                    recipient,
-                    event_stop,
-                    repeat(nat_invitation_timeout),
-                )
-            except RaidenShuttingDown:  # For a clean shutdown process
-                return
+                peer.host_port = self.transport.get_host_port(peer.address)
+            except UnknownAddress:
+                pass
 
-        if acknowledged:
-            current_state = views.get_node_network_status(
-                views.state_from_raiden(transport.raiden),
-                recipient,
-            )
-            log.debug(
-                'node answered',
-                node=pex(transport.raiden.address),
-                to=pex(recipient),
-                current_state=current_state,
-                new_state=NODE_NETWORK_REACHABLE,
-            )
+        peer.nonce += 1
+        peer.unanswered += 1
+        messagedata = self.transport.get_ping(peer.nonce)
+        self.transport.maybe_sendraw_bundled(peer.host_port, messagedata)
+
+        # Retry until recovery, used for:
+        # - Checking node status.
+        # - Nat punching.
+        if peer.network_state == NODE_NETWORK_UNREACHABLE:
+            return self.nat_invitation_timeout
+
+        return self.nat_keepalive_timeout
+
+    def receive_pong(self, sender: typing.Address, nonce: int):
+        """ Marks `sender` as reachable if `nonce` answers one of the Pings
+        sent since its last Pong.
+        """
+        peer = self.addresses_to_peers.get(sender)
+
+        if peer is None or not peer.nonce - peer.unanswered < nonce <= peer.nonce:
+            return
+
+        log.debug(
+            'node answered',
+            node=pex(self.transport.raiden.address),
+            to=pex(sender),
+            current_state=peer.network_state,
+            new_state=NODE_NETWORK_REACHABLE,
+        )
+
+        peer.unanswered = 0
+
+        if peer.network_state != NODE_NETWORK_REACHABLE:
+            self.set_network_state(peer, NODE_NETWORK_REACHABLE)
+            peer.events.event_unhealthy.clear()
+            peer.events.event_healthy.set()
 
-            if last_state != NODE_NETWORK_REACHABLE:
-                last_state = NODE_NETWORK_REACHABLE
-                transport.set_node_network_state(
-                    recipient,
-                    last_state,
-                )
-                event_unhealthy.clear()
-                event_healthy.set()
+    def set_network_state(self, peer: PeerHealth, network_state: str):
+        peer.network_state = network_state
+        self.transport.set_node_network_state(peer.address, network_state)
@@ -8,6 +8,7 @@ from gevent.event import (
     AsyncResult,
     Event,
 )
+from gevent.queue import Queue
 from gevent.server import DatagramServer
 import structlog
 from eth_utils import is_binary_address
@@ -22,16 +23,27 @@ from raiden.constants import UDP_MAX_MESSAGE_SIZE
 from raiden.messages import (
     message_from_sendevent,
     decode,
+    Bundle,
     Delivered,
+    DeliveredBatch,
     Message,
     Ping,
     Pong,
 )
-from raiden.settings import CACHE_TTL
+from raiden.settings import (
+    CACHE_TTL,
+    DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE,
+    DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT,
+    DEFAULT_TRANSPORT_HEALTHCHECK_BATCH_WINDOW,
+    DEFAULT_TRANSPORT_HEALTHCHECK_SPACING,
+    DEFAULT_TRANSPORT_INGRESS_POLICY,
+    DEFAULT_TRANSPORT_INGRESS_QUEUE_SIZE,
+    DEFAULT_TRANSPORT_INGRESS_WORKERS,
+)
 from raiden.utils import pex, typing
 from raiden.utils.notifying_queue import NotifyingQueue
 from raiden.udp_message_handler import on_udp_message
-from raiden.transfer.state_change import ReceiveDelivered
+from raiden.transfer.state_change import ReceiveDelivered, ReceiveDeliveredBatch
 from raiden.transfer.state_change import ActionChangeNodeNetworkState
 from raiden.network.transport.udp import healthcheck
 from raiden.network.transport.udp.udp_utils import (
@@ -46,6 +58,15 @@ log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 QueueItem_T = typing.Tuple[bytes, int]
 Queue_T = typing.List[QueueItem_T]
 
+# Policies used when a packet is received while the ingress queue is full.
+# Dropped packets are not acknowledged, so the partner will retry them.
+INGRESS_POLICY_DROP_NEWEST = 'drop_newest'
+INGRESS_POLICY_DROP_OLDEST = 'drop_oldest'
+INGRESS_POLICIES = (
+    INGRESS_POLICY_DROP_NEWEST,
+    INGRESS_POLICY_DROP_OLDEST,
+)
+
 # GOALS:
 # - Each netting channel must have the messages processed in-order, the
 # transport must detect unacknowledged messages and retry them.
@@ -143,6 +164,35 @@ def single_queue_send(
                     return
 
 
+def pack_datagrams(
+        messages_data: typing.List[bytes],
+        max_size: int,
+) -> typing.List[bytes]:
+    """ Pack `messages_data` in as few datagrams of at most `max_size` bytes
+    as possible, preserving the messages order.
+
+    Messages that don't share a datagram are sent as-is, without the `Bundle`
+    overhead.
+    """
+    datagrams = list()
+    current = list()
+
+    for message_data in messages_data:
+        if current and Bundle.size_for(current + [message_data]) > max_size:
+            datagrams.append(current)
+            current = list()
+
+        current.append(message_data)
+
+    if current:
+        datagrams.append(current)
+
+    return [
+        group[0] if len(group) == 1 else Bundle(group).encode()
+        for group in datagrams
+    ]
+
+
 class UDPTransport:
     def __init__(self, discovery, udpsocket, throttle_policy, config):
         # these values are initialized by the start method
@@ -158,16 +208,62 @@ class UDPTransport:
         self.nat_keepalive_timeout = config['nat_keepalive_timeout']
         self.nat_invitation_timeout = config['nat_invitation_timeout']
 
+        # Delivered messages for the same sender are coalesced into a single
+        # DeliveredBatch, which is sent when the batch is full or after the
+        # timeout, whatever happens first.
+        self.delivered_batch_size = min(
+            config.get('delivered_batch_size', DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE),
+            DeliveredBatch.max_identifiers_for(UDP_MAX_MESSAGE_SIZE),
+        )
+        self.delivered_batch_timeout = config.get(
+            'delivered_batch_timeout',
+            DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT,
+        )
+        self.senders_to_pending_delivered = dict()
+        self.senders_to_delivered_flushes = dict()
+
+        # Messages sent to the same host during the same event loop iteration
+        # are packed in a single datagram
+        self.hostports_to_pending_messages = dict()
+
+        # Received packets are buffered in a bounded queue and processed by a
+        # fixed number of workers, bursts of packets are dropped instead of
+        # spawning an unbounded number of handlers.
+        self.ingress_workers = config.get('ingress_workers', DEFAULT_TRANSPORT_INGRESS_WORKERS)
+        self.ingress_policy = config.get('ingress_policy', DEFAULT_TRANSPORT_INGRESS_POLICY)
+        self.ingress_queue = Queue(
+            config.get('ingress_queue_size', DEFAULT_TRANSPORT_INGRESS_QUEUE_SIZE),
+        )
+        self.ingress_metrics = {
+            'received': 0,
+            'processed': 0,
+            'dropped': 0,
+            'max_depth': 0,
+        }
+
+        if self.ingress_workers <= 0:
+            raise ValueError('ingress_workers must be a positive integer')
+
+        if self.ingress_policy not in INGRESS_POLICIES:
+            raise ValueError('ingress_policy must be one of {}'.format(
+                ','.join(INGRESS_POLICIES),
+            ))
+
         self.event_stop = Event()
 
         self.greenlets = list()
-        self.addresses_events = dict()
 
         self.messageids_to_asyncresults = dict()
 
-        # Maps the addresses to a dict with the latest nonce (using a dict
-        # because python integers are immutable)
-        self.nodeaddresses_to_nonces = dict()
+        # The health of all the peers is checked by a single task
+        self.healthcheck = healthcheck.HealthcheckScheduler(
+            self,
+            self.nat_keepalive_retries,
+            self.nat_keepalive_timeout,
+            self.nat_invitation_timeout,
+            config.get('healthcheck_spacing', DEFAULT_TRANSPORT_HEALTHCHECK_SPACING),
+            config.get('healthcheck_batch_window', DEFAULT_TRANSPORT_HEALTHCHECK_BATCH_WINDOW),
+        )
 
         cache = cachetools.TTLCache(
             maxsize=50,
@@ -177,7 +273,7 @@ class UDPTransport:
         self.get_host_port = cache_wrapper(discovery.get)
 
         self.throttle_policy = throttle_policy
-        self.server = DatagramServer(udpsocket, handle=self._receive)
+        self.server = DatagramServer(udpsocket, handle=self._receive, spawn=None)
 
     def start(
             self,
@@ -187,9 +283,15 @@ class UDPTransport:
         self.raiden = raiden
         self.queueids_to_queues = dict()
 
-        # server.stop() clears the handle. Since this may be a restart the
-        # handle must always be set
+        # server.stop() clears the handle and the spawn. Since this may be a
+        # restart these must always be set
         self.server.set_handle(self._receive)
+        self.server.set_spawn(None)
+
+        for _ in range(self.ingress_workers):
+            self.greenlets.append(gevent.spawn(self.ingress_worker))
+
+        self.greenlets.append(self.healthcheck.start(self.event_stop))
 
         for (recipient, queue_name), queue in queueids_to_queues.items():
             encoded_queue = list()
@@ -212,8 +314,24 @@ class UDPTransport:
 
         # Stop processing the outgoing queues
         self.event_stop.set()
+
+        # Discard the packets which were not processed yet, these were not
+        # acknowledged and will be retried by the partners, and stop the
+        # ingress workers
+        while not self.ingress_queue.empty():
+            self.ingress_queue.get_nowait()
+
+        for _ in range(self.ingress_workers):
+            self.ingress_queue.put(None)
+
         gevent.wait(self.greenlets)
 
+        # Acknowledge the messages that were already processed, otherwise the
+        # partners would needlessly retry them. This also cancels the pending
+        # flushes, which must not run after the transport is stopped.
+        for sender in list(self.senders_to_pending_delivered.keys()):
+            self.send_delivered(sender)
+
         # All outgoing tasks are stopped. Now it's safe to close the socket. At
         # this point there might be some incoming message being processed,
         # keeping the socket open is not useful for these.
@@ -233,43 +351,14 @@ class UDPTransport:
             async_result.set(False)
 
     def get_health_events(self, recipient):
-        """ Starts a healthcheck task for `recipient` and returns a
-        HealthEvents with locks to react on its current state.
+        """ Starts healthchecking `recipient` and returns a HealthEvents with
+        locks to react on its current state.
         """
-        if recipient not in self.addresses_events:
-            self.start_health_check(recipient)
-
-        return self.addresses_events[recipient]
+        return self.healthcheck.add(recipient)
 
     def start_health_check(self, recipient):
-        """ Starts a task for healthchecking `recipient` if there is not
-        one yet.
-        """
-        if recipient not in self.addresses_events:
-            ping_nonce = self.nodeaddresses_to_nonces.setdefault(
-                recipient,
-                {'nonce': 0},  # HACK: Allows the task to mutate the object
-            )
-
-            events = healthcheck.HealthEvents(
-                event_healthy=Event(),
-                event_unhealthy=Event(),
-            )
-
-            self.addresses_events[recipient] = events
-
-            self.greenlets.append(gevent.spawn(
-                healthcheck.healthcheck,
-                self,
-                recipient,
-                self.event_stop,
-                events.event_healthy,
-                events.event_unhealthy,
-                self.nat_keepalive_retries,
-                self.nat_keepalive_timeout,
-                self.nat_invitation_timeout,
-                ping_nonce,
-            ))
+        """ Starts healthchecking `recipient` if it is not checked yet. """
+        self.healthcheck.add(recipient)
 
     def init_queue_for(
             self,
@@ -344,7 +433,7 @@ class UDPTransport:
             raise ValueError('Invalid address {}'.format(pex(recipient)))
 
         # These are not protocol messages, but transport specific messages
-        if isinstance(message, (Delivered, Ping, Pong)):
+        if isinstance(message, (Delivered, DeliveredBatch, Ping, Pong)):
             raise ValueError('Do not use send for {} messages'.format(message.__class__.__name__))
 
         messagedata = message.encode()
@@ -401,10 +490,40 @@ class UDPTransport:
             self.messageids_to_asyncresults[message_id] = async_result
 
         host_port = self.get_host_port(recipient)
-        self.maybe_sendraw(host_port, messagedata)
+        self.maybe_sendraw_bundled(host_port, messagedata)
 
         return async_result
 
+    def maybe_sendraw_bundled(self, host_port: typing.Tuple[int, int], messagedata: bytes):
+        """ Send message to recipient if the transport is running, sharing the
+        datagram with the other messages sent to the same host during the
+        current event loop iteration.
+        """
+        pending = self.hostports_to_pending_messages.get(host_port)
+
+        if pending is None:
+            pending = list()
+            self.hostports_to_pending_messages[host_port] = pending
+
+            # The greenlet is only executed once the current one yields,
+            # allowing the other greenlets which are ready to run to append
+            # their messages to `pending`
+            gevent.spawn(self.send_pending_messages, host_port)
+
+        pending.append(messagedata)
+
+    def send_pending_messages(self, host_port: typing.Tuple[int, int]):
+        """ Send the messages queued for `host_port` with the minimum number
+        of datagrams.
+        """
+        pending = self.hostports_to_pending_messages.pop(host_port, None)
+
+        if not pending:
+            return
+
+        for datagram in pack_datagrams(pending, UDP_MAX_MESSAGE_SIZE):
+            self.maybe_sendraw(host_port, datagram)
+
     def maybe_sendraw(self, host_port: typing.Tuple[int, int], messagedata: bytes):
         """ Send message to recipient if the transport is running. """
 
@@ -423,10 +542,51 @@ class UDPTransport:
             )
 
     def _receive(self, data, host_port):  # pylint: disable=unused-argument
-        try:
-            self.receive(data)
-        except RaidenShuttingDown:  # For a clean shutdown
-            return
+        """ Datagram handler, this is executed by the hub and must not block. """
+        metrics = self.ingress_metrics
+        metrics['received'] += 1
+
+        if self.ingress_queue.full():
+            metrics['dropped'] += 1
+
+            if self.ingress_policy == INGRESS_POLICY_DROP_OLDEST:
+                self.ingress_queue.get_nowait()
+            else:
+                return
+
+        self.ingress_queue.put_nowait(data)
+        metrics['max_depth'] = max(metrics['max_depth'], self.ingress_queue.qsize())
+
+    def ingress_worker(self):
+        """ Process the received packets until the transport is stopped. """
+        while True:
+            data = self.ingress_queue.get()
+
+            # sentinel used to stop the worker
+            if data is None:
+                return
+
+            try:
+                self.receive(data)
+            except RaidenShuttingDown:  # For a clean shutdown
+                return
+            except Exception:  # pylint: disable=broad-except
+                # A single invalid packet must not stop the worker
+                log.exception(
+                    'Error while processing a packet',
+                    node=pex(self.raiden.address),
+                    message=hexlify(data),
+                )
+
+            self.ingress_metrics['processed'] += 1
+
+    def get_ingress_metrics(self) -> typing.Dict[str, int]:
+        """ Returns the counters of the ingress stage and the current depth of
+        the ingress queue.
+        """
+        metrics = dict(self.ingress_metrics)
+        metrics['depth'] = self.ingress_queue.qsize()
+        return metrics
 
     def receive(self, messagedata: bytes):
         """ Handle an UDP packet. """
@@ -449,6 +609,10 @@ class UDPTransport:
             self.receive_ping(message)
         elif type(message) == Delivered:
             self.receive_delivered(message)
+        elif type(message) == DeliveredBatch:
+            self.receive_delivered_batch(message)
+        elif type(message) == Bundle:
+            self.receive_bundle(message)
         elif message is not None:
             self.receive_message(message)
         else:
@@ -458,6 +622,11 @@ class UDPTransport:
                 message=hexlify(messagedata),
             )
 
+    def receive_bundle(self, bundle: Bundle):
+        """ Handle the messages packed in a Bundle, in order. """
+        for messagedata in bundle.messages_data:
+            self.receive(messagedata)
+
     def receive_message(self, message: Message):
         """ Handle a Raiden protocol message.
 
@@ -481,13 +650,56 @@ class UDPTransport:
             #   state change
             # - Decode it, save to the WAL, and process it (the current
             #   implementation)
-            delivered_message = Delivered(message.message_identifier)
-            self.raiden.sign(delivered_message)
+            self.enqueue_delivered(message.sender, message.message_identifier)
 
-            self.maybe_send(
-                message.sender,
-                delivered_message,
-            )
+    def enqueue_delivered(self, sender: typing.Address, message_identifier: int):
+        """ Schedule the acknowledgement of `message_identifier` to `sender`.
+
+        The acknowledgements are coalesced, the batch is sent once it is full
+        or once `delivered_batch_timeout` elapsed, so that a burst of
+        messages costs a single signature and packet.
+        """
+        pending = self.senders_to_pending_delivered.get(sender)
+
+        if pending is None:
+            pending = list()
+            self.senders_to_pending_delivered[sender] = pending
+
+            if self.delivered_batch_timeout:
+                self.senders_to_delivered_flushes[sender] = gevent.spawn_later(
+                    self.delivered_batch_timeout,
+                    self.send_delivered,
+                    sender,
+                )
+
+        pending.append(message_identifier)
+
+        batch_is_full = len(pending) >= self.delivered_batch_size
+        if batch_is_full or not self.delivered_batch_timeout:
+            self.send_delivered(sender)
+
+    def send_delivered(self, sender: typing.Address):
+        """ Send the pending acknowledgements for `sender`, if any. """
+        pending = self.senders_to_pending_delivered.pop(sender, None)
+
+        flush = self.senders_to_delivered_flushes.pop(sender, None)
+        if flush is not None and flush is not gevent.getcurrent():
+            flush.kill(block=False)
+
+        if not pending:
+            return
+
+        if len(pending) == 1:
+            delivered_message = Delivered(pending[0])
+        else:
+            delivered_message = DeliveredBatch(pending)
+
+        self.raiden.sign(delivered_message)
+
+        try:
+            self.maybe_send(sender, delivered_message)
+        except (InvalidAddress, UnknownAddress) as e:
+            log.debug("Couldn't send the `Delivered` message", e=e)
 
     def receive_delivered(self, delivered: Delivered):
         """ Handle a Delivered message.
@@ -500,8 +712,22 @@ class UDPTransport:
         processed = ReceiveDelivered(delivered.delivered_message_identifier)
         self.raiden.handle_state_change(processed)
 
-        message_id = delivered.delivered_message_identifier
-        async_result = self.raiden.transport.messageids_to_asyncresults.get(message_id)
+        self.set_delivered(delivered.delivered_message_identifier)
+
+    def receive_delivered_batch(self, delivered_batch: DeliveredBatch):
+        """ Handle a DeliveredBatch message, all the identifiers are
+        acknowledged with a single state change.
+        """
+        message_identifiers = delivered_batch.delivered_message_identifiers
+
+        processed = ReceiveDeliveredBatch(message_identifiers)
+        self.raiden.handle_state_change(processed)
+
+        for message_id in message_identifiers:
+            self.set_delivered(message_id)
+
+    def set_delivered(self, message_id: int):
+        async_result = self.messageids_to_asyncresults.get(message_id)
 
         # clear the async result, otherwise we have a memory leak
         if async_result is not None:
@@ -533,17 +759,13 @@ class UDPTransport:
     def receive_pong(self, pong: Pong):
         """ Handles a Pong message. """
 
-        message_id = ('ping', pong.nonce, pong.sender)
-        async_result = self.messageids_to_asyncresults.get(message_id)
-
-        if async_result is not None:
-            log.debug(
-                'PONG RECEIVED',
-                node=pex(self.raiden.address),
-                message_id=pong.nonce,
-            )
+        log.debug(
+            'PONG RECEIVED',
+            node=pex(self.raiden.address),
+            message_id=pong.nonce,
+        )
 
-            async_result.set(True)
+        self.healthcheck.receive_pong(pong.sender, pong.nonce)
 
     def get_ping(self, nonce: int) -> Ping:
         """ Returns a signed Ping message.
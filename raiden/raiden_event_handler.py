@@ -30,6 +30,7 @@ from raiden.transfer.mediated_transfer.events import (
     SendSecretRequest,
 )
 from raiden.utils import pex
+from raiden.utils.dispatch import DispatchTable
 # type alias to avoid both circular dependencies and flake8 errors
 RaidenService = 'RaidenService'
 
@@ -257,41 +258,52 @@ def handle_contract_send_channelsettle(
     channel.settle()
 
 
+def handle_contract_send(raiden: RaidenService, event: Event):
+    """ The transaction is sent and mined asynchronously. """
+    raiden.transaction_manager.submit(event)
+
+
+def handle_uneventful(raiden: RaidenService, event: Event):  # pylint: disable=unused-argument
+    pass
+
+
+# The handlers of the contract send events block until the transaction is
+# mined, these are called by the TransactionManager
+CONTRACT_SEND_HANDLERS = DispatchTable('contract_send')
+CONTRACT_SEND_HANDLERS.register(ContractSendChannelClose, handle_contract_send_channelclose)
+CONTRACT_SEND_HANDLERS.register(
+    ContractSendChannelUpdateTransfer,
+    handle_contract_send_channelupdate,
+)
+CONTRACT_SEND_HANDLERS.register(ContractSendChannelBatchUnlock, handle_contract_send_channelunlock)
+CONTRACT_SEND_HANDLERS.register(ContractSendChannelSettle, handle_contract_send_channelsettle)
+
+
+RAIDEN_EVENT_HANDLERS = DispatchTable('raiden_event')
+RAIDEN_EVENT_HANDLERS.register(SendLockedTransfer, handle_send_lockedtransfer)
+RAIDEN_EVENT_HANDLERS.register(SendDirectTransfer, handle_send_directtransfer)
+RAIDEN_EVENT_HANDLERS.register(SendRevealSecret, handle_send_revealsecret)
+RAIDEN_EVENT_HANDLERS.register(SendBalanceProof, handle_send_balanceproof)
+RAIDEN_EVENT_HANDLERS.register(SendSecretRequest, handle_send_secretrequest)
+RAIDEN_EVENT_HANDLERS.register(SendRefundTransfer, handle_send_refundtransfer)
+RAIDEN_EVENT_HANDLERS.register(SendProcessed, handle_send_processed)
+RAIDEN_EVENT_HANDLERS.register(EventTransferSentSuccess, handle_transfersentsuccess)
+RAIDEN_EVENT_HANDLERS.register(EventTransferSentFailed, handle_transfersentfailed)
+RAIDEN_EVENT_HANDLERS.register(EventUnlockFailed, handle_unlockfailed)
+# RAIDEN_EVENT_HANDLERS.register(ContractSendSecretReveal, handle_contract_send_secretreveal)
+RAIDEN_EVENT_HANDLERS.register(ContractSendSecretReveal, handle_uneventful)
+RAIDEN_EVENT_HANDLERS.register(ContractSendChannelClose, handle_contract_send)
+RAIDEN_EVENT_HANDLERS.register(ContractSendChannelUpdateTransfer, handle_contract_send)
+RAIDEN_EVENT_HANDLERS.register(ContractSendChannelBatchUnlock, handle_contract_send)
+RAIDEN_EVENT_HANDLERS.register(ContractSendChannelSettle, handle_contract_send)
+for uneventful_event in UNEVENTFUL_EVENTS:
+    RAIDEN_EVENT_HANDLERS.register(uneventful_event, handle_uneventful)
+
+
 def on_raiden_event(raiden: RaidenService, event: Event):
-    # pylint: disable=too-many-branches
-
-    if type(event) == SendLockedTransfer:
-        handle_send_lockedtransfer(raiden, event)
-    elif type(event) == SendDirectTransfer:
-        handle_send_directtransfer(raiden, event)
-    elif type(event) == SendRevealSecret:
-        handle_send_revealsecret(raiden, event)
-    elif type(event) == SendBalanceProof:
-        handle_send_balanceproof(raiden, event)
-    elif type(event) == SendSecretRequest:
-        handle_send_secretrequest(raiden, event)
-    elif type(event) == SendRefundTransfer:
-        handle_send_refundtransfer(raiden, event)
-    elif type(event) == SendProcessed:
-        handle_send_processed(raiden, event)
-    elif type(event) == EventTransferSentSuccess:
-        handle_transfersentsuccess(raiden, event)
-    elif type(event) == EventTransferSentFailed:
-        handle_transfersentfailed(raiden, event)
-    elif type(event) == EventUnlockFailed:
-        handle_unlockfailed(raiden, event)
-    elif type(event) == ContractSendSecretReveal:
-        # handle_contract_send_secretreveal(raiden, event)
-        pass
-    elif type(event) == ContractSendChannelClose:
-        handle_contract_send_channelclose(raiden, event)
-    elif type(event) == ContractSendChannelUpdateTransfer:
-        handle_contract_send_channelupdate(raiden, event)
-    elif type(event) == ContractSendChannelBatchUnlock:
-        handle_contract_send_channelunlock(raiden, event)
-    elif type(event) == ContractSendChannelSettle:
-        handle_contract_send_channelsettle(raiden, event)
-    elif type(event) in UNEVENTFUL_EVENTS:
-        pass
+    handler = RAIDEN_EVENT_HANDLERS.get(type(event))
+
+    if handler is not None:
+        handler(raiden, event)
     else:
         log.error('Unknown event {}'.format(type(event)))
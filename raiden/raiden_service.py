@@ -23,13 +23,12 @@ from raiden.constants import (
     NETTINGCHANNEL_SETTLE_TIMEOUT_MIN,
     NETTINGCHANNEL_SETTLE_TIMEOUT_MAX,
 )
-from raiden.blockchain.state import get_token_network_state_from_proxies
-from raiden.blockchain.events import (
-    get_relevant_proxies,
-    BlockchainEvents,
-)
+from raiden.blockchain.events import BlockchainEvents
+from raiden.blockchain.log_cache import LogCache
+from raiden.blockchain.sync import StartupSync
 from raiden.raiden_event_handler import on_raiden_event
 from raiden.tasks import AlarmTask
+from raiden.transaction_manager import TransactionManager
 from raiden.transfer import views, node
 from raiden.transfer.state import (
     RouteState,
@@ -43,6 +42,7 @@ from raiden.transfer.state_change import (
     ActionChangeNodeNetworkState,
     ActionInitNode,
     ActionLeaveAllNetworks,
+    ActionPruneState,
     ActionTransferDirect,
     Block,
     ContractReceiveNewPaymentNetwork,
@@ -198,14 +198,26 @@ class RaidenService:
         self.pubkey = self.private_key.public_key.format(compressed=False)
         self.transport = transport
 
-        self.blockchain_events = BlockchainEvents()
+        self.blockchain_events = BlockchainEvents(
+            chain.client,
+            config['log_confirmation_blocks'],
+        )
         self.alarm = AlarmTask(chain)
+        # A transaction waiting for a channel operation is retried on the
+        # next alarm tick
+        self.transaction_manager = TransactionManager(self, self.alarm.wait_time)
         self.shutdown_timeout = config['shutdown_timeout']
         self.stop_event = Event()
         self.start_event = Event()
         self.chain.client.inject_stop_event(self.stop_event)
 
         self.wal = None
+        self.log_cache = None
+
+        # State changes that do not depend on the node state, these are
+        # dispatched together with a single copy of the state
+        self.deferred_state_changes = list()
+        self.deferred_block_number = None
 
         self.database_path = config['database_path']
         if self.database_path != ':memory:':
@@ -229,6 +241,8 @@ class RaidenService:
             endpoint_registration_event.join()
 
         self.event_poll_lock = gevent.lock.Semaphore()
+        # The last sample of the size of the live state
+        self.state_size = None
 
         self.start()
 
@@ -243,10 +257,29 @@ class RaidenService:
 
         # The database may be :memory:
         storage = sqlite.SQLiteStorage(self.database_path, serialize.PickleSerializer())
+        # With the state sharded by token network only the token network a
+        # state change is routed to is copied by the state manager
+        unchanged_substates = None
+        if self.config['shard_state_by_token_network']:
+            unchanged_substates = node.get_unchanged_substates
+
         self.wal, unapplied_events = wal.restore_from_latest_snapshot(
             node.state_transition,
             storage,
+            unchanged_substates,
+        )
+
+        # The logs fetched by the event poller are saved, so that the API
+        # queries don't have to fetch them again
+        self.log_cache = LogCache(
+            self.chain.client,
+            storage,
+            self.config['log_confirmation_blocks'],
         )
+        self.blockchain_events.log_cache = self.log_cache
+
+        # The transactions interrupted by the previous shutdown are sent again
+        self.transaction_manager.start()
 
         if self.wal.state_manager.current_state is None:
             block_number = self.chain.block_number()
@@ -262,10 +295,18 @@ class RaidenService:
             # channels
             last_log_block_number = None
         else:
-            # The `Block` state change is dispatched only after all the events
-            # for that given block have been processed, filters can be safely
-            # installed starting from this position without losing events.
-            last_log_block_number = views.block_number(self.wal.state_manager.current_state)
+            # The logs are fetched up to the log cursor, which is saved after
+            # all the events up to it have been processed.
+            log_cursor = storage.get_log_cursor()
+
+            if log_cursor is not None:
+                last_log_block_number = log_cursor + 1
+            else:
+                # The `Block` state change is dispatched only after all the
+                # events for that given block have been processed, filters can
+                # be safely installed starting from this position without
+                # losing events.
+                last_log_block_number = views.block_number(self.wal.state_manager.current_state)
 
         # The time the alarm task is started or the callbacks are installed doesn't
         # really matter.
@@ -315,6 +356,9 @@ class RaidenService:
         # contact the disconnected client
         gevent.wait(wait_for, timeout=self.shutdown_timeout)
 
+        # The pending transactions are saved and sent again on restart
+        self.transaction_manager.stop(timeout=self.shutdown_timeout)
+
         # Filters must be uninstalled after the alarm task has stopped. Since
         # the events are polled by an alarm task callback, if the filters are
         # uninstalled before the alarm task is fully stopped the callback
@@ -338,6 +382,9 @@ class RaidenService:
         return views.block_number(self.wal.state_manager.current_state)
 
     def handle_state_change(self, state_change, block_number=None):
+        # The deferred state changes happened first, keep the order in the WAL
+        self.flush_state_changes()
+
         log.debug('STATE CHANGE', node=pex(self.address), state_change=state_change)
 
         if block_number is None:
@@ -352,6 +399,46 @@ class RaidenService:
 
         return event_list
 
+    def handle_state_changes(self, state_changes, block_number=None):
+        """ Dispatch the `state_changes` in order as a single batch. """
+        for state_change in state_changes:
+            log.debug('STATE CHANGE', node=pex(self.address), state_change=state_change)
+
+        if block_number is None:
+            block_number = self.get_block_number()
+
+        event_list = self.wal.log_and_dispatch_batch(state_changes, block_number)
+
+        for event in event_list:
+            log.debug('EVENT', node=pex(self.address), chain_event=event)
+
+            on_raiden_event(self, event)
+
+        return event_list
+
+    def defer_state_change(self, state_change, block_number):
+        """ Queue a state change to be dispatched with the next batch.
+
+        Only state changes that are not used to compute other state changes,
+        and that don't require follow-up work once applied, may be deferred.
+        The batch is dispatched before any other state change is handled.
+        """
+        if self.deferred_block_number != block_number:
+            self.flush_state_changes()
+
+        self.deferred_state_changes.append(state_change)
+        self.deferred_block_number = block_number
+
+    def flush_state_changes(self):
+        """ Dispatch the deferred state changes. """
+        state_changes = self.deferred_state_changes
+        block_number = self.deferred_block_number
+
+        if state_changes:
+            self.deferred_state_changes = list()
+            self.deferred_block_number = None
+            self.handle_state_changes(state_changes, block_number)
+
     def set_node_network_state(self, node_address, network_state):
         state_change = ActionChangeNodeNetworkState(node_address, network_state)
         self.wal.log_and_dispatch(state_change, self.get_block_number())
@@ -384,7 +471,7 @@ class RaidenService:
         # expected side-effects are properly applied (introduced by the commit
         # 3686b3275ff7c0b669a6d5e2b34109c3bdf1921d)
         with self.event_poll_lock:
-            for event in self.blockchain_events.poll_blockchain_events():
+            for event in self.blockchain_events.poll_blockchain_events(current_block_number):
                 # These state changes will be procesed with a block_number
                 # which is /larger/ than the NodeState's block_number.
                 on_blockchain_event(self, event, current_block_number)
@@ -400,7 +487,64 @@ class RaidenService:
             # been processed but the Block state change has not been
             # dispatched.
             state_change = Block(current_block_number)
-            self.handle_state_change(state_change, current_block_number)
+            self.defer_state_change(state_change, current_block_number)
+            self.flush_state_changes()
+
+            self.wal.storage.write_log_cursor(
+                self.blockchain_events.get_confirmed_block_number(current_block_number),
+            )
+
+            self.prune_state(current_block_number)
+            self.report_state_size(current_block_number)
+
+    def prune_state(self, block_number):
+        """ Archive and remove from the live state the payment tasks and
+        channels which are finalized for longer than the retention period.
+        """
+        retention_blocks = self.config['state_retention_blocks']
+        if retention_blocks is None:
+            return
+
+        prune_block_number = block_number - retention_blocks
+        prunable = node.get_prunable_substates(
+            views.state_from_raiden(self),
+            prune_block_number,
+        )
+
+        if prunable:
+            # Channels are archived by their identifier, the token network is
+            # only part of the key in the live state
+            archived_states = [
+                (kind, key if kind == node.DEADLINE_PAYMENT else key[1], substate)
+                for kind, key, substate in prunable
+            ]
+            self.wal.storage.write_archived_states(block_number, archived_states)
+            self.handle_state_change(ActionPruneState(prune_block_number), block_number)
+
+            # The size of the state is sampled by `report_state_size`,
+            # computing it walks the whole state
+            log.debug(
+                'Pruned the live state',
+                node=pex(self.address),
+                block_number=block_number,
+                pruned=len(prunable),
+            )
+
+    def report_state_size(self, block_number):
+        """ Sample the size of the live state every
+        `state_size_report_blocks` blocks, to follow its growth over time.
+        """
+        report_blocks = self.config['state_size_report_blocks']
+        if not report_blocks or block_number % report_blocks:
+            return
+
+        self.state_size = views.get_state_size(views.state_from_raiden(self))
+        log.info(
+            'Live state size',
+            node=pex(self.address),
+            block_number=block_number,
+            **self.state_size,
+        )
 
     def sign(self, message):
         """ Sign message inplace. """
@@ -410,22 +554,21 @@ class RaidenService:
         message.sign(self.private_key, self.address)
 
     def install_payment_network_filters(self, payment_network_id, from_block=None):
-        proxies = get_relevant_proxies(
+        startup_sync = StartupSync(
             self.chain,
             self.address,
-            payment_network_id,
+            self.config['reveal_timeout'],
+            self.config['startup_sync']['pool_size'],
+            self.config['startup_sync']['retries'],
+            self.config['startup_sync']['retry_timeout'],
         )
+        proxies = startup_sync.get_relevant_proxies(payment_network_id)
 
         # Install the filters first to avoid missing changes, as a consequence
         # some events might be applied twice.
         self.blockchain_events.add_proxies_listeners(proxies, from_block)
 
-        token_network_list = list()
-        for manager in proxies.channel_managers:
-            manager_address = manager.address
-            netting_channel_proxies = proxies.channelmanager_nettingchannels[manager_address]
-            network = get_token_network_state_from_proxies(self, manager, netting_channel_proxies)
-            token_network_list.append(network)
+        token_network_list = startup_sync.get_token_network_states(proxies)
 
         payment_network = PaymentNetworkState(
             payment_network_id,
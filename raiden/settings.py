@@ -4,7 +4,11 @@ from eth_utils import denoms, int_to_big_endian
 
 INITIAL_PORT = 38647
 
-RPC_CACHE_TTL = 600
+DEFAULT_RPC_BATCH_WINDOW = 0
+DEFAULT_RPC_BATCH_MAX_SIZE = 100
+# The AlarmTask updates the head every 0.5 seconds
+DEFAULT_RPC_HEAD_MAX_AGE = 1.0
+DEFAULT_RPC_POLL_INTERVAL = 0.5
 CACHE_TTL = 60
 ESTIMATED_BLOCK_TIME = 7
 GAS_LIMIT = 10 * 10**6
@@ -15,6 +19,13 @@ DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF = 5
 DEFAULT_TRANSPORT_THROTTLE_CAPACITY = 10.
 DEFAULT_TRANSPORT_THROTTLE_FILL_RATE = 10.
 DEFAULT_TRANSPORT_RETRY_INTERVAL = 1.
+DEFAULT_TRANSPORT_DELIVERED_BATCH_SIZE = 64
+DEFAULT_TRANSPORT_DELIVERED_BATCH_TIMEOUT = 0.05
+DEFAULT_TRANSPORT_INGRESS_QUEUE_SIZE = 1024
+DEFAULT_TRANSPORT_INGRESS_WORKERS = 4
+DEFAULT_TRANSPORT_INGRESS_POLICY = 'drop_newest'
+DEFAULT_TRANSPORT_HEALTHCHECK_SPACING = 0.01
+DEFAULT_TRANSPORT_HEALTHCHECK_BATCH_WINDOW = 0.1
 
 DEFAULT_REVEAL_TIMEOUT = 10
 DEFAULT_SETTLE_TIMEOUT = DEFAULT_REVEAL_TIMEOUT * 9
@@ -24,6 +35,14 @@ DEFAULT_JOINABLE_FUNDS_TARGET = 0.4
 DEFAULT_INITIAL_CHANNEL_TARGET = 3
 DEFAULT_WAIT_FOR_SETTLE = True
 DEFAULT_NUMBER_OF_CONFIRMATIONS_BLOCK = 5
+DEFAULT_LOG_CONFIRMATION_BLOCKS = 0
+DEFAULT_STATE_RETENTION_BLOCKS = 100
+DEFAULT_STATE_SIZE_REPORT_BLOCKS = 100
+DEFAULT_STARTUP_SYNC_POOL_SIZE = 16
+DEFAULT_STARTUP_SYNC_RETRIES = 3
+DEFAULT_STARTUP_SYNC_RETRY_TIMEOUT = 1.
+DEFAULT_CONNECTION_MANAGER_POOL_SIZE = 8
+DEFAULT_TRANSACTION_MAX_RETRY_TIMEOUT = 60
 
 DEFAULT_NAT_KEEPALIVE_RETRIES = 5
 DEFAULT_NAT_KEEPALIVE_TIMEOUT = 5
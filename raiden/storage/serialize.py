@@ -1,12 +1,33 @@
 # -*- coding: utf-8 -*-
+import io
 import pickle
 
+from raiden.utils.interning import ADDRESS_LENGTH, intern_address
+
+
+class InterningPickler(pickle.Pickler):
+    """ Saves the addresses as persistent ids, so that the unpickler can
+    intern them.
+    """
+
+    def persistent_id(self, obj):
+        if type(obj) is bytes and len(obj) == ADDRESS_LENGTH:
+            return obj
+        return None
+
+
+class InterningUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        return intern_address(pid)
+
 
 class PickleSerializer:
     @staticmethod
     def serialize(transaction):
-        return pickle.dumps(transaction, 4)
+        data = io.BytesIO()
+        InterningPickler(data, 4).dump(transaction)
+        return data.getvalue()
 
     @staticmethod
     def deserialize(data):
-        return pickle.loads(data)
+        return InterningUnpickler(io.BytesIO(data)).load()
@@ -39,6 +39,61 @@ class SQLiteStorage:
                 '    FOREIGN KEY(source_statechange_id) REFERENCES state_changes(identifier)'
                 ')',
             )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS archived_state ('
+                '    identifier INTEGER PRIMARY KEY, '
+                '    kind TEXT NOT NULL, '
+                '    key BINARY NOT NULL, '
+                '    block_number INTEGER NOT NULL, '
+                '    data BINARY'
+                ')',
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS archived_state_key '
+                'ON archived_state(kind, key)',
+            )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS log_cursor ('
+                '    identifier INTEGER PRIMARY KEY, '
+                '    block_number INTEGER NOT NULL'
+                ')',
+            )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS pending_transactions ('
+                '    identifier INTEGER PRIMARY KEY AUTOINCREMENT, '
+                '    data BINARY'
+                ')',
+            )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS pending_transaction_hashes ('
+                '    identifier INTEGER PRIMARY KEY, '
+                '    pending_transaction_id INTEGER NOT NULL, '
+                '    transaction_hash BINARY NOT NULL, '
+                '    FOREIGN KEY(pending_transaction_id) '
+                '        REFERENCES pending_transactions(identifier) ON DELETE CASCADE'
+                ')',
+            )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS blockchain_logs ('
+                '    contract_address BINARY NOT NULL, '
+                '    block_number INTEGER NOT NULL, '
+                '    log_index INTEGER NOT NULL, '
+                '    event_id TEXT, '
+                '    data BINARY, '
+                '    PRIMARY KEY(contract_address, block_number, log_index)'
+                ')',
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS blockchain_logs_event '
+                'ON blockchain_logs(contract_address, event_id, block_number)',
+            )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS blockchain_logs_range ('
+                '    contract_address BINARY PRIMARY KEY, '
+                '    from_block INTEGER NOT NULL, '
+                '    to_block INTEGER NOT NULL'
+                ')',
+            )
 
         # When writting to a table where the primary key is the identifier and we want
         # to return said identifier we use cursor.lastrowid, which uses sqlite's last_insert_rowid
@@ -68,6 +123,26 @@ class SQLiteStorage:
 
         return last_id
 
+    def write_state_changes(self, state_changes):
+        """ Save the `state_changes` in a single transaction and return their
+        identifiers, in the same order.
+        """
+        serialized_data = [
+            self.serializer.serialize(state_change)
+            for state_change in state_changes
+        ]
+
+        identifiers = list()
+        with self.write_lock, self.conn:
+            for data in serialized_data:
+                cursor = self.conn.execute(
+                    'INSERT INTO state_changes(identifier, data) VALUES(null, ?)',
+                    (data,),
+                )
+                identifiers.append(cursor.lastrowid)
+
+        return identifiers
+
     def write_state_snapshot(self, statechange_id, snapshot):
         # TODO: Snapshotting is not yet implemented. This is just skeleton code
         # (Issue #682)
@@ -108,6 +183,224 @@ class SQLiteStorage:
                 events_data,
             )
 
+    def write_events_batch(self, block_number, state_changes_events):
+        """ Save the events of multiple state changes in a single transaction.
+
+        Args:
+            block_number: Block number at which the state changes were applied.
+            state_changes_events: List of tuples (state_change_id, events).
+        """
+        events_data = [
+            (None, state_change_id, block_number, self.serializer.serialize(event))
+            for state_change_id, events in state_changes_events
+            for event in events
+        ]
+
+        with self.write_lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO state_events('
+                '   identifier, source_statechange_id, block_number, data'
+                ') VALUES(?, ?, ?, ?)',
+                events_data,
+            )
+
+    def write_archived_states(self, block_number, archived_states):
+        """ Save the states removed from the live node state.
+
+        Args:
+            block_number: Block number at which the states were removed.
+            archived_states: List of tuples (kind, key, state), `key` is the
+                binary identifier of the state, e.g. the channel identifier
+                or the secrethash of a payment.
+        """
+        archived_data = [
+            (None, kind, key, block_number, self.serializer.serialize(state))
+            for kind, key, state in archived_states
+        ]
+
+        with self.write_lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO archived_state('
+                '   identifier, kind, key, block_number, data'
+                ') VALUES(?, ?, ?, ?, ?)',
+                archived_data,
+            )
+
+    def get_archived_state(self, kind, key) -> Optional[Tuple[int, Any]]:
+        """ Return the tuple (block_number, state) of the latest archived state
+        with the given `kind` and `key`, or None.
+        """
+        cursor = self.conn.execute(
+            'SELECT block_number, data FROM archived_state '
+            'WHERE kind = ? AND key = ? ORDER BY identifier DESC LIMIT 1',
+            (kind, key),
+        )
+        entry = cursor.fetchone()
+
+        if entry is None:
+            return None
+
+        return (entry[0], self.serializer.deserialize(entry[1]))
+
+    def write_log_cursor(self, block_number):
+        """ Save the number of the last block for which the blockchain logs
+        were processed.
+        """
+        with self.write_lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO log_cursor(identifier, block_number) VALUES(1, ?)',
+                (block_number,),
+            )
+
+    def get_log_cursor(self) -> Optional[int]:
+        """ Return the block number saved by `write_log_cursor` or None. """
+        cursor = self.conn.execute('SELECT block_number FROM log_cursor WHERE identifier = 1')
+        entry = cursor.fetchone()
+
+        if entry is None:
+            return None
+
+        return entry[0]
+
+    def write_pending_transaction(self, event):
+        """ Save the contract send `event` until its transaction is done and
+        return its identifier.
+        """
+        serialized_data = self.serializer.serialize(event)
+
+        with self.write_lock, self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO pending_transactions(identifier, data) VALUES(null, ?)',
+                (serialized_data,),
+            )
+            last_id = cursor.lastrowid
+
+        return last_id
+
+    def delete_pending_transaction(self, identifier):
+        with self.write_lock, self.conn:
+            self.conn.execute(
+                'DELETE FROM pending_transactions WHERE identifier = ?',
+                (identifier,),
+            )
+
+    def write_pending_transaction_hash(self, identifier, transaction_hash):
+        """ Save the hash of a transaction sent for the pending transaction
+        `identifier`, the hashes are deleted with it.
+        """
+        with self.write_lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO pending_transaction_hashes('
+                '    identifier, pending_transaction_id, transaction_hash'
+                ') VALUES(null, ?, ?)',
+                (identifier, transaction_hash),
+            )
+
+    def get_pending_transaction_hashes(self, identifier):
+        """ Return the hashes of the transactions sent for the pending
+        transaction `identifier`, in the order they were sent.
+        """
+        cursor = self.conn.execute(
+            'SELECT transaction_hash FROM pending_transaction_hashes '
+            'WHERE pending_transaction_id = ? ORDER BY identifier',
+            (identifier,),
+        )
+
+        return [entry[0] for entry in cursor.fetchall()]
+
+    def get_pending_transactions(self):
+        """ Return the list of (identifier, event) of the pending transactions,
+        in the order they were saved.
+        """
+        cursor = self.conn.execute(
+            'SELECT identifier, data FROM pending_transactions ORDER BY identifier',
+        )
+
+        return [
+            (entry[0], self.serializer.deserialize(entry[1]))
+            for entry in cursor.fetchall()
+        ]
+
+    def write_blockchain_logs(self, contract_addresses, from_block, to_block, logs):
+        """ Save the `logs` of the `contract_addresses` fetched for the blocks
+        `from_block` to `to_block`, inclusive.
+
+        `logs` is a list of (contract_address, block_number, log_index,
+        event_id, log) tuples. The cached range of a contract is extended if
+        the new range is contiguous, otherwise it is replaced by the new
+        range.
+        """
+        serialized_logs = [
+            (contract_address, block_number, log_index, event_id, self.serializer.serialize(data))
+            for contract_address, block_number, log_index, event_id, data in logs
+        ]
+
+        with self.write_lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO blockchain_logs('
+                '    contract_address, block_number, log_index, event_id, data'
+                ') VALUES(?, ?, ?, ?, ?)',
+                serialized_logs,
+            )
+
+            for contract_address in contract_addresses:
+                cursor = self.conn.execute(
+                    'SELECT from_block, to_block FROM blockchain_logs_range '
+                    'WHERE contract_address = ?',
+                    (contract_address,),
+                )
+                entry = cursor.fetchone()
+
+                new_range = (from_block, to_block)
+                if entry is not None:
+                    cached_from, cached_to = entry
+                    contiguous = from_block <= cached_to + 1 and cached_from <= to_block + 1
+
+                    if contiguous:
+                        new_range = (min(from_block, cached_from), max(to_block, cached_to))
+                    elif to_block < cached_from:
+                        continue
+
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO blockchain_logs_range('
+                    '    contract_address, from_block, to_block'
+                    ') VALUES(?, ?, ?)',
+                    (contract_address, *new_range),
+                )
+
+    def get_blockchain_logs_range(self, contract_address) -> Optional[Tuple[int, int]]:
+        """ Return the range of blocks for which the logs of
+        `contract_address` are cached, or None.
+        """
+        cursor = self.conn.execute(
+            'SELECT from_block, to_block FROM blockchain_logs_range WHERE contract_address = ?',
+            (contract_address,),
+        )
+        return cursor.fetchone()
+
+    def get_blockchain_logs(self, contract_address, from_block, to_block, event_ids=None):
+        """ Return the cached logs of `contract_address` for the blocks
+        `from_block` to `to_block`, inclusive, in the order they were
+        emitted. If `event_ids` is given, only the logs with one of these
+        event ids are returned.
+        """
+        query = (
+            'SELECT data FROM blockchain_logs WHERE contract_address = ? '
+            'AND block_number BETWEEN ? AND ?'
+        )
+        arguments = [contract_address, from_block, to_block]
+
+        if event_ids is not None:
+            query += ' AND event_id IN ({})'.format(', '.join('?' * len(event_ids)))
+            arguments.extend(event_ids)
+
+        cursor = self.conn.execute(query + ' ORDER BY block_number, log_index', arguments)
+
+        return [
+            self.serializer.deserialize(entry[0])
+            for entry in cursor.fetchall()
+        ]
+
     def get_state_snapshot(self) -> Optional[Tuple[int, Any]]:
         """ Return the tuple of (last_applied_state_change_id, snapshot) or None"""
         cursor = self.conn.execute('SELECT statechange_id, data from state_snapshot')
@@ -1,15 +1,82 @@
 # -*- coding: utf-8 -*-
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+
+from gevent.event import Event
 
 from raiden.transfer.architecture import StateManager
+from raiden.transfer.state_change import (
+    ActionChangeNodeNetworkState,
+    Block,
+    ContractReceiveChannelNew,
+)
 
 InternalEvent = namedtuple(
     'InternalEvent',
     ('identifier', 'state_change_id', 'block_number', 'event_object'),
 )
 
+TOPIC_BLOCK = ('block', )
+
+
+def topic_channel(channel_identifier):
+    return ('channel', channel_identifier)
+
+
+def topic_token_network(token_network_identifier):
+    return ('token_network', token_network_identifier)
+
+
+def topic_node(node_address):
+    return ('node', node_address)
+
+
+def state_change_topics(state_change):
+    """ Return the topics of the subscriptions notified when `state_change`
+    is applied.
+    """
+    topics = list()
+
+    if isinstance(state_change, Block):
+        topics.append(TOPIC_BLOCK)
+
+    elif isinstance(state_change, ContractReceiveChannelNew):
+        channel_state = state_change.channel_state
+        topics.append(topic_channel(channel_state.identifier))
+        topics.append(topic_node(channel_state.partner_state.address))
 
-def restore_from_latest_snapshot(transition_function, storage):
+    elif isinstance(state_change, ActionChangeNodeNetworkState):
+        topics.append(topic_node(state_change.node_address))
+
+    channel_identifier = getattr(state_change, 'channel_identifier', None)
+    if channel_identifier is not None:
+        topics.append(topic_channel(channel_identifier))
+
+    token_network_identifier = getattr(state_change, 'token_network_identifier', None)
+    if token_network_identifier is not None:
+        topics.append(topic_token_network(token_network_identifier))
+
+    return topics
+
+
+class Subscription:
+    """ Notified when a state change for one of its topics is applied. """
+
+    __slots__ = ('topics', 'event')
+
+    def __init__(self, topics):
+        self.topics = topics
+        self.event = Event()
+
+    def wait(self, timeout=None):
+        """ Block until a state change is applied for one of the topics,
+        return immediately if one was applied since the last call.
+        """
+        notified = self.event.wait(timeout)
+        self.event.clear()
+        return notified
+
+
+def restore_from_latest_snapshot(transition_function, storage, unchanged_substates=None):
     events = list()
     snapshot = storage.get_state_snapshot()
 
@@ -26,11 +93,12 @@ def restore_from_latest_snapshot(transition_function, storage):
             to_identifier='latest',
         )
 
-    state_manager = StateManager(transition_function, state)
+    state_manager = StateManager(transition_function, state, unchanged_substates)
     wal = WriteAheadLog(state_manager, storage)
 
-    for state_change in unapplied_state_changes:
-        events.extend(state_manager.dispatch(state_change))
+    # Replay all the state changes with a single copy of the state
+    for state_change_events in state_manager.dispatch_batch(unapplied_state_changes):
+        events.extend(state_change_events)
 
     return wal, events
 
@@ -41,6 +109,40 @@ class WriteAheadLog:
         self.state_change_id = None
         self.storage = storage
 
+        self.topics_to_subscriptions = defaultdict(set)
+
+    def subscribe(self, topics) -> Subscription:
+        """ Subscribe to the state changes of the given `topics`.
+
+        The subscription must be created before the state is inspected,
+        otherwise a state change applied in between is missed.
+        """
+        subscription = Subscription(list(topics))
+
+        for topic in subscription.topics:
+            self.topics_to_subscriptions[topic].add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscriptions = self.topics_to_subscriptions.get(topic)
+
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+
+                if not subscriptions:
+                    del self.topics_to_subscriptions[topic]
+
+    def notify(self, state_changes):
+        if not self.topics_to_subscriptions:
+            return
+
+        for state_change in state_changes:
+            for topic in state_change_topics(state_change):
+                for subscription in self.topics_to_subscriptions.get(topic, ()):
+                    subscription.event.set()
+
     def log_and_dispatch(self, state_change, block_number):
         """ Log and apply a state change.
 
@@ -57,6 +159,40 @@ class WriteAheadLog:
         self.state_change_id = state_change_id
         self.storage.write_events(state_change_id, block_number, events)
 
+        self.notify([state_change])
+
+        return events
+
+    def log_and_dispatch_batch(self, state_changes, block_number):
+        """ Log and apply a list of state changes.
+
+        The state changes are written to the write-ahead-log in one
+        transaction, each with its own identifier so that they are replayed
+        individually, and then applied in order with a single copy of the
+        state.
+
+        Events produced by applying the state changes are also saved, with
+        the identifier of the state change that produced them.
+        """
+        if not state_changes:
+            return list()
+
+        state_change_ids = self.storage.write_state_changes(state_changes)
+
+        events_per_state_change = self.state_manager.dispatch_batch(state_changes)
+
+        self.state_change_id = state_change_ids[-1]
+        self.storage.write_events_batch(
+            block_number,
+            list(zip(state_change_ids, events_per_state_change)),
+        )
+
+        self.notify(state_changes)
+
+        events = list()
+        for state_change_events in events_per_state_change:
+            events.extend(state_change_events)
+
         return events
 
     def snapshot(self):
@@ -48,7 +48,7 @@ class AlarmTask(gevent.Greenlet):
             self.callbacks.remove(callback)
 
     def _run(self):  # pylint: disable=method-hidden
-        self.last_block_number = self.chain.block_number()
+        self.last_block_number = self.chain.client.head.update()
         log.debug('starting block number', block_number=self.last_block_number)
 
         sleep_time = 0
@@ -76,7 +76,9 @@ class AlarmTask(gevent.Greenlet):
         self.callbacks = list()
 
     def poll_for_new_block(self):
-        current_block = self.chain.block_number()
+        # Publishes the block number to all the users of the client, which
+        # don't have to fetch it
+        current_block = self.chain.client.head.update()
 
         if current_block > self.last_block_number + 1:
             difference = current_block - self.last_block_number - 1
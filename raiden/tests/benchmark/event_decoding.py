@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+A benchmark of the decoding of the contract events, as done by the event
+poller when catching up with the blockchain.
+
+The logs are generated for the events of the netting channel, channel
+manager and registry contracts, and decoded both with the precomputed
+decoders and with the previous approach, which built the topic to ABI table
+and extracted the argument types for every log.
+"""
+import os
+import random
+import time
+
+import click
+from eth_abi import encode_abi, encode_single
+from eth_utils import encode_hex, event_abi_to_log_topic
+from web3.utils.abi import filter_by_type
+from web3.utils.events import get_event_data
+
+from raiden.blockchain.abi import (
+    CONTRACT_CHANNEL_MANAGER,
+    CONTRACT_MANAGER,
+    CONTRACT_NETTING_CHANNEL,
+    CONTRACT_REGISTRY,
+)
+from raiden.network.rpc.smartcontract_proxy import decode_event
+
+
+# The logs of a node refer to a limited number of participants and contracts
+ADDRESSES = [os.urandom(20) for _ in range(200)]
+
+
+def random_value(type_str):
+    if type_str == 'address':
+        return random.choice(ADDRESSES)
+    if type_str.startswith('bytes'):
+        return os.urandom(int(type_str[len('bytes'):] or 32))
+    if type_str.startswith('uint'):
+        return random.randint(0, 2 ** 64)
+    if type_str == 'bool':
+        return random.choice((True, False))
+
+    raise ValueError('Unsupported type {}'.format(type_str))
+
+
+def make_log(event_abi, block_number, log_index):
+    topics = [event_abi_to_log_topic(event_abi)]
+    data_types = list()
+    data_values = list()
+
+    for argument in event_abi['inputs']:
+        value = random_value(argument['type'])
+
+        if argument['indexed']:
+            topics.append(encode_single(argument['type'], value))
+        else:
+            data_types.append(argument['type'])
+            data_values.append(value)
+
+    return {
+        'address': encode_hex(random.choice(ADDRESSES)),
+        'topics': [encode_hex(topic) for topic in topics],
+        'data': encode_hex(encode_abi(data_types, data_values)),
+        'blockNumber': block_number,
+        'blockHash': encode_hex(os.urandom(32)),
+        'logIndex': log_index,
+        'transactionHash': encode_hex(os.urandom(32)),
+        'transactionIndex': 0,
+    }
+
+
+def decode_event_uncached(abi, log):
+    """ The decoding before the decoders were precomputed. """
+    log['topics'][0] = bytes.fromhex(log['topics'][0][2:])
+    topic_to_event_abi = {
+        event_abi_to_log_topic(event_abi): event_abi
+        for event_abi in filter_by_type('event', abi)
+    }
+    return get_event_data(topic_to_event_abi[log['topics'][0]], log)
+
+
+def run(decode, abis_logs):
+    start = time.perf_counter()
+
+    for abi, log in abis_logs:
+        # the decoding changes the topics in place
+        decode(abi, dict(log, topics=list(log['topics'])))
+
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--logs', default=100000, help='Number of logs to decode.')
+@click.option('--seed', default=0, help='Seed used to generate the logs.')
+def main(logs, seed):
+    random.seed(seed)
+
+    abis = [
+        CONTRACT_MANAGER.get_contract_abi(contract_name)
+        for contract_name in (
+            CONTRACT_NETTING_CHANNEL,
+            CONTRACT_CHANNEL_MANAGER,
+            CONTRACT_REGISTRY,
+        )
+    ]
+    abis_events = [
+        (abi, event_abi)
+        for abi in abis
+        for event_abi in filter_by_type('event', abi)
+    ]
+
+    abis_logs = list()
+    for number in range(logs):
+        abi, event_abi = random.choice(abis_events)
+        abis_logs.append((abi, make_log(event_abi, number // 10, number % 10)))
+
+    uncached = run(decode_event_uncached, abis_logs)
+    precomputed = run(decode_event, abis_logs)
+
+    print('logs:          {}'.format(logs))
+    print('uncached:      {:.3f}s ({:.0f} logs/s)'.format(uncached, logs / uncached))
+    print('precomputed:   {:.3f}s ({:.0f} logs/s)'.format(precomputed, logs / precomputed))
+    print('speedup:       {:.2f}x'.format(uncached / precomputed))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
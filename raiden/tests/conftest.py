@@ -15,10 +15,14 @@ from raiden.utils.cli import LogLevelConfigType
 from raiden.exceptions import RaidenShuttingDown
 from raiden.tests.fixtures.variables import *  # noqa: F401,F403
 from raiden.log_config import configure_logging
+from raiden.transfer import channel
 
 gevent.get_hub().SYSTEM_ERROR = BaseException
 gevent.get_hub().NOT_ERROR = (gevent.GreenletExit, SystemExit, RaidenShuttingDown)
 
+# The tests run the debug checks of the state transitions
+channel.CHECK_AMOUNT_LOCKED_CONSISTENCY = True
+
 
 CATCH_LOG_HANDLER_NAME = 'catch_log_handler'
 
@@ -4,11 +4,13 @@ import random
 import pytest
 
 from raiden.messages import (
+    Bundle,
     decode,
+    DeliveredBatch,
     Processed,
     Ping,
 )
-from raiden.constants import UINT256_MAX, UINT64_MAX
+from raiden.constants import UDP_MAX_MESSAGE_SIZE, UINT256_MAX, UINT64_MAX
 from raiden.utils import sha3
 from raiden.tests.utils.messages import (
     make_direct_transfer,
@@ -63,6 +65,54 @@ def test_processed():
     assert sha3(decoded_processed_message.encode()) == sha3(data)
 
 
+@pytest.mark.parametrize('number_of_identifiers', [0, 1, 64])
+def test_delivered_batch(number_of_identifiers):
+    message_identifiers = [
+        random.randint(0, UINT64_MAX)
+        for _ in range(number_of_identifiers)
+    ]
+    delivered_batch = DeliveredBatch(message_identifiers)
+    delivered_batch.sign(PRIVKEY, ADDRESS)
+
+    data = delivered_batch.encode()
+    decoded_delivered_batch = decode(data)
+
+    assert isinstance(decoded_delivered_batch, DeliveredBatch)
+    assert decoded_delivered_batch.delivered_message_identifiers == message_identifiers
+    assert decoded_delivered_batch.sender == ADDRESS
+    assert decoded_delivered_batch == delivered_batch
+    assert decode(data[:-1]) is None
+
+
+def test_delivered_batch_fits_udp_packet():
+    max_identifiers = DeliveredBatch.max_identifiers_for(UDP_MAX_MESSAGE_SIZE)
+    delivered_batch = DeliveredBatch(range(max_identifiers))
+    delivered_batch.sign(PRIVKEY, ADDRESS)
+
+    assert len(delivered_batch.encode()) <= UDP_MAX_MESSAGE_SIZE
+
+
+def test_bundle():
+    ping = Ping(nonce=0)
+    ping.sign(PRIVKEY, ADDRESS)
+    direct_transfer = make_direct_transfer()
+    direct_transfer.sign(PRIVKEY, ADDRESS)
+
+    messages_data = [ping.encode(), direct_transfer.encode()]
+    bundle = Bundle(messages_data)
+    data = bundle.encode()
+
+    assert len(data) == Bundle.size_for(messages_data)
+
+    decoded_bundle = decode(data)
+    assert isinstance(decoded_bundle, Bundle)
+    assert decoded_bundle.messages_data == messages_data
+    assert decode(decoded_bundle.messages_data[1]) == direct_transfer
+
+    assert decode(data[:-1]) is None
+    assert decode(Bundle([data]).encode()) is None
+
+
 @pytest.mark.parametrize('payment_identifier', [0, UINT64_MAX])
 @pytest.mark.parametrize('nonce', [1, UINT64_MAX])
 @pytest.mark.parametrize('transferred_amount', [0, UINT256_MAX])
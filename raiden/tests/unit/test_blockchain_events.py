@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+from eth_utils import encode_hex, event_abi_to_log_topic, to_normalized_address
+
+from raiden.blockchain.events import BlockchainEvents
+from raiden.blockchain.log_cache import LogCache
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.tests.utils import factories
+
+EVENT_ABI = {
+    'anonymous': False,
+    'inputs': [{'indexed': False, 'name': 'value', 'type': 'uint256'}],
+    'name': 'Counter',
+    'type': 'event',
+}
+OTHER_EVENT_ABI = {
+    'anonymous': False,
+    'inputs': [],
+    'name': 'Other',
+    'type': 'event',
+}
+ABI = [EVENT_ABI, OTHER_EVENT_ABI]
+COUNTER_TOPIC = encode_hex(event_abi_to_log_topic(EVENT_ABI))
+OTHER_TOPIC = encode_hex(event_abi_to_log_topic(OTHER_EVENT_ABI))
+
+
+class Client:
+    """ Answers eth_getLogs from a list of logs and records the queries. """
+
+    def __init__(self):
+        self.logs = list()
+        self.queries = list()
+        self.latest_block = 0
+
+    def block_number(self):
+        return self.latest_block
+
+    def add_log(self, address, block_number, log_index, topic=COUNTER_TOPIC):
+        self.logs.append({
+            'address': to_normalized_address(address),
+            'topics': [topic],
+            'data': '0x{:064x}'.format(block_number * 10 + log_index),
+            'blockNumber': block_number,
+            'blockHash': '0x' + '00' * 32,
+            'logIndex': log_index,
+            'transactionHash': '0x' + '00' * 32,
+            'transactionIndex': 0,
+        })
+
+    def get_logs(self, contract_addresses, from_block, to_block):
+        self.queries.append((sorted(contract_addresses), from_block, to_block))
+        addresses = {to_normalized_address(address) for address in contract_addresses}
+
+        # the decoding changes the topics in place
+        return [
+            dict(log_event, topics=list(log_event['topics']))
+            for log_event in self.logs
+            if log_event['address'] in addresses
+            if from_block <= log_event['blockNumber'] <= to_block
+        ]
+
+
+def poll_values(blockchain_events, block_number):
+    return [
+        (event.originating_contract, event.event_data['args']['value'])
+        for event in blockchain_events.poll_blockchain_events(block_number)
+    ]
+
+
+def test_poll_blockchain_events():
+    client = Client()
+    blockchain_events = BlockchainEvents(client, confirmation_blocks=2)
+
+    address1 = factories.make_address()
+    address2 = factories.make_address()
+    blockchain_events.add_event_listener('first', address1, [COUNTER_TOPIC], ABI, 1)
+    blockchain_events.add_event_listener('second', address2, None, ABI, 3)
+
+    client.add_log(address2, 4, 0)
+    client.add_log(address1, 4, 1)
+    client.add_log(address1, 2, 0)
+    client.add_log(address1, 3, 0, topic=OTHER_TOPIC)
+    client.add_log(address1, 6, 0)
+
+    # the logs are sorted and filtered by topic, the unconfirmed logs are
+    # not fetched
+    assert poll_values(blockchain_events, 7) == [
+        (address1, 20),
+        (address2, 40),
+        (address1, 41),
+    ]
+    assert sorted(client.queries, key=lambda query: query[1]) == [
+        ([address1], 1, 5),
+        ([address2], 3, 5),
+    ]
+
+    # a listener added without a start block shares the next query
+    address3 = factories.make_address()
+    blockchain_events.add_event_listener('third', address3, None, ABI, None)
+    client.add_log(address3, 6, 1)
+
+    client.queries = list()
+    assert poll_values(blockchain_events, 8) == [
+        (address1, 60),
+        (address3, 61),
+    ]
+    assert client.queries == [
+        (sorted([address1, address2, address3]), 6, 6),
+    ]
+
+    # the listeners keep their position while they are not polled
+    event_listeners = blockchain_events.event_listeners
+    blockchain_events.event_listeners = list()
+    assert poll_values(blockchain_events, 9) == []
+
+    client.add_log(address2, 7, 0)
+    blockchain_events.event_listeners = event_listeners
+    assert poll_values(blockchain_events, 10) == [(address2, 70)]
+
+
+def test_log_cache():
+    client = Client()
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    log_cache = LogCache(client, storage, 2)
+
+    blockchain_events = BlockchainEvents(client, confirmation_blocks=2)
+    blockchain_events.log_cache = log_cache
+
+    address = factories.make_address()
+    blockchain_events.add_event_listener('contract', address, None, ABI, 5)
+
+    for block_number in range(1, 10):
+        client.add_log(address, block_number, 0)
+    client.add_log(address, 3, 1, topic=OTHER_TOPIC)
+
+    # the poller populates the cache
+    client.latest_block = 7
+    assert len(poll_values(blockchain_events, 7)) == 1
+    assert storage.get_blockchain_logs_range(address) == (5, 5)
+
+    # only the missing confirmed blocks are fetched and cached
+    client.latest_block = 9
+    client.queries = list()
+    logs = log_cache.get_logs(address, None, 0, 'latest')
+    assert [(log['blockNumber'], log['logIndex']) for log in logs] == [
+        (1, 0), (2, 0), (3, 0), (3, 1), (4, 0), (5, 0), (6, 0), (7, 0), (8, 0), (9, 0),
+    ]
+    assert client.queries == [
+        ([address], 0, 4),
+        ([address], 6, 7),
+        ([address], 8, 9),
+    ]
+    assert storage.get_blockchain_logs_range(address) == (0, 7)
+
+    client.queries = list()
+    logs = log_cache.get_logs(address, [OTHER_TOPIC], 2, 6)
+    assert [(log['blockNumber'], log['logIndex']) for log in logs] == [(3, 1)]
+    assert client.queries == []
@@ -555,6 +555,83 @@ def test_channelstate_send_lockedtransfer():
     assert_partner_state(channel_state.partner_state, channel_state.our_state, partner_model2)
 
 
+def test_channelstate_amount_locked_running_totals():
+    """The locked and unlocked totals must follow the pending locks."""
+    our_model1, _ = create_model(70)
+    partner_model1, _ = create_model(100)
+    channel_state = create_channel_from_models(our_model1, partner_model1)
+    our_state = channel_state.our_state
+
+    lock_amounts = [10, 20]
+    lock_expiration = 10
+    lock_secrets = [sha3(b'test_running_totals_1'), sha3(b'test_running_totals_2')]
+    transfer_target = factories.make_address()
+    transfer_initiator = factories.make_address()
+
+    for payment_identifier, (lock_amount, lock_secret) in enumerate(
+            zip(lock_amounts, lock_secrets),
+    ):
+        channel.send_lockedtransfer(
+            channel_state,
+            transfer_initiator,
+            transfer_target,
+            lock_amount,
+            random.randint(0, UINT64_MAX),
+            payment_identifier,
+            lock_expiration,
+            sha3(lock_secret),
+        )
+
+    assert our_state.locked_amount == 30
+    assert our_state.unlocked_amount == 0
+    assert channel.get_amount_locked(our_state) == 30
+    assert channel.is_amount_locked_consistent(our_state)
+
+    first_secret = lock_secrets[0]
+    channel.register_secret(channel_state, first_secret, sha3(first_secret))
+    assert our_state.locked_amount == 20
+    assert our_state.unlocked_amount == 10
+    assert channel.get_amount_locked(our_state) == 30
+    assert channel.is_amount_locked_consistent(our_state)
+
+    channel.send_unlock(
+        channel_state,
+        random.randint(0, UINT64_MAX),
+        0,
+        first_secret,
+        sha3(first_secret),
+    )
+    assert our_state.locked_amount == 20
+    assert our_state.unlocked_amount == 0
+    assert channel.get_amount_locked(our_state) == 20
+    assert channel.is_amount_locked_consistent(our_state)
+
+
+def test_channelstate_amount_locked_debug_check(monkeypatch):
+    """With the debug switch on, a lock change must check the running totals."""
+    monkeypatch.setattr(channel, 'CHECK_AMOUNT_LOCKED_CONSISTENCY', True)
+
+    our_model1, _ = create_model(70)
+    partner_model1, _ = create_model(100)
+    channel_state = create_channel_from_models(our_model1, partner_model1)
+
+    # a running total out of sync with the locks
+    channel_state.our_state.locked_amount = 5
+
+    lock_secret = sha3(b'test_amount_locked_debug_check')
+    with pytest.raises(AssertionError):
+        channel.send_lockedtransfer(
+            channel_state,
+            factories.make_address(),
+            factories.make_address(),
+            10,
+            random.randint(0, UINT64_MAX),
+            1,
+            10,
+            sha3(lock_secret),
+        )
+
+
 def test_channelstate_send_direct_transfer():
     """Sending a direct transfer must update the participant state.
 
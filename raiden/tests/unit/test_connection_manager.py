@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import gevent
+from gevent.event import Event
+
+from raiden import connection_manager as connection_manager_module
+from raiden.connection_manager import ConnectionManager
+from raiden.tests.utils import factories
+
+
+class RaidenService:
+    def __init__(self, pool_size):
+        self.address = factories.make_address()
+        self.config = {'connection_manager': {'pool_size': pool_size}}
+
+
+class RaidenAPI:
+    def __init__(self):
+        self.event_mined = Event()
+        self.running = 0
+        self.max_running = 0
+        self.deposits = dict()
+
+    def wait_for_mining(self):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.event_mined.wait()
+        self.running -= 1
+
+    def channel_open(self, registry_address, token_address, partner):
+        self.wait_for_mining()
+
+    def set_total_channel_deposit(self, registry_address, token_address, partner, deposit):
+        self.wait_for_mining()
+        self.deposits[partner] = deposit
+
+
+def patch_views(monkeypatch, participants, api):
+    monkeypatch.setattr(connection_manager_module.views, 'state_from_raiden', lambda raiden: None)
+    monkeypatch.setattr(
+        connection_manager_module.views,
+        'get_channelstate_open',
+        lambda *args: list(),
+    )
+    monkeypatch.setattr(
+        connection_manager_module.views,
+        'get_participants_addresses',
+        lambda *args: set(participants),
+    )
+    monkeypatch.setattr(
+        connection_manager_module.views,
+        'get_our_capacity_for_token_network',
+        lambda *args: sum(api.deposits.values()),
+    )
+
+
+def test_open_channels_concurrently(monkeypatch):
+    participants = [factories.make_address() for _ in range(5)]
+    api = RaidenAPI()
+    patch_views(monkeypatch, participants, api)
+
+    manager = ConnectionManager(
+        RaidenService(3),
+        factories.make_address(),
+        factories.make_address(),
+    )
+    manager.api = api
+    manager.funds = 100
+    manager.initial_channel_target = 5
+    manager.joinable_funds_target = 0
+
+    greenlet = gevent.spawn(manager._open_channels, manager.registry_address)
+
+    # the transactions are sent without waiting for the previous ones
+    gevent.sleep(0.01)
+    assert api.running == 3
+
+    api.event_mined.set()
+    greenlet.get(timeout=1)
+    assert api.max_running == 3
+    assert api.deposits == {partner: 20 for partner in participants}
+
+
+def test_join_channels_concurrently(monkeypatch):
+    api = RaidenAPI()
+    patch_views(monkeypatch, list(), api)
+
+    manager = ConnectionManager(
+        RaidenService(8),
+        factories.make_address(),
+        factories.make_address(),
+    )
+    manager.api = api
+    manager.funds = 100
+    manager.initial_channel_target = 2
+    manager.joinable_funds_target = 0
+
+    partners = [factories.make_address() for _ in range(3)]
+    greenlets = [
+        gevent.spawn(manager.join_channel, manager.registry_address, partner, 50)
+        for partner in partners
+    ]
+
+    # the deposits in flight are not joined with funds again
+    gevent.sleep(0.01)
+    assert api.running == 2
+    assert manager.pending_deposits == 100
+
+    api.event_mined.set()
+    gevent.joinall(greenlets, raise_error=True)
+    assert sorted(api.deposits.values()) == [50, 50]
+    assert manager.pending_deposits == 0
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from eth_abi import encode_abi, encode_single
+from eth_utils import encode_hex, event_abi_to_log_topic, keccak, to_checksum_address
+from web3.utils.events import get_event_data
+
+from raiden.network.rpc.smartcontract_proxy import decode_event, get_events_decoder
+from raiden.tests.utils import factories
+
+TRANSFER_ABI = {
+    'anonymous': False,
+    'inputs': [
+        {'indexed': True, 'name': 'sender', 'type': 'address'},
+        {'indexed': True, 'name': 'memo', 'type': 'string'},
+        {'indexed': False, 'name': 'receiver', 'type': 'address'},
+        {'indexed': False, 'name': 'amount', 'type': 'uint256'},
+        {'indexed': False, 'name': 'secrethash', 'type': 'bytes32'},
+        {'indexed': False, 'name': 'note', 'type': 'string'},
+        {'indexed': False, 'name': 'path', 'type': 'address[]'},
+    ],
+    'name': 'Transfer',
+    'type': 'event',
+}
+CLOSED_ABI = {
+    'anonymous': False,
+    'inputs': [{'indexed': False, 'name': 'closing_address', 'type': 'address'}],
+    'name': 'ChannelClosed',
+    'type': 'event',
+}
+ABI = [
+    TRANSFER_ABI,
+    CLOSED_ABI,
+    {'constant': True, 'inputs': [], 'name': 'opened', 'outputs': [], 'type': 'function'},
+]
+
+
+def make_log(event_abi, topics, data):
+    return {
+        'address': to_checksum_address(factories.make_address()),
+        'topics': [encode_hex(event_abi_to_log_topic(event_abi))] + topics,
+        'data': encode_hex(data),
+        'blockNumber': 10,
+        'blockHash': '0x' + '00' * 32,
+        'logIndex': 2,
+        'transactionHash': '0x' + '11' * 32,
+        'transactionIndex': 0,
+    }
+
+
+def test_decode_event_matches_web3():
+    sender = factories.make_address()
+    receiver = factories.make_address()
+    path = [factories.make_address(), factories.make_address()]
+
+    transfer_log = make_log(
+        TRANSFER_ABI,
+        [encode_single('address', sender), keccak(b'memo')],
+        encode_abi(
+            ['address', 'uint256', 'bytes32', 'string', 'address[]'],
+            [receiver, 10, b'\x01' * 32, 'note', path],
+        ),
+    )
+    closed_log = make_log(CLOSED_ABI, [], encode_single('address', sender))
+
+    for event_abi, log in ((TRANSFER_ABI, transfer_log), (CLOSED_ABI, closed_log)):
+        expected = get_event_data(event_abi, dict(log, topics=[
+            bytes.fromhex(topic[2:]) if isinstance(topic, str) else topic
+            for topic in log['topics']
+        ]))
+        assert decode_event(ABI, dict(log, topics=list(log['topics']))) == expected
+
+    decoded = decode_event(ABI, transfer_log)
+    assert decoded['args']['sender'] == to_checksum_address(sender)
+    assert decoded['args']['path'] == [to_checksum_address(address) for address in path]
+
+
+def test_events_decoder_is_cached():
+    decoder = get_events_decoder(ABI)
+
+    assert get_events_decoder(ABI) is decoder
+    assert get_events_decoder(list(ABI)) is not decoder
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from raiden.network.rpc.head_tracker import HeadTracker
+
+
+class Eth:
+    def __init__(self):
+        self.latest_block = 10
+        self.requests = 0
+
+    @property
+    def blockNumber(self):  # pylint: disable=invalid-name
+        self.requests += 1
+        return self.latest_block
+
+
+class Web3:
+    def __init__(self):
+        self.eth = Eth()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_head_tracker():
+    web3 = Web3()
+    clock = Clock()
+    head = HeadTracker(web3, 1, clock)
+
+    # before the head is tracked every call is a request
+    assert head.block_number() == 10
+    assert head.block_number() == 10
+    assert web3.eth.requests == 2
+
+    assert head.update() == 10
+    assert web3.eth.requests == 3
+
+    web3.eth.latest_block = 11
+    assert head.block_number() == 10
+    assert web3.eth.requests == 3
+
+    fetches = list()
+
+    def fetch():
+        fetches.append(head.head_number)
+        return len(fetches)
+
+    assert head.get_cached('gasprice', fetch) == 1
+    assert head.get_cached('gasprice', fetch) == 1
+
+    # the cached values are invalidated by a new block
+    clock.now = 0.5
+    assert head.update() == 11
+    assert head.block_number() == 11
+    assert head.get_cached('gasprice', fetch) == 2
+    assert head.get_cached('gasprice', fetch) == 2
+    assert fetches == [10, 11]
+
+    # a head which is not updated is not used
+    clock.now = 2
+    web3.eth.latest_block = 12
+    requests = web3.eth.requests
+    assert head.block_number() == 12
+    assert web3.eth.requests == requests + 1
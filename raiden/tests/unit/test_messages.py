@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import pytest
 
-from raiden.messages import Ping
+from raiden.messages import Lock, LockedTransfer, Ping
+from raiden.transfer.state import HashTimeLockState
 from raiden.tests.utils.messages import (
     make_direct_transfer,
     make_lock,
@@ -51,3 +52,17 @@ def test_direct_transfer_out_of_bounds_values():
 def test_amount_out_of_bounds(amount, make):
     with pytest.raises(ValueError):
         make(amount=amount)
+
+
+def test_decoded_message_caches_derived_hashes():
+    mediated_transfer = make_mediated_transfer()
+    mediated_transfer.sign(PRIVKEY, ADDRESS)
+
+    decoded = LockedTransfer.decode(mediated_transfer.encode())
+    assert decoded.message_hash == mediated_transfer.message_hash
+
+    lock_state = HashTimeLockState(7, 1, decoded.lock.secrethash)
+    lock = Lock.from_state(lock_state)
+    assert lock.as_bytes == lock_state.encoded
+    assert lock.lockhash == lock_state.lockhash
+    assert Lock.from_bytes(lock.as_bytes).lockhash == lock_state.lockhash
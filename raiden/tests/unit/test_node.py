@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+import random
+
+import networkx
+import pytest
+
+from raiden.api.python import RaidenAPI
+from raiden.exceptions import ChannelNotFound
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.transfer import node, views
+from raiden.transfer.architecture import StateManager
+from raiden.transfer.events import ContractSendChannelSettle, SendProcessed
+from raiden.transfer.state import (
+    NodeState,
+    PaymentNetworkState,
+    TokenNetworkGraphState,
+    TokenNetworkState,
+    TransactionExecutionStatus,
+)
+from raiden.transfer.state_change import (
+    ActionPruneState,
+    Block,
+    ContractReceiveChannelClosed,
+    ContractReceiveChannelNew,
+    ContractReceiveChannelSettled,
+    ContractReceiveNewPaymentNetwork,
+    ContractReceiveNewTokenNetwork,
+    ReceiveDelivered,
+    ReceiveDeliveredBatch,
+    ReceiveProcessed,
+)
+from raiden.tests.utils import factories
+
+
+class WriteAheadLog:
+    def __init__(self, node_state, storage):
+        self.state_manager = StateManager(node.state_transition, node_state)
+        self.storage = storage
+
+
+class RaidenService:
+    def __init__(self, node_state, storage):
+        self.wal = WriteAheadLog(node_state, storage)
+
+
+def test_processed_removes_message_from_queue():
+    node_state = NodeState(random.Random(), 1)
+    recipient = factories.make_address()
+
+    first = SendProcessed(recipient, b'global', 1)
+    second = SendProcessed(recipient, b'global', 2)
+    node.enqueue_message(node_state, first)
+    node.enqueue_message(node_state, second)
+
+    queueid = (recipient, b'global')
+    assert node_state.queueids_to_queues[queueid] == [first, second]
+
+    node.handle_processed(node_state, ReceiveProcessed(2))
+    assert node_state.queueids_to_queues[queueid] == [first]
+    assert 2 not in node_state.messageids_to_queueids
+
+    node.handle_processed(node_state, ReceiveProcessed(1))
+    assert node_state.queueids_to_queues[queueid] == []
+    assert node_state.messageids_to_queueids == dict()
+
+    # unknown identifiers are ignored
+    node.handle_processed(node_state, ReceiveProcessed(3))
+
+
+def test_delivered_removes_message_from_global_queue():
+    node_state = NodeState(random.Random(), 1)
+    recipient = factories.make_address()
+    channel_queue_name = factories.make_address()
+
+    processed = SendProcessed(recipient, b'global', 1)
+    ordered = SendProcessed(recipient, channel_queue_name, 1)
+    node.enqueue_message(node_state, processed)
+    node.enqueue_message(node_state, ordered)
+
+    # Delivered only acknowledges the messages of the unordered queue
+    node.handle_delivered(node_state, ReceiveDelivered(1))
+    assert node_state.queueids_to_queues[(recipient, b'global')] == []
+    assert node_state.queueids_to_queues[(recipient, channel_queue_name)] == [ordered]
+    assert node_state.messageids_to_queueids == {1: [(recipient, channel_queue_name)]}
+
+    node.handle_processed(node_state, ReceiveProcessed(1))
+    assert node_state.messageids_to_queueids == dict()
+
+
+def test_delivered_batch_removes_messages_from_global_queue():
+    node_state = NodeState(random.Random(), 1)
+    recipient = factories.make_address()
+
+    messages = [SendProcessed(recipient, b'global', identifier) for identifier in range(4)]
+    for message in messages:
+        node.enqueue_message(node_state, message)
+
+    node.handle_delivered_batch(node_state, ReceiveDeliveredBatch([0, 2, 5]))
+    assert node_state.queueids_to_queues[(recipient, b'global')] == [messages[1], messages[3]]
+    assert sorted(node_state.messageids_to_queueids) == [1, 3]
+
+
+def test_delivered_batch_state_change_clears_the_queues():
+    node_state = NodeState(random.Random(), 1)
+    recipients = [factories.make_address() for _ in range(2)]
+
+    messages = [
+        SendProcessed(recipient, b'global', identifier)
+        for identifier, recipient in enumerate(recipients * 2)
+    ]
+    for message in messages:
+        node.enqueue_message(node_state, message)
+
+    node.state_transition(node_state, ReceiveDeliveredBatch([0, 1, 2, 3]))
+
+    for recipient in recipients:
+        assert node_state.queueids_to_queues[(recipient, b'global')] == []
+    assert node_state.messageids_to_queueids == dict()
+
+
+def test_block_dispatched_only_to_channels_with_deadlines():
+    block_number = 10
+    node_state = NodeState(random.Random(), block_number)
+    token_network_identifier = factories.make_address()
+    token_network_state = TokenNetworkState(
+        token_network_identifier,
+        factories.make_address(),
+        TokenNetworkGraphState(networkx.Graph()),
+        [],
+    )
+    node.maybe_add_tokennetwork(
+        node_state,
+        factories.make_address(),
+        token_network_state,
+    )
+
+    idle_channel = factories.make_channel(token_network_identifier=token_network_identifier)
+    closed_channel = factories.make_channel(token_network_identifier=token_network_identifier)
+    for channel_state in (idle_channel, closed_channel):
+        node.state_transition(
+            node_state,
+            ContractReceiveChannelNew(token_network_identifier, channel_state),
+        )
+
+    assert node_state.keys_to_block_deadlines == dict()
+
+    closed_block_number = block_number + 1
+    node.state_transition(
+        node_state,
+        ContractReceiveChannelClosed(
+            token_network_identifier,
+            closed_channel.identifier,
+            closed_channel.partner_state.address,
+            closed_block_number,
+        ),
+    )
+
+    settle_block_number = closed_block_number + closed_channel.settle_timeout + 1
+    key = (node.DEADLINE_CHANNEL, (token_network_identifier, closed_channel.identifier))
+    assert node_state.keys_to_block_deadlines == {key: settle_block_number}
+
+    iteration = node.state_transition(node_state, Block(settle_block_number - 1))
+    assert iteration.events == []
+
+    iteration = node.state_transition(node_state, Block(settle_block_number))
+    assert len(iteration.events) == 1
+    assert isinstance(iteration.events[0], ContractSendChannelSettle)
+
+    # the settle transaction is pending, there is nothing left to do
+    assert node_state.keys_to_block_deadlines == dict()
+    assert node.state_transition(node_state, Block(settle_block_number + 1)).events == []
+
+
+def make_closed_channel(token_network_identifier, closed_block_number):
+    channel_state = factories.make_channel(token_network_identifier=token_network_identifier)
+    channel_state.close_transaction = TransactionExecutionStatus(
+        None,
+        closed_block_number,
+        TransactionExecutionStatus.SUCCESS,
+    )
+    return channel_state
+
+
+def test_block_dispatched_to_channels_of_new_token_network():
+    block_number = 10
+    node_state = NodeState(random.Random(), block_number)
+    payment_network_identifier = factories.make_address()
+    node.state_transition(
+        node_state,
+        ContractReceiveNewPaymentNetwork(PaymentNetworkState(payment_network_identifier, [])),
+    )
+
+    # the startup sync adds token networks with channels which are closed
+    token_network_identifier = factories.make_address()
+    channel_state = make_closed_channel(token_network_identifier, block_number)
+    token_network_state = TokenNetworkState(
+        token_network_identifier,
+        factories.make_address(),
+        TokenNetworkGraphState(networkx.Graph()),
+        [channel_state],
+    )
+    node.state_transition(
+        node_state,
+        ContractReceiveNewTokenNetwork(payment_network_identifier, token_network_state),
+    )
+
+    settle_block_number = block_number + channel_state.settle_timeout + 1
+    iteration = node.state_transition(node_state, Block(settle_block_number))
+    assert len(iteration.events) == 1
+    assert isinstance(iteration.events[0], ContractSendChannelSettle)
+
+
+def test_block_dispatched_to_channels_of_new_payment_network():
+    block_number = 10
+    node_state = NodeState(random.Random(), block_number)
+
+    token_network_identifier = factories.make_address()
+    channel_state = make_closed_channel(token_network_identifier, block_number)
+    token_network_state = TokenNetworkState(
+        token_network_identifier,
+        factories.make_address(),
+        TokenNetworkGraphState(networkx.Graph()),
+        [channel_state],
+    )
+    payment_network_state = PaymentNetworkState(
+        factories.make_address(),
+        [token_network_state],
+    )
+    node.state_transition(
+        node_state,
+        ContractReceiveNewPaymentNetwork(payment_network_state),
+    )
+
+    key = (node.DEADLINE_CHANNEL, (token_network_identifier, channel_state.identifier))
+    settle_block_number = block_number + channel_state.settle_timeout + 1
+    assert node_state.keys_to_block_deadlines == {key: settle_block_number}
+
+    iteration = node.state_transition(node_state, Block(settle_block_number))
+    assert len(iteration.events) == 1
+    assert isinstance(iteration.events[0], ContractSendChannelSettle)
+
+
+def test_views_use_lookup_indexes():
+    node_state = NodeState(random.Random(), 1)
+    payment_network_identifier = factories.make_address()
+    token_network_identifier = factories.make_address()
+    token_network_state = TokenNetworkState(
+        token_network_identifier,
+        factories.make_address(),
+        TokenNetworkGraphState(networkx.Graph()),
+        [],
+    )
+    node.maybe_add_tokennetwork(
+        node_state,
+        payment_network_identifier,
+        token_network_state,
+    )
+
+    channel_state = factories.make_channel(token_network_identifier=token_network_identifier)
+    partner_address = channel_state.partner_state.address
+    node.state_transition(
+        node_state,
+        ContractReceiveChannelNew(token_network_identifier, channel_state),
+    )
+
+    assert views.get_token_network_by_identifier(
+        node_state,
+        token_network_identifier,
+    ) is token_network_state
+    assert views.search_payment_network_by_token_network_id(
+        node_state,
+        token_network_identifier,
+    ).address == payment_network_identifier
+    assert views.search_for_channel(
+        node_state,
+        payment_network_identifier,
+        channel_state.identifier,
+    ) is channel_state
+    assert views.list_channelstate_for_partner(
+        node_state,
+        payment_network_identifier,
+        partner_address,
+    ) == [channel_state]
+    assert views.all_neighbour_nodes(node_state) == {partner_address}
+
+    # the lookups are scoped by payment network
+    assert views.search_for_channel(
+        node_state,
+        factories.make_address(),
+        channel_state.identifier,
+    ) is None
+
+
+def test_sharded_dispatch_copies_only_the_routed_token_network():
+    node_state = NodeState(random.Random(), 1)
+    payment_network_identifier = factories.make_address()
+
+    token_networks = list()
+    for _ in range(2):
+        token_network_state = TokenNetworkState(
+            factories.make_address(),
+            factories.make_address(),
+            TokenNetworkGraphState(networkx.Graph()),
+            [],
+        )
+        node.maybe_add_tokennetwork(
+            node_state,
+            payment_network_identifier,
+            token_network_state,
+        )
+        token_networks.append(token_network_state)
+
+    state_manager = StateManager(
+        node.state_transition,
+        node_state,
+        node.get_unchanged_substates,
+    )
+
+    routed, other = token_networks
+    channel_state = factories.make_channel(token_network_identifier=routed.address)
+    state_manager.dispatch(ContractReceiveChannelNew(routed.address, channel_state))
+
+    new_state = state_manager.current_state
+    new_routed = views.get_token_network_by_identifier(new_state, routed.address)
+    new_other = views.get_token_network_by_identifier(new_state, other.address)
+
+    assert new_other is other
+    assert new_routed is not routed
+    assert channel_state.identifier in new_routed.channelidentifiers_to_channels
+    assert channel_state.identifier not in routed.channelidentifiers_to_channels
+
+    # state changes broadcast to the node copy every token network
+    state_manager.dispatch(Block(2))
+    assert views.get_token_network_by_identifier(
+        state_manager.current_state,
+        other.address,
+    ) is not other
+
+
+def test_prune_state_removes_settled_channels():
+    block_number = 10
+    node_state = NodeState(random.Random(), block_number)
+    payment_network_identifier = factories.make_address()
+    token_network_identifier = factories.make_address()
+    token_network_state = TokenNetworkState(
+        token_network_identifier,
+        factories.make_address(),
+        TokenNetworkGraphState(networkx.Graph()),
+        [],
+    )
+    node.maybe_add_tokennetwork(
+        node_state,
+        payment_network_identifier,
+        token_network_state,
+    )
+
+    channel_state = factories.make_channel(token_network_identifier=token_network_identifier)
+    channel_identifier = channel_state.identifier
+    node.state_transition(
+        node_state,
+        ContractReceiveChannelNew(token_network_identifier, channel_state),
+    )
+    node.state_transition(
+        node_state,
+        ContractReceiveChannelClosed(
+            token_network_identifier,
+            channel_identifier,
+            channel_state.partner_state.address,
+            block_number,
+        ),
+    )
+    node.state_transition(
+        node_state,
+        ContractReceiveChannelSettled(
+            token_network_identifier,
+            channel_identifier,
+            block_number,
+        ),
+    )
+
+    key = (node.DEADLINE_CHANNEL, (token_network_identifier, channel_identifier))
+    assert node_state.keys_to_finalized_blocks == {key: block_number}
+
+    assert node.get_prunable_substates(node_state, block_number - 1) == []
+    prunable = node.get_prunable_substates(node_state, block_number)
+    assert prunable == [(key[0], key[1], channel_state)]
+
+    node.state_transition(node_state, ActionPruneState(block_number))
+
+    assert node_state.keys_to_finalized_blocks == dict()
+    assert views.get_channelstate_by_token_network_identifier(
+        node_state,
+        token_network_identifier,
+        channel_identifier,
+    ) is None
+    assert views.all_neighbour_nodes(node_state) == set()
+    assert views.get_state_size(node_state)['channels'] == 0
+
+    # the pruned channel is found in the archive of its own payment network
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    storage.write_archived_states(block_number, [(key[0], key[1][1], channel_state)])
+    api = RaidenAPI(RaidenService(node_state, storage))
+
+    archived = api.get_channel(payment_network_identifier, channel_identifier)
+    assert archived.identifier == channel_identifier
+
+    with pytest.raises(ChannelNotFound):
+        api.get_channel(factories.make_address(), channel_identifier)
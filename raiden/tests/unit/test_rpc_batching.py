@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import json
+
+import gevent
+import pytest
+from gevent.pywsgi import WSGIServer
+from web3 import HTTPProvider, Web3
+
+from raiden.network.rpc.batching import RequestBatcher
+from raiden.network.rpc.client import inject_rpc_middlewares
+
+
+@pytest.fixture
+def rpc_server():
+    """ JSON-RPC endpoint which answers every request with its method and
+    params, and records the received bodies.
+    """
+    received = list()
+
+    def answer(rpc_request):
+        return {
+            'jsonrpc': '2.0',
+            'id': rpc_request['id'],
+            'result': [rpc_request['method']] + rpc_request['params'],
+        }
+
+    def application(environ, start_response):
+        body = json.loads(environ['wsgi.input'].read().decode())
+        received.append(body)
+
+        if isinstance(body, list):
+            # the responses of a batch may be in any order
+            response = [answer(rpc_request) for rpc_request in reversed(body)]
+        else:
+            response = answer(body)
+
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [json.dumps(response).encode()]
+
+    server = WSGIServer(('127.0.0.1', 0), application, log=None)
+    server.start()
+    yield 'http://127.0.0.1:{}'.format(server.server_port), received
+    server.stop()
+
+
+def test_concurrent_requests_are_batched(rpc_server):
+    endpoint, received = rpc_server
+    batcher = RequestBatcher(HTTPProvider(endpoint), 0, 2)
+
+    requests = [
+        gevent.spawn(batcher.request, 'eth_call', [number])
+        for number in range(3)
+    ]
+    gevent.joinall(requests, raise_error=True)
+
+    results = [request.get()['result'] for request in requests]
+    assert results == [['eth_call', number] for number in range(3)]
+
+    # the batch size is bounded, the last request is sent alone
+    assert len(received) == 2
+    assert [rpc_request['params'] for rpc_request in received[0]] == [[0], [1]]
+    assert received[1]['params'] == [2]
+
+
+def test_batch_window(rpc_server):
+    endpoint, received = rpc_server
+    batcher = RequestBatcher(HTTPProvider(endpoint), 0.1, 100)
+
+    def delayed_request():
+        gevent.sleep(0.01)
+        return batcher.request('eth_blockNumber', [])
+
+    requests = [
+        gevent.spawn(batcher.request, 'eth_getCode', ['0x0']),
+        gevent.spawn(delayed_request),
+    ]
+    gevent.joinall(requests, raise_error=True)
+
+    assert len(received) == 1
+    assert [rpc_request['method'] for rpc_request in received[0]] == [
+        'eth_getCode',
+        'eth_blockNumber',
+    ]
+
+
+def test_batched_requests_skip_the_connection_test(rpc_server):
+    endpoint, received = rpc_server
+    web3 = Web3(HTTPProvider(endpoint), middlewares=[])
+    client = type('JSONRPCClient', (), {'stop_event': None})
+    inject_rpc_middlewares(client, web3, 0, 100)
+
+    provider = web3.providers[0]
+    make_request = provider.request_func(web3, tuple(web3.middleware_stack))
+
+    def received_methods():
+        methods = list()
+        for body in received:
+            if isinstance(body, list):
+                methods.extend(rpc_request['method'] for rpc_request in body)
+            else:
+                methods.append(body['method'])
+        return methods
+
+    make_request('eth_getTransactionByHash', ['0x01'])
+    assert received_methods() == ['eth_getTransactionByHash']
+
+    # the other requests check the connection first
+    make_request('eth_sendRawTransaction', ['0x02'])
+    assert received_methods() == [
+        'eth_getTransactionByHash',
+        'web3_clientVersion',
+        'eth_sendRawTransaction',
+    ]
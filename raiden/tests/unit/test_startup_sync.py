@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+
+from gevent.pool import Group
+
+from raiden.blockchain.events import get_relevant_proxies
+from raiden.blockchain.state import get_token_network_state_from_proxies
+from raiden.blockchain.sync import StartupSync
+from raiden.exceptions import AddressWithoutCode, EthNodeCommunicationError
+from raiden.tests.utils import factories
+
+REVEAL_TIMEOUT = 10
+SETTLE_TIMEOUT = 50
+
+
+class Client:
+    @contextmanager
+    def batch(self):
+        group = Group()
+        yield group
+        group.join(raise_error=True)
+
+
+class NettingChannel:
+    def __init__(self, node_address, opened):
+        self.address = factories.make_address()
+        self.client = Client()
+        self.node_address = node_address
+        self.partner_address = factories.make_address()
+        self.opened_block_number = opened
+
+    def detail(self):
+        return {
+            'our_address': self.node_address,
+            'our_balance': 10,
+            'partner_address': self.partner_address,
+            'partner_balance': 20,
+            'settle_timeout': SETTLE_TIMEOUT,
+        }
+
+    def opened(self):
+        return self.opened_block_number
+
+    def closed(self):
+        return 0
+
+
+class ChannelManager:
+    def __init__(self, chain, node_address, channels_failures):
+        self.address = factories.make_address()
+        self.token = factories.make_address()
+        self.chain = chain
+        self.node_address = node_address
+        self.channels_failures = channels_failures
+
+        self.channel_identifiers = list()
+        for opened in range(1, 4):
+            channel = NettingChannel(node_address, opened)
+            chain.channels[channel.address] = channel
+            self.channel_identifiers.append(channel.address)
+
+        # a settled channel, the contract is gone
+        self.channel_identifiers.append(factories.make_address())
+
+    def token_address(self):
+        return self.token
+
+    def channels_addresses(self):
+        return [
+            (self.node_address, self.chain.channels[identifier].partner_address)
+            for identifier in self.channel_identifiers
+            if identifier in self.chain.channels
+        ]
+
+    def channels_by_participant(self, participant_address):
+        if self.channels_failures:
+            self.channels_failures -= 1
+            raise EthNodeCommunicationError('connection lost')
+
+        assert participant_address == self.node_address
+        return list(self.channel_identifiers)
+
+
+class Registry:
+    def __init__(self, managers):
+        self.addresses_to_managers = {
+            manager.address: manager
+            for manager in managers
+        }
+
+    def manager_addresses(self):
+        return list(self.addresses_to_managers)
+
+    def manager(self, manager_address):
+        return self.addresses_to_managers[manager_address]
+
+
+class Chain:
+    def __init__(self):
+        self.channels = dict()
+        self.registries = dict()
+
+    def registry(self, registry_address):
+        return self.registries[registry_address]
+
+    def netting_channel(self, channel_identifier):
+        if channel_identifier not in self.channels:
+            raise AddressWithoutCode()
+        return self.channels[channel_identifier]
+
+
+def test_startup_sync_matches_sequential_sync():
+    node_address = factories.make_address()
+    registry_address = factories.make_address()
+    chain = Chain()
+
+    managers = [ChannelManager(chain, node_address, 0) for _ in range(3)]
+    # the fetch is retried individually
+    managers[1].channels_failures = 2
+    chain.registries[registry_address] = Registry(managers)
+
+    startup_sync = StartupSync(chain, node_address, REVEAL_TIMEOUT, 2, 3, 0)
+    proxies = startup_sync.get_relevant_proxies(registry_address)
+    token_networks = startup_sync.get_token_network_states(proxies)
+
+    assert managers[1].channels_failures == 0
+
+    expected_proxies = get_relevant_proxies(chain, node_address, registry_address)
+    assert proxies == expected_proxies
+
+    raiden = type('RaidenService', (), {'config': {'reveal_timeout': REVEAL_TIMEOUT}})
+    expected_token_networks = [
+        get_token_network_state_from_proxies(
+            raiden,
+            manager,
+            expected_proxies.channelmanager_nettingchannels[manager.address],
+        )
+        for manager in expected_proxies.channel_managers
+    ]
+    for token_network, expected in zip(token_networks, expected_token_networks):
+        assert token_network.address == expected.address
+        assert token_network.token_address == expected.token_address
+        assert token_network.channelidentifiers_to_channels == (
+            expected.channelidentifiers_to_channels
+        )
+        assert token_network.partneraddresses_to_channels == (
+            expected.partneraddresses_to_channels
+        )
+        # networkx graphs are compared by identity
+        assert sorted(token_network.network_graph.network.edges()) == sorted(
+            expected.network_graph.network.edges(),
+        )
+        assert len(token_network.channelidentifiers_to_channels) == 3
+
+    assert len(token_networks) == len(expected_token_networks) == 3
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+
+import gevent
+from gevent.event import Event
+
+from raiden.exceptions import ChannelBusyError, EthNodeCommunicationError
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.tests.utils import factories
+from raiden.transaction_manager import TransactionManager
+from raiden.transfer.events import ContractSendChannelClose, ContractSendChannelSettle
+
+
+class NettingChannel:
+    def __init__(self, identifier, chain):
+        self.identifier = identifier
+        self.chain = chain
+        self.busy = 1
+        self.settle_errors = list()
+
+    def close(self, *args):  # pylint: disable=unused-argument
+        # another operation holds the channel
+        if self.busy:
+            self.busy -= 1
+            raise ChannelBusyError()
+
+        self.chain.event_mined.wait()
+        self.chain.transactions.append(('close', self.identifier))
+
+    def settle(self):
+        if self.settle_errors:
+            raise self.settle_errors.pop(0)
+
+        client = self.chain.client
+        transaction_hash = client.send_transaction(('settle', self.identifier))
+        client.poll(transaction_hash)
+
+
+class Eth:
+    def getTransactionReceipt(self, transaction_hash):  # pylint: disable=invalid-name
+        return {'status': 1}
+
+
+class Web3:
+    def __init__(self):
+        self.eth = Eth()
+
+
+class Client:
+    def __init__(self, chain):
+        self.chain = chain
+        self.web3 = Web3()
+        self.callback = None
+        self.poll_errors = list()
+        self.polled = list()
+
+    @contextmanager
+    def observe_transactions(self, callback):
+        self.callback = callback
+        try:
+            yield
+        finally:
+            self.callback = None
+
+    def send_transaction(self, transaction):
+        self.chain.transactions.append(transaction)
+        transaction_hash = factories.make_secret(len(self.chain.transactions))
+
+        if self.callback is not None:
+            self.callback(transaction_hash)
+
+        return transaction_hash
+
+    def poll(self, transaction_hash, timeout=None):  # pylint: disable=unused-argument
+        self.polled.append(transaction_hash)
+        if self.poll_errors:
+            raise self.poll_errors.pop(0)
+
+
+class Chain:
+    def __init__(self):
+        self.event_mined = Event()
+        self.transactions = list()
+        self.channels = dict()
+        self.client = Client(self)
+        self.poll_timeout = None
+
+    def netting_channel(self, channel_identifier):
+        if channel_identifier not in self.channels:
+            self.channels[channel_identifier] = NettingChannel(channel_identifier, self)
+        return self.channels[channel_identifier]
+
+
+class WriteAheadLog:
+    def __init__(self, storage):
+        self.storage = storage
+
+
+class RaidenService:
+    def __init__(self, storage):
+        self.address = factories.make_address()
+        self.chain = Chain()
+        self.wal = WriteAheadLog(storage)
+
+
+def test_transaction_manager():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    raiden = RaidenService(storage)
+    transaction_manager = TransactionManager(raiden, 0)
+
+    channel1 = factories.make_address()
+    channel2 = factories.make_address()
+    close1 = ContractSendChannelClose(channel1, factories.make_address(), None)
+    settle1 = ContractSendChannelSettle(channel1)
+    settle2 = ContractSendChannelSettle(channel2)
+
+    # the events are queued without waiting for the transactions
+    transaction_manager.submit(close1)
+    transaction_manager.submit(settle1)
+    transaction_manager.submit(settle2)
+    transaction_manager.submit(settle2)
+    assert [event for _, event in storage.get_pending_transactions()] == [
+        close1,
+        settle1,
+        settle2,
+    ]
+
+    # the transactions of a channel are sent in order
+    gevent.sleep(0.01)
+    assert raiden.chain.transactions == [('settle', channel2)]
+
+    raiden.chain.event_mined.set()
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == [
+        ('settle', channel2),
+        ('close', channel1),
+        ('settle', channel1),
+    ]
+    assert storage.get_pending_transactions() == []
+    assert transaction_manager.channels_to_greenlets == dict()
+
+
+def test_transaction_manager_restart():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    channel = factories.make_address()
+    settle = ContractSendChannelSettle(channel)
+    storage.write_pending_transaction(settle)
+
+    raiden = RaidenService(storage)
+    transaction_manager = TransactionManager(raiden, 0)
+    transaction_manager.start()
+
+    # the events are dispatched again on restart
+    transaction_manager.submit(settle)
+
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == [('settle', channel)]
+    assert storage.get_pending_transactions() == []
+
+
+def test_transaction_manager_failures():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    raiden = RaidenService(storage)
+    transaction_manager = TransactionManager(raiden, 0)
+
+    # the transactions are retried while the node is not reachable
+    channel = factories.make_address()
+    raiden.chain.netting_channel(channel).settle_errors = [
+        EthNodeCommunicationError('Web3 provider not connected'),
+        EthNodeCommunicationError('Web3 provider not connected'),
+    ]
+    settle = ContractSendChannelSettle(channel)
+    transaction_manager.submit(settle)
+
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == [('settle', channel)]
+    assert storage.get_pending_transactions() == []
+
+    # an unexpected failure does not leave the event pending
+    raiden.chain.netting_channel(channel).settle_errors = [ValueError()]
+    transaction_manager.submit(settle)
+
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == [('settle', channel)]
+    assert storage.get_pending_transactions() == []
+    assert transaction_manager.identifiers_to_events == dict()
+
+    transaction_manager.submit(settle)
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == [('settle', channel), ('settle', channel)]
+
+
+def test_transaction_manager_broadcast_failures():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    raiden = RaidenService(storage)
+    transaction_manager = TransactionManager(raiden, 0)
+    client = raiden.chain.client
+
+    # the node fails while the receipt is polled, the transaction was
+    # broadcast already and is waited for instead of being sent again
+    channel = factories.make_address()
+    client.poll_errors = [
+        EthNodeCommunicationError('Web3 provider not connected'),
+        EthNodeCommunicationError('Web3 provider not connected'),
+    ]
+    transaction_manager.submit(ContractSendChannelSettle(channel))
+
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == [('settle', channel)]
+    assert len(set(client.polled)) == 1
+    assert len(client.polled) == 3
+    assert storage.get_pending_transactions() == []
+
+
+def test_transaction_manager_restart_broadcast():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    channel = factories.make_address()
+    transaction_hash = factories.make_secret(1)
+    identifier = storage.write_pending_transaction(ContractSendChannelSettle(channel))
+    storage.write_pending_transaction_hash(identifier, transaction_hash)
+
+    raiden = RaidenService(storage)
+    transaction_manager = TransactionManager(raiden, 0)
+    transaction_manager.start()
+
+    # the transaction broadcast before the restart is not sent again
+    transaction_manager.greenlets.join()
+    assert raiden.chain.transactions == []
+    assert raiden.chain.client.polled == [transaction_hash]
+    assert storage.get_pending_transactions() == []
+    assert storage.get_pending_transaction_hashes(identifier) == []
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import gevent
+import pytest
+
+from raiden.exceptions import EthNodeCommunicationError, RaidenShuttingDown
+from raiden.network.rpc.transactions import TransactionWatcher
+
+
+class Eth:
+    def __init__(self):
+        self.transactions = dict()
+        self.requests = list()
+        self.errors = dict()
+
+    def getTransaction(self, transaction_hash):  # pylint: disable=invalid-name
+        self.requests.append(transaction_hash)
+
+        errors = self.errors.get(transaction_hash)
+        if errors:
+            raise errors.pop(0)
+
+        return self.transactions.get(transaction_hash)
+
+
+class Web3:
+    def __init__(self):
+        self.eth = Eth()
+
+
+class Client:
+    def __init__(self):
+        self.web3 = Web3()
+        self.latest_block = 10
+        self.errors = list()
+
+    def block_number(self):
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.latest_block
+
+
+def test_transaction_watcher():
+    client = Client()
+    watcher = TransactionWatcher(client, 0.01)
+    eth = client.web3.eth
+
+    hashes = ['0x{:064x}'.format(number) for number in range(10)]
+    for transaction_hash in hashes:
+        eth.transactions[transaction_hash] = {'blockNumber': None}
+
+    waiters = [
+        gevent.spawn(watcher.wait, transaction_hash, 2 if index == 0 else None)
+        for index, transaction_hash in enumerate(hashes)
+    ]
+
+    # the pending transactions are checked once per block
+    gevent.sleep(0.05)
+    assert sorted(eth.requests) == hashes
+    assert not any(waiter.ready() for waiter in waiters)
+
+    for transaction_hash in hashes:
+        eth.transactions[transaction_hash] = {'blockNumber': hex(11)}
+    client.latest_block = 11
+
+    gevent.wait(waiters[1:], timeout=1)
+    assert all(waiter.ready() for waiter in waiters[1:])
+    assert len(eth.requests) == 2 * len(hashes)
+
+    # the confirmations are waited for without fetching the transaction again
+    assert not waiters[0].ready()
+    client.latest_block = 13
+    assert waiters[0].get(timeout=1) is None
+    assert len(eth.requests) == 2 * len(hashes)
+
+    assert watcher.pending == list()
+    gevent.sleep(0.05)
+    assert watcher.greenlet is None
+
+
+def test_transaction_watcher_failures():
+    client = Client()
+    watcher = TransactionWatcher(client, 0.01)
+    eth = client.web3.eth
+
+    transaction_hash = '0x{:064x}'.format(1)
+    eth.transactions[transaction_hash] = {'blockNumber': None}
+    waiter = gevent.spawn(watcher.wait, transaction_hash)
+
+    # a transaction which was dropped from the pool
+    gevent.sleep(0.05)
+    del eth.transactions[transaction_hash]
+    client.latest_block = 11
+
+    with pytest.raises(Exception, match='invalid transaction'):
+        waiter.get(timeout=1)
+
+    with pytest.raises(Exception, match='timeout'):
+        watcher.wait('0x{:064x}'.format(2), timeout=0.05)
+
+    assert watcher.pending == list()
+
+
+def test_transaction_watcher_node_error():
+    client = Client()
+    watcher = TransactionWatcher(client, 0.01)
+    eth = client.web3.eth
+
+    hashes = ['0x{:064x}'.format(number) for number in range(3)]
+    for transaction_hash in hashes:
+        eth.transactions[transaction_hash] = {'blockNumber': None}
+
+    client.errors.append(EthNodeCommunicationError('Web3 provider not connected'))
+    eth.errors[hashes[0]] = [EthNodeCommunicationError('Web3 provider not connected')]
+    eth.errors[hashes[1]] = [ValueError('invalid transaction hash')]
+
+    waiters = [gevent.spawn(watcher.wait, transaction_hash) for transaction_hash in hashes]
+
+    # an error of a single transaction fails only its waiter
+    with pytest.raises(ValueError):
+        waiters[1].get(timeout=1)
+
+    # the waiters are kept while the node is not reachable
+    gevent.sleep(0.05)
+    assert not waiters[0].ready()
+    assert not waiters[2].ready()
+    assert eth.requests.count(hashes[0]) == 2
+
+    eth.transactions[hashes[0]] = {'blockNumber': hex(11)}
+    eth.transactions[hashes[2]] = {'blockNumber': hex(11)}
+    client.latest_block = 11
+
+    assert waiters[0].get(timeout=1) is None
+    assert waiters[2].get(timeout=1) is None
+    assert watcher.pending == list()
+
+
+def test_transaction_watcher_shutdown():
+    client = Client()
+    watcher = TransactionWatcher(client, 0.01)
+
+    hashes = ['0x{:064x}'.format(number) for number in range(2)]
+    for transaction_hash in hashes:
+        client.web3.eth.transactions[transaction_hash] = {'blockNumber': None}
+
+    waiters = [gevent.spawn(watcher.wait, transaction_hash) for transaction_hash in hashes]
+    gevent.sleep(0.05)
+    client.errors.append(RaidenShuttingDown())
+
+    # all the waiters fail on shutdown
+    for waiter in waiters:
+        with pytest.raises(RaidenShuttingDown):
+            waiter.get(timeout=1)
+
+    assert watcher.pending == list()
@@ -1,5 +1,19 @@
 # -*- coding: utf-8 -*-
+import gevent
+from gevent import socket
+from gevent.event import Event
+
+from raiden.exceptions import UnknownAddress
+from raiden.messages import Bundle, Delivered, DeliveredBatch
 from raiden.network.throttle import TokenBucket
+from raiden.network.transport.udp.healthcheck import HealthcheckScheduler
+from raiden.network.transport.udp.udp_transport import pack_datagrams, UDPTransport
+from raiden.tests.utils import factories
+from raiden.transfer.state import (
+    NODE_NETWORK_REACHABLE,
+    NODE_NETWORK_UNKNOWN,
+    NODE_NETWORK_UNREACHABLE,
+)
 
 
 def test_token_bucket():
@@ -21,3 +35,222 @@ def test_token_bucket():
 
     for num in range(1, 9):
         assert num * token_refill == bucket.consume(1)
+
+
+def test_pack_datagrams():
+    max_size = 100
+    messages_data = [bytes([3]) * 40, bytes([4]) * 40, bytes([5]) * 40]
+
+    datagrams = pack_datagrams(messages_data, max_size)
+
+    assert all(len(datagram) <= max_size for datagram in datagrams)
+    assert Bundle.decode(datagrams[0]).messages_data == messages_data[:2]
+    assert datagrams[1] == messages_data[2]
+
+
+class HealthcheckTransport:
+    def __init__(self, addresses_to_host_ports):
+        self.raiden = type('Raiden', (), {'address': factories.make_address()})
+        self.addresses_to_host_ports = addresses_to_host_ports
+        self.addresses_to_network_states = dict()
+        self.sent = list()
+
+    def get_host_port(self, address):
+        if address not in self.addresses_to_host_ports:
+            raise UnknownAddress()
+        return self.addresses_to_host_ports[address]
+
+    def get_ping(self, nonce):
+        return nonce
+
+    def maybe_sendraw_bundled(self, host_port, messagedata):
+        self.sent.append((host_port, messagedata))
+
+    def set_node_network_state(self, node_address, network_state):
+        self.addresses_to_network_states[node_address] = network_state
+
+
+def test_healthcheck_scheduler():
+    retries = 2
+    keepalive_timeout = 5
+    invitation_timeout = 15
+    spacing = 1
+    now = [0]
+
+    reachable = factories.make_address()
+    unregistered = factories.make_address()
+    transport = HealthcheckTransport({reachable: ('127.0.0.1', 1)})
+    scheduler = HealthcheckScheduler(
+        transport,
+        retries,
+        keepalive_timeout,
+        invitation_timeout,
+        spacing,
+        0,
+        lambda: now[0],
+    )
+    event_stop = Event()
+
+    events = scheduler.add(reachable)
+    scheduler.add(unregistered)
+    assert scheduler.add(reachable) is events
+    assert scheduler.schedule == [(0, reachable), (spacing, unregistered)]
+
+    # the first probes are staggered
+    scheduler.probe_due(event_stop)
+    assert transport.sent == [(('127.0.0.1', 1), 1)]
+    assert events.event_healthy.is_set()
+    assert transport.addresses_to_network_states == {reachable: NODE_NETWORK_UNKNOWN}
+
+    now[0] = spacing
+    scheduler.probe_due(event_stop)
+    assert len(transport.sent) == 1
+    assert transport.addresses_to_network_states[unregistered] == NODE_NETWORK_UNKNOWN
+    assert scheduler.add(unregistered).event_unhealthy.is_set()
+
+    # unsolicited pongs are ignored
+    scheduler.receive_pong(reachable, 2)
+    assert transport.addresses_to_network_states[reachable] == NODE_NETWORK_UNKNOWN
+
+    scheduler.receive_pong(reachable, 1)
+    assert transport.addresses_to_network_states[reachable] == NODE_NETWORK_REACHABLE
+
+    for probe in range(1, retries + 2):
+        now[0] = probe * keepalive_timeout
+        scheduler.probe_due(event_stop)
+
+    assert transport.addresses_to_network_states[reachable] == NODE_NETWORK_UNREACHABLE
+    assert events.event_unhealthy.is_set()
+    assert not events.event_healthy.is_set()
+
+    scheduler.receive_pong(reachable, 3)
+    assert transport.addresses_to_network_states[reachable] == NODE_NETWORK_REACHABLE
+    assert events.event_healthy.is_set()
+
+
+class Discovery:
+    def get(self, address):  # pylint: disable=unused-argument
+        return ('127.0.0.1', 1)
+
+
+class RaidenService:
+    def __init__(self):
+        self.address = factories.make_address()
+
+    def sign(self, message):
+        message.signature = bytes(65)
+        message.sender = self.address
+
+
+def make_udp_transport(**config):
+    transport_config = {
+        'retry_interval': 1,
+        'retries_before_backoff': 1,
+        'nat_keepalive_retries': 1,
+        'nat_keepalive_timeout': 1,
+        'nat_invitation_timeout': 1,
+    }
+    transport_config.update(config)
+
+    udpsocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udpsocket.bind(('127.0.0.1', 0))
+
+    transport = UDPTransport(
+        Discovery(),
+        udpsocket,
+        TokenBucket(1000, 1000),
+        transport_config,
+    )
+
+    transport.sent = list()
+    transport.maybe_send = lambda recipient, message: transport.sent.append(
+        (recipient, message),
+    )
+
+    return transport
+
+
+def test_delivered_coalesced_per_sender():
+    transport = make_udp_transport(delivered_batch_size=3, delivered_batch_timeout=0.01)
+    transport.start(RaidenService(), dict())
+    sender = factories.make_address()
+
+    transport.enqueue_delivered(sender, 1)
+    transport.enqueue_delivered(sender, 2)
+    assert transport.sent == []
+
+    # the batch is flushed by the timeout
+    gevent.sleep(0.05)
+    assert len(transport.sent) == 1
+    recipient, message = transport.sent[0]
+    assert recipient == sender
+    assert isinstance(message, DeliveredBatch)
+    assert message.delivered_message_identifiers == [1, 2]
+
+    # or as soon as it is full, which cancels the timeout
+    for identifier in range(3, 6):
+        transport.enqueue_delivered(sender, identifier)
+    assert transport.sent[1][1].delivered_message_identifiers == [3, 4, 5]
+    assert transport.senders_to_delivered_flushes == dict()
+
+    transport.enqueue_delivered(sender, 6)
+    transport.stop_and_wait()
+
+    # the pending acknowledgements are sent on stop, the flush does not run
+    assert len(transport.sent) == 3
+    assert isinstance(transport.sent[2][1], Delivered)
+    assert transport.senders_to_delivered_flushes == dict()
+    gevent.sleep(0.05)
+    assert len(transport.sent) == 3
+
+
+def test_ingress_queue_drop_newest():
+    transport = make_udp_transport(ingress_queue_size=2, ingress_policy='drop_newest')
+
+    for data in (b'first', b'second', b'third'):
+        transport._receive(data, ('127.0.0.1', 1))
+
+    assert list(transport.ingress_queue.queue) == [b'first', b'second']
+    assert transport.get_ingress_metrics() == {
+        'received': 3,
+        'processed': 0,
+        'dropped': 1,
+        'max_depth': 2,
+        'depth': 2,
+    }
+
+
+def test_ingress_queue_drop_oldest():
+    transport = make_udp_transport(ingress_queue_size=2, ingress_policy='drop_oldest')
+
+    for data in (b'first', b'second', b'third', b'fourth'):
+        transport._receive(data, ('127.0.0.1', 1))
+
+    assert list(transport.ingress_queue.queue) == [b'third', b'fourth']
+    assert transport.get_ingress_metrics() == {
+        'received': 4,
+        'processed': 0,
+        'dropped': 2,
+        'max_depth': 2,
+        'depth': 2,
+    }
+
+
+def test_ingress_workers_stop():
+    transport = make_udp_transport(ingress_queue_size=4, ingress_workers=3)
+    received = list()
+    transport.receive = received.append
+
+    transport.start(RaidenService(), dict())
+    workers = transport.greenlets[:3]
+
+    for data in (b'first', b'second'):
+        transport._receive(data, ('127.0.0.1', 1))
+
+    gevent.sleep(0.01)
+    assert received == [b'first', b'second']
+    assert transport.get_ingress_metrics()['processed'] == 2
+
+    transport.stop_and_wait()
+    assert all(worker.dead for worker in workers)
+    assert transport.ingress_queue.empty()
@@ -1,4 +1,8 @@
+import pytest
+
 from raiden.utils import privtopub, sha3
+from raiden.utils.dispatch import DispatchTable, get_dispatch_statistics
+from raiden.utils.interning import InternTable
 
 
 def test_privtopub():
@@ -7,3 +11,44 @@ def test_privtopub():
               '705f70c7554b26e82b90d2d1bbbaf711b10c6c8b807077f4070200a8fb4c6b771')
 
     assert pubkey == privtopub(privkey).hex()
+
+
+def test_dispatch_table():
+    table = DispatchTable('test_dispatch_table')
+    table.register(int, lambda value: value + 1)
+
+    with pytest.raises(ValueError):
+        table.register(int, lambda value: value)
+
+    # the dispatch is done on the exact type
+    assert table.get(bool) is None
+    assert table.get(int)(1) == 2
+    assert table.get(int)(2) == 3
+
+    statistics = get_dispatch_statistics()['test_dispatch_table']
+    assert statistics['int']['calls'] == 2
+    assert statistics['int']['time'] >= 0
+
+    table.reset_statistics()
+    assert table.get_statistics() == dict()
+
+
+def test_intern_table():
+    table = InternTable('test', 2)
+
+    first = bytes(bytearray(b'a' * 20))
+    second = bytes(bytearray(b'a' * 20))
+    assert first is not second
+
+    assert table.intern(first) is first
+    assert table.intern(second) is first
+
+    # values of other types are left to the caller's validation
+    assert table.intern(None) is None
+    assert table.intern(bytearray(first)) == first
+
+    # a full table is cleared, the new values are interned from then on
+    table.intern(b'b' * 20)
+    other = b'c' * 20
+    assert table.intern(other) is other
+    assert table.values == {other: other}
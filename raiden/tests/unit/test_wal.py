@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import sqlite3
 
+import gevent
 import pytest
 
 from raiden.transfer.architecture import State, StateManager
@@ -8,6 +9,8 @@ from raiden.storage.serialize import PickleSerializer
 from raiden.storage.sqlite import SQLiteStorage
 from raiden.storage.wal import (
     restore_from_latest_snapshot,
+    TOPIC_BLOCK,
+    topic_channel,
     WriteAheadLog,
 )
 from raiden.tests.utils import factories
@@ -17,6 +20,7 @@ from raiden.transfer.state_change import (
     Block,
     ContractReceiveChannelUnlock,
 )
+from raiden.waiting import wait_until
 
 
 def state_transition_noop(state, state_change):  # pylint: disable=unused-argument
@@ -157,3 +161,147 @@ def test_restore_without_snapshot():
 
     aggregate = newwal.state_manager.current_state
     assert aggregate.state_changes == [Block(5), Block(7), Block(8)]
+
+
+def test_log_and_dispatch_batch():
+    state_manager = StateManager(state_transtion_acc, None)
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    wal = WriteAheadLog(state_manager, storage)
+
+    wal.log_and_dispatch(Block(5), 5)
+    events = wal.log_and_dispatch_batch([Block(6), Block(7), Block(8)], 8)
+
+    assert not events
+    assert wal.state_manager.current_state.state_changes == [
+        Block(5),
+        Block(6),
+        Block(7),
+        Block(8),
+    ]
+
+    # each state change has its own identifier
+    assert wal.state_change_id == 4
+    state_changes = wal.storage.get_statechanges_by_identifier(
+        from_identifier=2,
+        to_identifier=3,
+    )
+    assert state_changes == [Block(6), Block(7)]
+
+    newwal, _ = restore_from_latest_snapshot(
+        state_transtion_acc,
+        wal.storage,
+    )
+    aggregate = newwal.state_manager.current_state
+    assert aggregate.state_changes == [Block(5), Block(6), Block(7), Block(8)]
+
+
+def test_write_read_archived_states():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    secrethash = factories.make_address()
+
+    assert storage.get_archived_state('payment', secrethash) is None
+
+    storage.write_archived_states(10, [('payment', secrethash, 'first')])
+    storage.write_archived_states(20, [('payment', secrethash, 'second')])
+
+    assert storage.get_archived_state('payment', secrethash) == (20, 'second')
+    assert storage.get_archived_state('channel', secrethash) is None
+
+
+def test_write_read_log_cursor():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+
+    assert storage.get_log_cursor() is None
+
+    storage.write_log_cursor(10)
+    storage.write_log_cursor(20)
+
+    assert storage.get_log_cursor() == 20
+
+
+def test_write_read_blockchain_logs():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    address = factories.make_address()
+
+    assert storage.get_blockchain_logs_range(address) is None
+
+    storage.write_blockchain_logs([address], 10, 20, [
+        (address, 15, 1, '0x01', 'second'),
+        (address, 12, 0, '0x02', 'first'),
+    ])
+    # contiguous ranges are merged
+    storage.write_blockchain_logs([address], 21, 30, [
+        (address, 25, 0, '0x01', 'third'),
+    ])
+    assert storage.get_blockchain_logs_range(address) == (10, 30)
+
+    assert storage.get_blockchain_logs(address, 0, 100) == ['first', 'second', 'third']
+    assert storage.get_blockchain_logs(address, 13, 25, ['0x01']) == ['second', 'third']
+
+    # an older disjoint range does not replace the cached range
+    storage.write_blockchain_logs([address], 0, 5, [])
+    assert storage.get_blockchain_logs_range(address) == (10, 30)
+
+    storage.write_blockchain_logs([address], 40, 50, [])
+    assert storage.get_blockchain_logs_range(address) == (40, 50)
+
+
+def test_wal_subscriptions():
+    wal = new_wal()
+
+    channel_identifier = factories.make_address()
+    subscription = wal.subscribe([topic_channel(channel_identifier)])
+    block_subscription = wal.subscribe([TOPIC_BLOCK])
+
+    waiter = gevent.spawn(subscription.wait)
+    gevent.sleep(0)
+
+    # only the subscriptions of the state change topics are notified
+    wal.log_and_dispatch(Block(1), 1)
+    gevent.sleep(0)
+    assert not waiter.ready()
+    assert block_subscription.wait(timeout=0)
+
+    unlock = ContractReceiveChannelUnlock(
+        factories.make_address(),
+        factories.make_address(),
+        channel_identifier,
+        factories.UNIT_SECRET,
+        factories.HOP1,
+    )
+    wal.log_and_dispatch_batch([Block(2), unlock], 2)
+    assert waiter.get(timeout=1)
+    assert block_subscription.wait(timeout=0)
+    assert not block_subscription.wait(timeout=0)
+
+    wal.unsubscribe(subscription)
+    wal.unsubscribe(block_subscription)
+    assert not wal.topics_to_subscriptions
+
+
+class RaidenService:
+    def __init__(self, wal):
+        self.wal = wal
+
+
+def test_wait_until_follows_the_wal():
+    first_wal = new_wal()
+    raiden = RaidenService(first_wal)
+    done = list()
+
+    waiter = gevent.spawn(wait_until, raiden, [TOPIC_BLOCK], lambda: done, 0.01)
+    gevent.sleep(0)
+    assert first_wal.topics_to_subscriptions
+
+    # a restart replaces the write-ahead log while the waiter is blocked
+    second_wal = new_wal()
+    raiden.wal = second_wal
+    gevent.sleep(0.05)
+    assert not waiter.ready()
+    assert not first_wal.topics_to_subscriptions
+    assert second_wal.topics_to_subscriptions
+
+    done.append(True)
+    second_wal.log_and_dispatch(Block(1), 1)
+    assert waiter.get(timeout=1) is None
+    assert not second_wal.topics_to_subscriptions
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import gevent
+from gevent.pool import Group
+from requests.exceptions import RequestException
+import structlog
+
+from raiden.exceptions import (
+    AddressWithoutCode,
+    ChannelBusyError,
+    EthNodeCommunicationError,
+    RaidenShuttingDown,
+    TransactionThrew,
+)
+from raiden.network.rpc.transactions import check_transaction_threw
+from raiden.raiden_event_handler import CONTRACT_SEND_HANDLERS
+from raiden.settings import DEFAULT_TRANSACTION_MAX_RETRY_TIMEOUT
+from raiden.utils import encode_hex, pex
+# type alias to avoid both circular dependencies and flake8 errors
+RaidenService = 'RaidenService'
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+class TransactionManager:
+    """ Sends the transactions of the contract send events outside of the
+    processing of the state changes.
+
+    Each event is handled by its own greenlet, which sends the transaction
+    and waits for its receipt, so that the node keeps processing state
+    changes while the transaction is mined. The transactions for the same
+    channel are sent in order, and one is retried while another operation
+    holds the channel or while the ethereum node is not reachable. The
+    results are fed back to the state machine by the blockchain events of the
+    transactions.
+
+    The events are saved in the storage until their transaction is done, the
+    transactions interrupted by a shutdown or a crash are sent again by
+    `start`. The hashes of the transactions are saved as soon as these are
+    broadcast, a transaction is never sent twice for the same event: once a
+    transaction was broadcast a failure only waits for it again.
+    """
+
+    def __init__(
+            self,
+            raiden: RaidenService,
+            retry_timeout: float,
+            max_retry_timeout: float = DEFAULT_TRANSACTION_MAX_RETRY_TIMEOUT,
+    ):
+        self.raiden = raiden
+        self.retry_timeout = retry_timeout
+        self.max_retry_timeout = max_retry_timeout
+
+        self.greenlets = Group()
+        self.identifiers_to_events = dict()
+        # The last greenlet started for each channel
+        self.channels_to_greenlets = dict()
+
+    def start(self):
+        """ Sends the transactions which were pending on shutdown. """
+        storage = self.raiden.wal.storage
+
+        for identifier, event in storage.get_pending_transactions():
+            self.send_async(identifier, event)
+
+    def stop(self, timeout: float = None):
+        self.greenlets.kill(timeout=timeout)
+
+    def submit(self, event):
+        """ Saves `event` and sends its transaction asynchronously. """
+        # The events are dispatched again on restart, these may be pending
+        # already
+        for pending_event in self.identifiers_to_events.values():
+            if pending_event == event:
+                return
+
+        identifier = self.raiden.wal.storage.write_pending_transaction(event)
+        self.send_async(identifier, event)
+
+    def send_async(self, identifier: int, event):
+        self.identifiers_to_events[identifier] = event
+
+        channel_identifier = event.channel_identifier
+        previous = self.channels_to_greenlets.get(channel_identifier)
+        greenlet = self.greenlets.spawn(self.send, identifier, event, previous)
+        self.channels_to_greenlets[channel_identifier] = greenlet
+
+    def send(self, identifier: int, event, previous: gevent.Greenlet = None):
+        if previous is not None:
+            previous.join()
+
+        handler = CONTRACT_SEND_HANDLERS.get(type(event))
+        client = self.raiden.chain.client
+        storage = self.raiden.wal.storage
+        backoff = self.retry_timeout
+
+        transaction_hashes = storage.get_pending_transaction_hashes(identifier)
+
+        def transaction_sent(transaction_hash):
+            storage.write_pending_transaction_hash(identifier, transaction_hash)
+            transaction_hashes.append(transaction_hash)
+
+        while True:
+            try:
+                if transaction_hashes:
+                    # Sending the transactions again would race the ones
+                    # already broadcast, e.g. the failure happened while
+                    # polling for the receipt
+                    self.wait_for_transactions(transaction_hashes)
+                else:
+                    with client.observe_transactions(transaction_sent):
+                        handler(self.raiden, event)
+            except ChannelBusyError:
+                gevent.sleep(self.retry_timeout)
+                continue
+            except RaidenShuttingDown:
+                # Sent again on restart
+                return
+            except (EthNodeCommunicationError, RequestException) as e:
+                # The node is not reachable, retry until it recovers
+                log.warning(
+                    'Contract transaction failed, retrying',
+                    node=pex(self.raiden.address),
+                    raiden_event=event,
+                    error=str(e),
+                    retry_in=backoff,
+                    sent=len(transaction_hashes),
+                )
+                gevent.sleep(backoff)
+                backoff = min(backoff * 2, self.max_retry_timeout)
+                continue
+            except (AddressWithoutCode, TransactionThrew) as e:
+                log.error(
+                    'Contract transaction failed',
+                    node=pex(self.raiden.address),
+                    raiden_event=event,
+                    error=str(e),
+                )
+            except Exception:  # pylint: disable=broad-except
+                # The event must be cleared, otherwise it would be pending
+                # until a restart and the submissions of the same event would
+                # be ignored
+                log.exception(
+                    'Contract transaction failed',
+                    node=pex(self.raiden.address),
+                    raiden_event=event,
+                )
+            break
+
+        self.raiden.wal.storage.delete_pending_transaction(identifier)
+        del self.identifiers_to_events[identifier]
+
+        channel_identifier = event.channel_identifier
+        if self.channels_to_greenlets.get(channel_identifier) is gevent.getcurrent():
+            del self.channels_to_greenlets[channel_identifier]
+
+    def wait_for_transactions(self, transaction_hashes):
+        """ Wait for the transactions which were already broadcast and check
+        that they did not throw.
+        """
+        client = self.raiden.chain.client
+
+        for transaction_hash in transaction_hashes:
+            client.poll(transaction_hash, timeout=self.raiden.chain.poll_timeout)
+
+            receipt_or_none = check_transaction_threw(client, encode_hex(transaction_hash))
+            if receipt_or_none:
+                raise TransactionThrew('Contract transaction', receipt_or_none)
@@ -94,20 +94,29 @@ class StateManager:
     __slots__ = (
         'state_transition',
         'current_state',
+        'unchanged_substates',
     )
 
-    def __init__(self, state_transition, current_state):
+    def __init__(self, state_transition, current_state, unchanged_substates=None):
         """ Initialize the state manager.
 
         Args:
             state_transition: function that can apply a StateChange message.
             current_state: current application state.
+            unchanged_substates: optional function that, given the current
+                state and a state change, returns the substates which are not
+                modified by the state change. These substates are shared with
+                the next state instead of being copied.
         """
         if not callable(state_transition):
             raise ValueError('state_transition must be a callable')
 
+        if unchanged_substates is not None and not callable(unchanged_substates):
+            raise ValueError('unchanged_substates must be a callable')
+
         self.state_transition = state_transition
         self.current_state = current_state
+        self.unchanged_substates = unchanged_substates
 
     def dispatch(self, state_change: StateChange) -> List[Event]:
         """ Apply the `state_change` in the current machine and return the
@@ -126,7 +135,14 @@ class StateManager:
 
         # the state objects must be treated as immutable, so make a copy of the
         # current state and pass the copy to the state machine to be modified.
-        next_state = deepcopy(self.current_state)
+        # The substates which are not modified by the state change are added
+        # to the memo, so that deepcopy reuses them.
+        memo = dict()
+        if self.unchanged_substates is not None and self.current_state is not None:
+            for substate in self.unchanged_substates(self.current_state, state_change):
+                memo[id(substate)] = substate
+
+        next_state = deepcopy(self.current_state, memo)
 
         # update the current state by applying the change
         iteration = self.state_transition(
@@ -144,6 +160,35 @@ class StateManager:
 
         return events
 
+    def dispatch_batch(self, state_changes: List[StateChange]) -> List[List[Event]]:
+        """ Apply the `state_changes` in order and return the events produced
+        by each of them.
+
+        The current state is copied only once for the whole batch, the
+        intermediary states are not visible outside of the state machine.
+        """
+        assert all(isinstance(state_change, StateChange) for state_change in state_changes)
+
+        next_state = deepcopy(self.current_state)
+
+        events_per_state_change = list()
+        for state_change in state_changes:
+            iteration = self.state_transition(
+                next_state,
+                state_change,
+            )
+
+            assert isinstance(iteration, TransitionResult)
+            assert all(isinstance(e, Event) for e in iteration.events)
+
+            next_state = iteration.new_state
+            events_per_state_change.append(iteration.events)
+
+        assert isinstance(next_state, (State, type(None)))
+        self.current_state = next_state
+
+        return events_per_state_change
+
     def __eq__(self, other):
         return (
             isinstance(other, StateManager) and
@@ -72,6 +72,7 @@ from raiden.transfer.state_change import (
     ReceiveUnlock,
 )
 from raiden.utils import publickey_to_address, typing
+from raiden.utils.dispatch import DispatchTable
 from raiden.settings import DEFAULT_NUMBER_OF_CONFIRMATIONS_BLOCK
 
 # This should be changed to `Union[str, MerkleTreeState]`
@@ -80,6 +81,11 @@ EventsOrError = typing.Tuple[bool, typing.List[Event], typing.Any]
 BalanceProofData = typing.Tuple[typing.Locksroot, typing.Nonce, typing.TokenAmount]
 SendUnlockAndMerkleTree = typing.Tuple[SendBalanceProof, MerkleTreeState]
 
+# Debug switch, checks the running totals of the locked amounts against the
+# pending locks on every lock change. The check is O(locks), it is off by
+# default and enabled by the test suite.
+CHECK_AMOUNT_LOCKED_CONSISTENCY = False
+
 
 TransactionOrder = namedtuple(
     'TransactionOrder',
@@ -100,6 +106,28 @@ def is_lock_pending(
     )
 
 
+def is_amount_locked_consistent(end_state: NettingChannelEndState) -> bool:
+    """True if the running totals of `end_state` match the pending locks.
+
+    This is O(locks), the state transitions check it only when
+    `CHECK_AMOUNT_LOCKED_CONSISTENCY` is set.
+    """
+    total_pending = sum(
+        lock.amount
+        for lock in end_state.secrethashes_to_lockedlocks.values()
+    )
+
+    total_unclaimed = sum(
+        unlock.lock.amount
+        for unlock in end_state.secrethashes_to_unlockedlocks.values()
+    )
+
+    return (
+        end_state.locked_amount == total_pending and
+        end_state.unlocked_amount == total_unclaimed
+    )
+
+
 def is_deposit_confirmed(
         channel_state: NettingChannelState,
         block_number: typing.BlockNumber,
@@ -548,17 +576,7 @@ def is_valid_unlock(
 
 
 def get_amount_locked(end_state: NettingChannelEndState) -> typing.Balance:
-    total_pending = sum(
-        lock.amount
-        for lock in end_state.secrethashes_to_lockedlocks.values()
-    )
-
-    total_unclaimed = sum(
-        unlock.lock.amount
-        for unlock in end_state.secrethashes_to_unlockedlocks.values()
-    )
-
-    return total_pending + total_unclaimed
+    return end_state.locked_amount + end_state.unlocked_amount
 
 
 def get_balance(
@@ -711,10 +729,32 @@ def _del_lock(end_state: NettingChannelEndState, secrethash: typing.SecretHash)
     assert is_lock_pending(end_state, secrethash)
 
     if secrethash in end_state.secrethashes_to_lockedlocks:
-        del end_state.secrethashes_to_lockedlocks[secrethash]
+        lock = end_state.secrethashes_to_lockedlocks.pop(secrethash)
+        end_state.locked_amount -= lock.amount
 
     if secrethash in end_state.secrethashes_to_unlockedlocks:
-        del end_state.secrethashes_to_unlockedlocks[secrethash]
+        unlock = end_state.secrethashes_to_unlockedlocks.pop(secrethash)
+        end_state.unlocked_amount -= unlock.lock.amount
+
+    if CHECK_AMOUNT_LOCKED_CONSISTENCY:
+        assert is_amount_locked_consistent(end_state)
+
+
+def _add_lockedlock(end_state: NettingChannelEndState, lock: HashTimeLockState) -> None:
+    """Adds the lock to the indexing structures.
+
+    Note:
+        This won't change the merkletree!
+    """
+    replaced_lock = end_state.secrethashes_to_lockedlocks.get(lock.secrethash)
+    if replaced_lock is not None:
+        end_state.locked_amount -= replaced_lock.amount
+
+    end_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+    end_state.locked_amount += lock.amount
+
+    if CHECK_AMOUNT_LOCKED_CONSISTENCY:
+        assert is_amount_locked_consistent(end_state)
 
 
 def set_closed(
@@ -1032,7 +1072,7 @@ def send_lockedtransfer(
     lock = transfer.lock
     channel_state.our_state.balance_proof = transfer.balance_proof
     channel_state.our_state.merkletree = merkletree
-    channel_state.our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+    _add_lockedlock(channel_state.our_state, lock)
 
     return send_locked_transfer_event
 
@@ -1066,7 +1106,7 @@ def send_refundtransfer(
 
     channel_state.our_state.balance_proof = mediated_transfer.balance_proof
     channel_state.our_state.merkletree = merkletree
-    channel_state.our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+    _add_lockedlock(channel_state.our_state, lock)
 
     refund_transfer = refund_from_sendmediated(send_mediated_transfer)
     return refund_transfer
@@ -1128,13 +1168,17 @@ def register_secret_endstate(
         secrethash: typing.SecretHash,
 ) -> None:
     if is_lock_locked(end_state, secrethash):
-        pendinglock = end_state.secrethashes_to_lockedlocks[secrethash]
-        del end_state.secrethashes_to_lockedlocks[secrethash]
+        pendinglock = end_state.secrethashes_to_lockedlocks.pop(secrethash)
+        end_state.locked_amount -= pendinglock.amount
 
         end_state.secrethashes_to_unlockedlocks[secrethash] = UnlockPartialProofState(
             pendinglock,
             secret,
         )
+        end_state.unlocked_amount += pendinglock.amount
+
+        if CHECK_AMOUNT_LOCKED_CONSISTENCY:
+            assert is_amount_locked_consistent(end_state)
 
 
 def register_secret(
@@ -1276,7 +1320,7 @@ def handle_receive_lockedtransfer(
         channel_state.partner_state.merkletree = merkletree
 
         lock = mediated_transfer.lock
-        channel_state.partner_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+        _add_lockedlock(channel_state.partner_state, lock)
 
         send_processed = SendProcessed(
             mediated_transfer.balance_proof.sender,
@@ -1324,6 +1368,41 @@ def handle_unlock(channel_state: NettingChannelState, unlock: ReceiveUnlock) ->
     return is_valid, events, msg
 
 
+def is_finalized(channel_state: NettingChannelState) -> bool:
+    """True if the channel is settled and there are no locks with a known
+    secret left to unlock, the state of the channel will not change anymore.
+    """
+    return (
+        get_status(channel_state) == CHANNEL_STATE_SETTLED and
+        not channel_state.our_state.secrethashes_to_unlockedlocks and
+        not channel_state.partner_state.secrethashes_to_unlockedlocks
+    )
+
+
+def get_block_deadline(
+        channel_state: NettingChannelState,
+) -> typing.Optional[typing.BlockNumber]:
+    """ Return the first block at which `handle_block` has work to do for
+    this channel, or None if a Block state change is a no-op for it.
+    """
+    deadlines = list()
+
+    if get_status(channel_state) == CHANNEL_STATE_CLOSED:
+        closed_block_number = channel_state.close_transaction.finished_block_number
+        settlement_end = closed_block_number + channel_state.settle_timeout
+        deadlines.append(settlement_end + 1)
+
+    if channel_state.deposit_transaction_queue:
+        transaction_block_number = channel_state.deposit_transaction_queue[0].block_number
+        confirmation_block = transaction_block_number + DEFAULT_NUMBER_OF_CONFIRMATIONS_BLOCK
+        deadlines.append(confirmation_block + 1)
+
+    if deadlines:
+        return min(deadlines)
+
+    return None
+
+
 def handle_block(
         channel_state: NettingChannelState,
         state_change: Block,
@@ -1541,45 +1620,60 @@ def handle_channel_unlock(
     return TransitionResult(channel_state, events)
 
 
+# All the handlers are called with the arguments
+# (channel_state, state_change, pseudo_random_generator, block_number)
+CHANNEL_STATE_TRANSITIONS = DispatchTable('channel')
+CHANNEL_STATE_TRANSITIONS.register(
+    Block,
+    lambda state, change, prng, block: handle_block(state, change, block),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ActionChannelClose,
+    lambda state, change, prng, block: handle_action_close(state, change, block),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ActionTransferDirect,
+    lambda state, change, prng, block: handle_send_directtransfer(state, change, prng),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ContractReceiveChannelClosed,
+    lambda state, change, prng, block: handle_channel_closed(state, change),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ContractReceiveChannelSettled,
+    lambda state, change, prng, block: handle_channel_settled(state, change),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ContractReceiveChannelNewBalance,
+    lambda state, change, prng, block: handle_channel_newbalance(state, change, block),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ContractReceiveChannelUnlock,
+    lambda state, change, prng, block: handle_channel_unlock(state, change),
+)
+CHANNEL_STATE_TRANSITIONS.register(
+    ReceiveTransferDirect,
+    lambda state, change, prng, block: handle_receive_directtransfer(state, change),
+)
+
+
 def state_transition(
         channel_state: NettingChannelState,
         state_change: StateChange,
         pseudo_random_generator: typing.Any,
         block_number: typing.BlockNumber,
 ) -> TransitionResult:
-    # pylint: disable=too-many-branches,unidiomatic-typecheck
-
-    events: typing.List[Event] = list()
-    iteration = TransitionResult(channel_state, events)
-
-    if type(state_change) == Block:
-        iteration = handle_block(channel_state, state_change, block_number)
-
-    elif type(state_change) == ActionChannelClose:
-        iteration = handle_action_close(channel_state, state_change, block_number)
+    handler = CHANNEL_STATE_TRANSITIONS.get(type(state_change))
 
-    elif type(state_change) == ActionTransferDirect:
-        iteration = handle_send_directtransfer(
+    if handler is not None:
+        iteration = handler(
             channel_state,
             state_change,
             pseudo_random_generator,
+            block_number,
         )
-
-    elif type(state_change) == ContractReceiveChannelClosed:
-        iteration = handle_channel_closed(channel_state, state_change)
-        # iteration = handle_channel_closed2(channel_state, state_change)
-
-    elif type(state_change) == ContractReceiveChannelSettled:
-        iteration = handle_channel_settled(channel_state, state_change)
-        # iteration = handle_channel_settled2(channel_state, state_change)
-
-    elif type(state_change) == ContractReceiveChannelNewBalance:
-        iteration = handle_channel_newbalance(channel_state, state_change, block_number)
-
-    elif type(state_change) == ContractReceiveChannelUnlock:
-        iteration = handle_channel_unlock(channel_state, state_change)
-
-    elif type(state_change) == ReceiveTransferDirect:
-        iteration = handle_receive_directtransfer(channel_state, state_change)
+    else:
+        events: typing.List[Event] = list()
+        iteration = TransitionResult(channel_state, events)
 
     return iteration
@@ -39,6 +39,7 @@ from raiden.transfer.state_change import (
     ReceiveUnlock,
 )
 from raiden.utils import sha3
+from raiden.utils.dispatch import DispatchTable
 
 # Reduce the lock expiration by some additional blocks to prevent this exploit:
 # The payee could reveal the secret on it's lock expiration block, the lock
@@ -285,6 +286,14 @@ def sanity_check(state):
         assert original.payee_transfer.lock.expiration > refund.payer_transfer.lock.expiration
 
 
+def is_finalized(state):
+    """ True if every transfer pair reached a final state, paid or expired. """
+    return (
+        bool(state.transfers_pair) and
+        not get_pending_transfer_pairs(state.transfers_pair)
+    )
+
+
 def clear_if_finalized(iteration):
     """ Clear the state if all transfer pairs have finalized. """
     state = iteration.new_state
@@ -923,6 +932,31 @@ def handle_init(
     return TransitionResult(iteration.new_state, events)
 
 
+def get_block_deadline(channelidentifiers_to_channels, state):
+    """ Return the first block at which `handle_block` has work to do for the
+    pending pairs, or None if a Block state change is a no-op for them.
+    """
+    deadlines = list()
+
+    for pair in get_pending_transfer_pairs(state.transfers_pair):
+        payer_expiration = pair.payer_transfer.lock.expiration
+        payer_channel_identifier = pair.payer_transfer.balance_proof.channel_address
+        payer_channel = channelidentifiers_to_channels.get(payer_channel_identifier)
+
+        # first block at which it is not safe to wait for the payer
+        if payer_channel is not None:
+            deadlines.append(payer_expiration - payer_channel.reveal_timeout)
+
+        # first blocks at which the locks expire
+        deadlines.append(payer_expiration + 1)
+        deadlines.append(pair.payee_transfer.lock.expiration + 1)
+
+    if deadlines:
+        return min(deadlines)
+
+    return None
+
+
 def handle_block(channelidentifiers_to_channels, state, state_change, block_number):
     """ After Raiden learns about a new block this function must be called to
     handle expiration of the hash time locks.
@@ -1160,6 +1194,45 @@ def handle_unlock(mediator_state, state_change, channelidentifiers_to_channels):
     return iteration
 
 
+def handle_action_init(
+        mediator_state,
+        state_change,
+        channelidentifiers_to_channels,
+        pseudo_random_generator,
+        block_number,
+):
+    """ Initialize the mediator, the state change is ignored if the transfer
+    is already being mediated.
+    """
+    if mediator_state is None:
+        return handle_init(
+            state_change,
+            channelidentifiers_to_channels,
+            pseudo_random_generator,
+            block_number,
+        )
+
+    return TransitionResult(mediator_state, list())
+
+
+# All the handlers are called with the arguments
+# (mediator_state, state_change, channelidentifiers_to_channels,
+#  pseudo_random_generator, block_number)
+MEDIATOR_STATE_TRANSITIONS = DispatchTable('mediator')
+MEDIATOR_STATE_TRANSITIONS.register(ActionInitMediator, handle_action_init)
+MEDIATOR_STATE_TRANSITIONS.register(
+    Block,
+    lambda state, change, channels, prng, block: handle_block(channels, state, change, block),
+)
+MEDIATOR_STATE_TRANSITIONS.register(ReceiveTransferRefund, handle_refundtransfer)
+MEDIATOR_STATE_TRANSITIONS.register(ReceiveSecretReveal, handle_secretreveal)
+MEDIATOR_STATE_TRANSITIONS.register(ContractReceiveChannelUnlock, handle_contractunlock)
+MEDIATOR_STATE_TRANSITIONS.register(
+    ReceiveUnlock,
+    lambda state, change, channels, prng, block: handle_unlock(state, change, channels),
+)
+
+
 def state_transition(
         mediator_state,
         state_change,
@@ -1168,65 +1241,24 @@ def state_transition(
         block_number,
 ):
     """ State machine for a node mediating a transfer. """
-    # pylint: disable=too-many-branches
     # Notes:
     # - A user cannot cancel a mediated transfer after it was initiated, she
     #   may only reject to mediate before hand. This is because the mediator
     #   doesn't control the secret reveal and needs to wait for the lock
     #   expiration before safely discarding the transfer.
 
-    iteration = TransitionResult(mediator_state, list())
+    handler = MEDIATOR_STATE_TRANSITIONS.get(type(state_change))
 
-    if isinstance(state_change, ActionInitMediator):
-        if mediator_state is None:
-            iteration = handle_init(
-                state_change,
-                channelidentifiers_to_channels,
-                pseudo_random_generator,
-                block_number,
-            )
-
-    elif isinstance(state_change, Block):
-        iteration = handle_block(
-            channelidentifiers_to_channels,
-            mediator_state,
-            state_change,
-            block_number,
-        )
-
-    elif isinstance(state_change, ReceiveTransferRefund):
-        iteration = handle_refundtransfer(
+    if handler is not None:
+        iteration = handler(
             mediator_state,
             state_change,
             channelidentifiers_to_channels,
             pseudo_random_generator,
             block_number,
         )
-
-    elif isinstance(state_change, ReceiveSecretReveal):
-        iteration = handle_secretreveal(
-            mediator_state,
-            state_change,
-            channelidentifiers_to_channels,
-            pseudo_random_generator,
-            block_number,
-        )
-
-    elif isinstance(state_change, ContractReceiveChannelUnlock):
-        iteration = handle_contractunlock(
-            mediator_state,
-            state_change,
-            channelidentifiers_to_channels,
-            pseudo_random_generator,
-            block_number,
-        )
-
-    elif isinstance(state_change, ReceiveUnlock):
-        iteration = handle_unlock(
-            mediator_state,
-            state_change,
-            channelidentifiers_to_channels,
-        )
+    else:
+        iteration = TransitionResult(mediator_state, list())
 
     # this is the place for paranoia
     if iteration.new_state is not None:
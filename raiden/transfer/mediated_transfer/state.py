@@ -2,6 +2,7 @@
 # pylint: disable=too-few-public-methods,too-many-arguments,too-many-instance-attributes
 from raiden.transfer.architecture import State
 from raiden.utils import pex, sha3, typing, encode_hex
+from raiden.utils.interning import intern_address, intern_hash
 from raiden.transfer.state import (
     EMPTY_MERKLE_ROOT,
     balanceproof_from_envelope,
@@ -93,7 +94,7 @@ class InitiatorTransferState(State):
         self.transfer_description = transfer_description
 
         # This it the channel used to satisfy the above transfer.
-        self.channel_identifier = channel_identifier
+        self.channel_identifier = intern_address(channel_identifier)
         self.transfer = None
         self.secretrequest = None
         self.revealsecret = None
@@ -134,7 +135,7 @@ class MediatorTransferState(State):
 
     def __init__(self, secrethash: typing.Keccak256):
         # for convenience
-        self.secrethash = secrethash
+        self.secrethash = intern_hash(secrethash)
         self.secret = None
         self.transfers_pair = list()
 
@@ -235,11 +236,11 @@ class LockedTransferUnsignedState(State):
             raise ValueError('balance_proof must not be empty')
 
         self.payment_identifier = payment_identifier
-        self.token = token
+        self.token = intern_address(token)
         self.balance_proof = balance_proof
         self.lock = lock
-        self.initiator = initiator
-        self.target = target
+        self.initiator = intern_address(initiator)
+        self.target = intern_address(target)
 
     def __repr__(self):
         return (
@@ -308,11 +309,11 @@ class LockedTransferSignedState(State):
 
         self.message_identifier = message_identifier
         self.payment_identifier = payment_identifier
-        self.token = token
+        self.token = intern_address(token)
         self.balance_proof = balance_proof
         self.lock = lock
-        self.initiator = initiator
-        self.target = target
+        self.initiator = intern_address(initiator)
+        self.target = intern_address(target)
 
     def __repr__(self):
         return (
@@ -373,11 +374,11 @@ class TransferDescriptionWithSecretState(State):
 
         self.payment_identifier = payment_identifier
         self.amount = amount
-        self.token_network_identifier = token_network_identifier
-        self.initiator = initiator
-        self.target = target
+        self.token_network_identifier = intern_address(token_network_identifier)
+        self.initiator = intern_address(initiator)
+        self.target = intern_address(target)
         self.secret = secret
-        self.secrethash = secrethash
+        self.secrethash = intern_hash(secrethash)
 
     def __repr__(self):
         return (
@@ -478,7 +479,7 @@ class MediationPairState(State):
             raise ValueError('payee_transfer must be a LockedTransferUnsignedState instance')
 
         self.payer_transfer = payer_transfer
-        self.payee_address = payee_address
+        self.payee_address = intern_address(payee_address)
         self.payee_transfer = payee_transfer
 
         # these transfers are settled on different payment channels. These are
@@ -210,6 +210,18 @@ def handle_unlock(target_state, state_change, channel_state):
     return iteration
 
 
+def is_finalized(target_state):
+    """ True if the lock expired before the secret was learned. """
+    return target_state.state == 'expired'
+
+
+def get_block_deadline(target_state, channel_state):
+    """ Return the first block at which `handle_block` has work to do, from
+    that block onwards it is not safe to wait for the unlock.
+    """
+    return target_state.transfer.lock.expiration - channel_state.reveal_timeout
+
+
 def handle_block(target_state, channel_state, block_number):
     """ After Raiden learns about a new block this function must be called to
     handle expiration of the hash time lock.
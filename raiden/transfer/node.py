@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import heapq
+
 from raiden.transfer import (
     channel,
     token_network,
@@ -24,6 +26,7 @@ from raiden.transfer.state_change import (
     ActionInitNode,
     ActionLeaveAllNetworks,
     ActionNewTokenNetwork,
+    ActionPruneState,
     ActionTransferDirect,
     Block,
     ContractReceiveChannelClosed,
@@ -35,6 +38,7 @@ from raiden.transfer.state_change import (
     ContractReceiveNewTokenNetwork,
     ContractReceiveRouteNew,
     ReceiveDelivered,
+    ReceiveDeliveredBatch,
     ReceiveProcessed,
     ReceiveTransferDirect,
     ReceiveUnlock,
@@ -48,6 +52,10 @@ from raiden.transfer.mediated_transfer.state_change import (
     ReceiveTransferRefund,
     ReceiveTransferRefundCancelRoute,
 )
+from raiden.utils.dispatch import DispatchTable
+
+DEADLINE_CHANNEL = 'channel'
+DEADLINE_PAYMENT = 'payment'
 
 
 def get_networks(node_state, payment_network_identifier, token_address):
@@ -74,29 +82,127 @@ def get_token_network_by_token_address(node_state, payment_network_identifier, t
     return token_network_state
 
 
-def subdispatch_to_all_channels(node_state, state_change, block_number):
-    events = list()
+def schedule_block_deadline(node_state, kind, key, block_number):
+    """ Set the block at which `key` must receive the next Block state change,
+    `block_number` None removes it from the index.
+    """
+    entry = (kind, key)
+    current_block_number = node_state.keys_to_block_deadlines.get(entry)
 
-    for payment_network in node_state.identifiers_to_paymentnetworks.values():
-        for token_network_state in payment_network.tokenaddresses_to_tokennetworks.values():
-            for channel_state in token_network_state.channelidentifiers_to_channels.values():
-                result = channel.state_transition(
-                    channel_state,
-                    state_change,
-                    node_state.pseudo_random_generator,
-                    block_number,
-                )
-                events.extend(result.events)
+    if block_number is None:
+        # The heap entry becomes stale and is dropped once it's due
+        if current_block_number is not None:
+            del node_state.keys_to_block_deadlines[entry]
 
-    return TransitionResult(node_state, events)
+    elif current_block_number != block_number:
+        node_state.keys_to_block_deadlines[entry] = block_number
+        heapq.heappush(node_state.block_deadlines, (block_number, kind, key))
+
+
+def pop_due_block_deadlines(node_state, block_number):
+    """ Remove and return the (kind, key) pairs due at `block_number`. """
+    due = list()
+    heap = node_state.block_deadlines
+
+    while heap and heap[0][0] <= block_number:
+        deadline, kind, key = heapq.heappop(heap)
+        entry = (kind, key)
+
+        if node_state.keys_to_block_deadlines.get(entry) == deadline:
+            del node_state.keys_to_block_deadlines[entry]
+            due.append(entry)
+
+    return due
+
+
+def mark_finalized(node_state, kind, key, is_finalized):
+    """ Record the block at which `key` reached a final state, it is removed
+    from the live state by ActionPruneState after the retention period.
+    """
+    entry = (kind, key)
+
+    if not is_finalized:
+        node_state.keys_to_finalized_blocks.pop(entry, None)
+    elif entry not in node_state.keys_to_finalized_blocks:
+        node_state.keys_to_finalized_blocks[entry] = node_state.block_number
+
+
+def schedule_channel(node_state, token_network_identifier, channel_identifier):
+    channel_state = views.get_channelstate_by_token_network_identifier(
+        node_state,
+        token_network_identifier,
+        channel_identifier,
+    )
+
+    block_number = None
+    is_finalized = False
+    if channel_state:
+        block_number = channel.get_block_deadline(channel_state)
+        is_finalized = channel.is_finalized(channel_state)
 
+    key = (token_network_identifier, channel_identifier)
+    schedule_block_deadline(node_state, DEADLINE_CHANNEL, key, block_number)
+    mark_finalized(node_state, DEADLINE_CHANNEL, key, is_finalized)
+
+
+def schedule_paymenttask(node_state, secrethash):
+    sub_task = node_state.payment_mapping.secrethashes_to_task.get(secrethash)
+    block_number = None
+    is_finalized = False
+
+    # The initiator does not react to new blocks
+    if isinstance(sub_task, PaymentMappingState.MediatorTask):
+        token_network_state = views.get_token_network_by_identifier(
+            node_state,
+            sub_task.token_network_identifier,
+        )
+
+        if token_network_state:
+            block_number = mediator.get_block_deadline(
+                token_network_state.channelidentifiers_to_channels,
+                sub_task.mediator_state,
+            )
+
+        is_finalized = mediator.is_finalized(sub_task.mediator_state)
+
+    elif isinstance(sub_task, PaymentMappingState.TargetTask):
+        channel_state = views.get_channelstate_by_token_network_identifier(
+            node_state,
+            sub_task.token_network_identifier,
+            sub_task.channel_identifier,
+        )
+
+        if channel_state:
+            block_number = target.get_block_deadline(
+                sub_task.target_state,
+                channel_state,
+            )
+
+        is_finalized = target.is_finalized(sub_task.target_state)
+
+    schedule_block_deadline(node_state, DEADLINE_PAYMENT, secrethash, block_number)
+    mark_finalized(node_state, DEADLINE_PAYMENT, secrethash, is_finalized)
+
+
+def subdispatch_to_channel_by_deadline(node_state, state_change, key):
+    token_network_identifier, channel_identifier = key
+    channel_state = views.get_channelstate_by_token_network_identifier(
+        node_state,
+        token_network_identifier,
+        channel_identifier,
+    )
 
-def subdispatch_to_all_lockedtransfers(node_state, state_change):
     events = list()
+    if channel_state:
+        result = channel.state_transition(
+            channel_state,
+            state_change,
+            node_state.pseudo_random_generator,
+            node_state.block_number,
+        )
+        events = result.events
 
-    for secrethash in node_state.payment_mapping.secrethashes_to_task.keys():
-        result = subdispatch_to_paymenttask(node_state, state_change, secrethash)
-        events.extend(result.events)
+        schedule_channel(node_state, token_network_identifier, channel_identifier)
 
     return TransitionResult(node_state, events)
 
@@ -171,6 +277,8 @@ def subdispatch_to_paymenttask(node_state, state_change, secrethash):
         if sub_iteration and sub_iteration.new_state is None:
             del node_state.payment_mapping.secrethashes_to_task[secrethash]
 
+        schedule_paymenttask(node_state, secrethash)
+
     return TransitionResult(node_state, events)
 
 
@@ -222,6 +330,8 @@ def subdispatch_initiatortask(
         elif secrethash in node_state.payment_mapping.secrethashes_to_task:
             del node_state.payment_mapping.secrethashes_to_task[secrethash]
 
+        schedule_paymenttask(node_state, secrethash)
+
     return TransitionResult(node_state, events)
 
 
@@ -273,6 +383,8 @@ def subdispatch_mediatortask(
         elif secrethash in node_state.payment_mapping.secrethashes_to_task:
             del node_state.payment_mapping.secrethashes_to_task[secrethash]
 
+        schedule_paymenttask(node_state, secrethash)
+
     return TransitionResult(node_state, events)
 
 
@@ -330,9 +442,124 @@ def subdispatch_targettask(
         elif secrethash in node_state.payment_mapping.secrethashes_to_task:
             del node_state.payment_mapping.secrethashes_to_task[secrethash]
 
+        schedule_paymenttask(node_state, secrethash)
+
     return TransitionResult(node_state, events)
 
 
+def index_channel(node_state, token_network_identifier, channel_state):
+    channel_identifier = channel_state.identifier
+    partner_address = channel_state.partner_state.address
+
+    node_state.channelids_to_tokennetworkids[channel_identifier] = token_network_identifier
+
+    tokennetworkids_to_channelids = node_state.partneraddresses_to_channelids.setdefault(
+        partner_address,
+        dict(),
+    )
+    tokennetworkids_to_channelids[token_network_identifier] = channel_identifier
+
+
+def index_token_network(node_state, payment_network_identifier, token_network_state):
+    """ Add the token network and its channels to the lookup indexes of the
+    node state.
+    """
+    token_network_identifier = token_network_state.address
+    node_state.tokennetworkids_to_paymentnetworkids[token_network_identifier] = (
+        payment_network_identifier
+    )
+
+    for channel_identifier in token_network_state.channelidentifiers_to_channels:
+        node_state.channelids_to_tokennetworkids[channel_identifier] = token_network_identifier
+
+        # The token networks of the startup sync may have channels which are
+        # closed already and must be settled
+        schedule_channel(node_state, token_network_identifier, channel_identifier)
+
+    # a partner has at most one channel per token network, this is the one
+    # used by the token network
+    for channel_state in token_network_state.partneraddresses_to_channels.values():
+        index_channel(node_state, token_network_identifier, channel_state)
+
+
+def unindex_token_network(node_state, token_network_state):
+    """ Remove the token network and its channels from the lookup indexes of
+    the node state.
+    """
+    token_network_identifier = token_network_state.address
+    node_state.tokennetworkids_to_paymentnetworkids.pop(token_network_identifier, None)
+
+    for channel_identifier in token_network_state.channelidentifiers_to_channels:
+        node_state.channelids_to_tokennetworkids.pop(channel_identifier, None)
+
+    for partner_address in token_network_state.partneraddresses_to_channels:
+        tokennetworkids_to_channelids = node_state.partneraddresses_to_channelids.get(
+            partner_address,
+        )
+
+        if tokennetworkids_to_channelids is not None:
+            tokennetworkids_to_channelids.pop(token_network_identifier, None)
+
+            if not tokennetworkids_to_channelids:
+                del node_state.partneraddresses_to_channelids[partner_address]
+
+
+def remove_channel(node_state, token_network_identifier, channel_identifier):
+    """ Remove the channel from its token network and from the lookup indexes
+    of the node state.
+    """
+    node_state.channelids_to_tokennetworkids.pop(channel_identifier, None)
+
+    token_network_state = views.get_token_network_by_identifier(
+        node_state,
+        token_network_identifier,
+    )
+    if token_network_state is None:
+        return
+
+    ids_to_channels = token_network_state.channelidentifiers_to_channels
+    channel_state = ids_to_channels.pop(channel_identifier, None)
+    if channel_state is None:
+        return
+
+    partner_address = channel_state.partner_state.address
+    if token_network_state.partneraddresses_to_channels.get(partner_address) is channel_state:
+        del token_network_state.partneraddresses_to_channels[partner_address]
+
+        tokennetworkids_to_channelids = node_state.partneraddresses_to_channelids[
+            partner_address
+        ]
+        tokennetworkids_to_channelids.pop(token_network_identifier, None)
+
+        if not tokennetworkids_to_channelids:
+            del node_state.partneraddresses_to_channelids[partner_address]
+
+
+def get_prunable_substates(node_state, block_number):
+    """ Return the list of (kind, key, state) which reached a final state at
+    or before `block_number`, these are removed by ActionPruneState.
+    """
+    prunable = list()
+
+    for (kind, key), finalized_block in node_state.keys_to_finalized_blocks.items():
+        if finalized_block > block_number:
+            continue
+
+        if kind == DEADLINE_PAYMENT:
+            substate = node_state.payment_mapping.secrethashes_to_task.get(key)
+        else:
+            substate = views.get_channelstate_by_token_network_identifier(
+                node_state,
+                key[0],
+                key[1],
+            )
+
+        if substate is not None:
+            prunable.append((kind, key, substate))
+
+    return prunable
+
+
 def maybe_add_tokennetwork(node_state, payment_network_identifier, token_network_state):
     token_network_identifier = token_network_state.address
     token_address = token_network_state.token_address
@@ -359,6 +586,8 @@ def maybe_add_tokennetwork(node_state, payment_network_identifier, token_network
         ids_to_tokens[token_network_identifier] = token_network_state
         addrs_to_tokens[token_address] = token_network_state
 
+        index_token_network(node_state, payment_network_identifier, token_network_state)
+
 
 def sanity_check(iteration):
     assert isinstance(iteration.new_state, NodeState)
@@ -368,17 +597,19 @@ def handle_block(node_state, state_change):
     block_number = state_change.block_number
     node_state.block_number = block_number
 
-    # Subdispatch Block state change
-    channels_result = subdispatch_to_all_channels(
-        node_state,
-        state_change,
-        block_number,
-    )
-    transfers_result = subdispatch_to_all_lockedtransfers(
-        node_state,
-        state_change,
-    )
-    events = channels_result.events + transfers_result.events
+    # Subdispatch Block state change only to the channels and payment tasks
+    # with a deadline, for everything else a Block is a no-op
+    channel_events = list()
+    transfer_events = list()
+    for kind, key in pop_due_block_deadlines(node_state, block_number):
+        if kind == DEADLINE_CHANNEL:
+            result = subdispatch_to_channel_by_deadline(node_state, state_change, key)
+            channel_events.extend(result.events)
+        else:
+            result = subdispatch_to_paymenttask(node_state, state_change, key)
+            transfer_events.extend(result.events)
+
+    events = channel_events + transfer_events
     return TransitionResult(node_state, events)
 
 
@@ -420,23 +651,142 @@ def handle_token_network_action(node_state, state_change):
                 token_network_state.address
             ]
 
+            unindex_token_network(node_state, token_network_state)
+
         events = iteration.events
 
     return TransitionResult(node_state, events)
 
 
-def handle_delivered(node_state, state_change):
-    # TODO: improve the complexity of this algorithm
-    for queueid, queue in node_state.queueids_to_queues.items():
-        if queueid[1] == 'global':
-            remove = []
+def handle_channel_action(node_state, state_change, channel_identifier):
+    """ Dispatch a state change that may change the deadlines of the channel
+    with `channel_identifier`.
+    """
+    iteration = handle_token_network_action(node_state, state_change)
+
+    schedule_channel(
+        node_state,
+        state_change.token_network_identifier,
+        channel_identifier,
+    )
+
+    return iteration
+
+
+def handle_channel_new(node_state, state_change):
+    token_network_identifier = state_change.token_network_identifier
+    channel_state = state_change.channel_state
+
+    iteration = handle_channel_action(
+        node_state,
+        state_change,
+        channel_state.identifier,
+    )
+
+    token_network_state = views.get_token_network_by_identifier(
+        node_state,
+        token_network_identifier,
+    )
+    if token_network_state:
+        index_channel(node_state, token_network_identifier, channel_state)
+
+    return iteration
+
+
+def handle_channel_closed(node_state, state_change):
+    return handle_channel_action(
+        node_state,
+        state_change,
+        state_change.channel_identifier,
+    )
+
+
+def handle_channel_new_balance(node_state, state_change):
+    return handle_channel_action(
+        node_state,
+        state_change,
+        state_change.channel_identifier,
+    )
+
+
+def handle_channel_settled(node_state, state_change):
+    return handle_channel_action(
+        node_state,
+        state_change,
+        state_change.channel_identifier,
+    )
+
+
+def handle_prune_state(node_state, state_change):
+    finalized = [
+        entry
+        for entry, finalized_block in node_state.keys_to_finalized_blocks.items()
+        if finalized_block <= state_change.block_number
+    ]
+
+    for kind, key in finalized:
+        del node_state.keys_to_finalized_blocks[(kind, key)]
+        schedule_block_deadline(node_state, kind, key, None)
+
+        if kind == DEADLINE_PAYMENT:
+            node_state.payment_mapping.secrethashes_to_task.pop(key, None)
+        else:
+            token_network_identifier, channel_identifier = key
+            remove_channel(node_state, token_network_identifier, channel_identifier)
+
+    return TransitionResult(node_state, list())
+
+
+def enqueue_message(node_state, event):
+    queueid = (event.recipient, event.queue_name)
+    queue = node_state.queueids_to_queues.setdefault(queueid, [])
+    queue.append(event)
+
+    queueids = node_state.messageids_to_queueids.setdefault(event.message_identifier, [])
+    queueids.append(queueid)
 
+
+def remove_message(node_state, message_identifier, queue_name=None):
+    """ Remove the messages with `message_identifier` from the queues, if
+    `queue_name` is given only the queues with that name are cleared.
+    """
+    queueids = node_state.messageids_to_queueids.get(message_identifier)
+
+    if queueids is None:
+        return
+
+    remaining_queueids = list()
+    for queueid in queueids:
+        if queue_name is not None and queueid[1] != queue_name:
+            remaining_queueids.append(queueid)
+            continue
+
+        queue = node_state.queueids_to_queues[queueid]
+
+        # Messages are acknowledged in order, so the message is usually at
+        # the head of the queue
+        if queue[0].message_identifier == message_identifier:
+            del queue[0]
+        else:
             for pos, message in enumerate(queue):
-                if message.message_identifier == state_change.message_identifier:
-                    remove.append(pos)
+                if message.message_identifier == message_identifier:
+                    del queue[pos]
+                    break
+
+    if remaining_queueids:
+        node_state.messageids_to_queueids[message_identifier] = remaining_queueids
+    else:
+        del node_state.messageids_to_queueids[message_identifier]
 
-            for removepos in reversed(remove):
-                queue.pop(removepos)
+
+def handle_delivered(node_state, state_change):
+    remove_message(node_state, state_change.message_identifier, b'global')
+    return TransitionResult(node_state, [])
+
+
+def handle_delivered_batch(node_state, state_change):
+    for message_identifier in state_change.message_identifiers:
+        remove_message(node_state, message_identifier, b'global')
 
     return TransitionResult(node_state, [])
 
@@ -465,7 +815,7 @@ def handle_node_change_network_state(node_state, state_change):
     return TransitionResult(node_state, events)
 
 
-def handle_leave_all_networks(node_state):
+def handle_leave_all_networks(node_state, state_change):  # pylint: disable=unused-argument
     events = list()
 
     for payment_network_state in node_state.identifiers_to_paymentnetworks.values():
@@ -487,6 +837,9 @@ def handle_new_payment_network(node_state, state_change):
     if payment_network_identifier not in node_state.identifiers_to_paymentnetworks:
         node_state.identifiers_to_paymentnetworks[payment_network_identifier] = payment_network
 
+        for token_network_state in payment_network.tokenidentifiers_to_tokennetworks.values():
+            index_token_network(node_state, payment_network_identifier, token_network_state)
+
     return TransitionResult(node_state, events)
 
 
@@ -523,6 +876,12 @@ def handle_channel_unlock(node_state, state_change):
 
         if sub_iteration.new_state is None:
             del payment_network_state.tokenaddresses_to_tokennetworks[token_address]
+        else:
+            schedule_channel(
+                node_state,
+                token_network_state.address,
+                state_change.channel_identifier,
+            )
 
     # second emulate a secret reveal, to register the secret with all the other
     # channels and proceed with the protocol
@@ -611,17 +970,7 @@ def handle_receive_secret_reveal(node_state, state_change):
 
 
 def handle_processed(node_state, state_change):
-    # TODO: improve the complexity of this algorithm
-    for queue in node_state.queueids_to_queues.values():
-        remove = []
-
-        for pos, message in enumerate(queue):
-            if message.message_identifier == state_change.message_identifier:
-                remove.append(pos)
-
-        for removepos in reversed(remove):
-            queue.pop(removepos)
-
+    remove_message(node_state, state_change.message_identifier)
     return TransitionResult(node_state, [])
 
 
@@ -630,150 +979,153 @@ def handle_receive_unlock(node_state, state_change):
     return subdispatch_to_paymenttask(node_state, state_change, secrethash)
 
 
+# State changes routed to the token network in the `token_network_identifier`
+TOKEN_NETWORK_STATE_CHANGES = (
+    ActionChannelClose,
+    ActionTransferDirect,
+    ContractReceiveChannelClosed,
+    ContractReceiveChannelNew,
+    ContractReceiveChannelNewBalance,
+    ContractReceiveChannelSettled,
+    ContractReceiveRouteNew,
+    ReceiveTransferDirect,
+)
+
+# State changes routed to the payment task of the secrethash
+PAYMENT_TASK_STATE_CHANGES = (
+    ReceiveSecretRequest,
+    ReceiveSecretReveal,
+    ReceiveTransferRefund,
+    ReceiveTransferRefundCancelRoute,
+    ReceiveUnlock,
+)
+
+# State changes which only modify node-level state
+NODE_QUEUE_STATE_CHANGES = (
+    ActionChangeNodeNetworkState,
+    ReceiveDelivered,
+    ReceiveDeliveredBatch,
+    ReceiveProcessed,
+)
+
+
+def get_affected_token_networks(node_state, state_change):
+    """ Return the identifiers of the token networks, and their payment
+    tasks, that may be modified by the state change.
+
+    None is returned for the state changes that are broadcast to the whole
+    node, e.g. Block.
+    """
+    # pylint: disable=unidiomatic-typecheck
+    state_change_type = type(state_change)
+
+    if state_change_type in TOKEN_NETWORK_STATE_CHANGES:
+        return {state_change.token_network_identifier}
+
+    if state_change_type in NODE_QUEUE_STATE_CHANGES:
+        return set()
+
+    if state_change_type == ActionInitInitiator:
+        return {state_change.transfer.token_network_identifier}
+
+    if state_change_type == ActionInitMediator:
+        return {state_change.from_transfer.balance_proof.token_network_identifier}
+
+    if state_change_type == ActionInitTarget:
+        return {state_change.transfer.balance_proof.token_network_identifier}
+
+    if state_change_type in PAYMENT_TASK_STATE_CHANGES:
+        if state_change_type in (ReceiveTransferRefund, ReceiveTransferRefundCancelRoute):
+            secrethash = state_change.transfer.lock.secrethash
+        else:
+            secrethash = state_change.secrethash
+
+        sub_task = node_state.payment_mapping.secrethashes_to_task.get(secrethash)
+        if sub_task is None:
+            return set()
+
+        return {sub_task.token_network_identifier}
+
+    return None
+
+
+def get_unchanged_substates(node_state, state_change):
+    """ Return the token networks and payment tasks that are not modified by
+    the state change.
+
+    Each token network, with its channels and payment tasks, is a shard of
+    the node state. Used by the StateManager to copy only the shard that a
+    state change is routed to.
+    """
+    affected = get_affected_token_networks(node_state, state_change)
+
+    if affected is None:
+        return list()
+
+    unchanged = list()
+    for payment_network_state in node_state.identifiers_to_paymentnetworks.values():
+        token_networks = payment_network_state.tokenidentifiers_to_tokennetworks.values()
+
+        for token_network_state in token_networks:
+            if token_network_state.address not in affected:
+                unchanged.append(token_network_state)
+
+    for sub_task in node_state.payment_mapping.secrethashes_to_task.values():
+        if sub_task.token_network_identifier not in affected:
+            unchanged.append(sub_task)
+
+    return unchanged
+
+
+NODE_STATE_TRANSITIONS = DispatchTable('node')
+NODE_STATE_TRANSITIONS.register(Block, handle_block)
+NODE_STATE_TRANSITIONS.register(ActionInitNode, handle_node_init)
+NODE_STATE_TRANSITIONS.register(ActionNewTokenNetwork, handle_new_token_network)
+NODE_STATE_TRANSITIONS.register(ActionChannelClose, handle_token_network_action)
+NODE_STATE_TRANSITIONS.register(
+    ActionChangeNodeNetworkState,
+    handle_node_change_network_state,
+)
+NODE_STATE_TRANSITIONS.register(ActionTransferDirect, handle_token_network_action)
+NODE_STATE_TRANSITIONS.register(ActionLeaveAllNetworks, handle_leave_all_networks)
+NODE_STATE_TRANSITIONS.register(ActionPruneState, handle_prune_state)
+NODE_STATE_TRANSITIONS.register(ActionInitInitiator, handle_init_initiator)
+NODE_STATE_TRANSITIONS.register(ActionInitMediator, handle_init_mediator)
+NODE_STATE_TRANSITIONS.register(ActionInitTarget, handle_init_target)
+NODE_STATE_TRANSITIONS.register(ContractReceiveNewPaymentNetwork, handle_new_payment_network)
+NODE_STATE_TRANSITIONS.register(ContractReceiveNewTokenNetwork, handle_tokenadded)
+NODE_STATE_TRANSITIONS.register(ContractReceiveChannelUnlock, handle_channel_unlock)
+NODE_STATE_TRANSITIONS.register(ContractReceiveChannelNew, handle_channel_new)
+NODE_STATE_TRANSITIONS.register(ContractReceiveChannelClosed, handle_channel_closed)
+NODE_STATE_TRANSITIONS.register(ContractReceiveChannelNewBalance, handle_channel_new_balance)
+NODE_STATE_TRANSITIONS.register(ContractReceiveChannelSettled, handle_channel_settled)
+NODE_STATE_TRANSITIONS.register(ContractReceiveRouteNew, handle_token_network_action)
+NODE_STATE_TRANSITIONS.register(ReceiveDelivered, handle_delivered)
+NODE_STATE_TRANSITIONS.register(ReceiveDeliveredBatch, handle_delivered_batch)
+NODE_STATE_TRANSITIONS.register(ReceiveTransferDirect, handle_token_network_action)
+NODE_STATE_TRANSITIONS.register(ReceiveSecretReveal, handle_secret_reveal)
+NODE_STATE_TRANSITIONS.register(
+    ReceiveTransferRefundCancelRoute,
+    handle_receive_transfer_refund_cancel_route,
+)
+NODE_STATE_TRANSITIONS.register(ReceiveTransferRefund, handle_receive_transfer_refund)
+NODE_STATE_TRANSITIONS.register(ReceiveSecretRequest, handle_receive_secret_request)
+NODE_STATE_TRANSITIONS.register(ReceiveProcessed, handle_processed)
+NODE_STATE_TRANSITIONS.register(ReceiveUnlock, handle_receive_unlock)
+
+
 def state_transition(node_state, state_change):
-    # pylint: disable=too-many-branches,unidiomatic-typecheck
+    handler = NODE_STATE_TRANSITIONS.get(type(state_change))
 
-    if type(state_change) == Block:
-        iteration = handle_block(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionInitNode:
-        iteration = handle_node_init(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionNewTokenNetwork:
-        iteration = handle_new_token_network(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionChannelClose:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionChangeNodeNetworkState:
-        iteration = handle_node_change_network_state(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionTransferDirect:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionLeaveAllNetworks:
-        iteration = handle_leave_all_networks(
-            node_state,
-        )
-    elif type(state_change) == ActionInitInitiator:
-        iteration = handle_init_initiator(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionInitMediator:
-        iteration = handle_init_mediator(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ActionInitTarget:
-        iteration = handle_init_target(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveNewPaymentNetwork:
-        iteration = handle_new_payment_network(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveNewTokenNetwork:
-        iteration = handle_tokenadded(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveChannelUnlock:
-        iteration = handle_channel_unlock(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveChannelNew:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveChannelClosed:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveChannelNewBalance:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveChannelSettled:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveRouteNew:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveDelivered:
-        iteration = handle_delivered(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveTransferDirect:
-        iteration = handle_token_network_action(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveSecretReveal:
-        iteration = handle_secret_reveal(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveTransferRefundCancelRoute:
-        iteration = handle_receive_transfer_refund_cancel_route(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveTransferRefund:
-        iteration = handle_receive_transfer_refund(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveSecretRequest:
-        iteration = handle_receive_secret_request(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveSecretReveal:
-        iteration = handle_receive_secret_reveal(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveProcessed:
-        iteration = handle_processed(
-            node_state,
-            state_change,
-        )
-    elif type(state_change) == ReceiveUnlock:
-        iteration = handle_receive_unlock(
-            node_state,
-            state_change,
-        )
+    if handler is not None:
+        iteration = handler(node_state, state_change)
+    else:
+        iteration = TransitionResult(node_state, list())
 
     sanity_check(iteration)
 
     for event in iteration.events:
         if isinstance(event, SendMessageEvent):
-            queueid = (event.recipient, event.queue_name)
-            queue = node_state.queueids_to_queues.setdefault(queueid, [])
-            queue.append(event)
+            enqueue_message(node_state, event)
 
     return iteration
@@ -13,6 +13,7 @@ from raiden.transfer.architecture import State
 from raiden.transfer.merkle_tree import merkleroot
 from raiden.transfer.balance_proof import hash_balance_data
 from raiden.utils import lpex, pex, sha3, typing
+from raiden.utils.interning import intern_address, intern_hash
 
 SecretHashToLock = typing.Dict[typing.SecretHash, 'HashTimeLockState']
 SecretHashToPartialUnlockProof = typing.Dict[typing.SecretHash, 'UnlockPartialProofState']
@@ -83,9 +84,16 @@ class NodeState(State):
 
     __slots__ = (
         'queueids_to_queues',
+        'messageids_to_queueids',
+        'block_deadlines',
+        'keys_to_block_deadlines',
+        'keys_to_finalized_blocks',
         'pseudo_random_generator',
         'block_number',
         'identifiers_to_paymentnetworks',
+        'tokennetworkids_to_paymentnetworkids',
+        'channelids_to_tokennetworkids',
+        'partneraddresses_to_channelids',
         'nodeaddresses_to_networkstates',
         'payment_mapping',
     )
@@ -97,7 +105,25 @@ class NodeState(State):
         self.pseudo_random_generator = pseudo_random_generator
         self.block_number = block_number
         self.queueids_to_queues = dict()
+        # Index used to find the queues of a message in constant time, there
+        # is one queueid for each queued message with the given identifier
+        self.messageids_to_queueids = dict()
+        # Priority queue of (block_number, kind, key) used to dispatch a Block
+        # only to the channels and payment tasks that have work to do, the
+        # dictionary has the current deadline of each key, entries in the heap
+        # with a different block number are stale and ignored
+        self.block_deadlines = list()
+        self.keys_to_block_deadlines = dict()
+        # The block at which each (kind, key) reached a final state, these
+        # are removed from the live state by ActionPruneState
+        self.keys_to_finalized_blocks = dict()
         self.identifiers_to_paymentnetworks = dict()
+        # Indexes used by the views for constant time lookups, these store
+        # only identifiers, the states are kept in the payment networks. The
+        # partner index maps to a dictionary token_network_id -> channel_id
+        self.tokennetworkids_to_paymentnetworkids = dict()
+        self.channelids_to_tokennetworkids = dict()
+        self.partneraddresses_to_channelids = dict()
         self.nodeaddresses_to_networkstates = dict()
         self.payment_mapping = PaymentMappingState()
 
@@ -114,7 +140,15 @@ class NodeState(State):
             self.pseudo_random_generator == other.pseudo_random_generator and
             self.block_number == other.block_number and
             self.queueids_to_queues == other.queueids_to_queues and
+            self.messageids_to_queueids == other.messageids_to_queueids and
+            self.block_deadlines == other.block_deadlines and
+            self.keys_to_block_deadlines == other.keys_to_block_deadlines and
+            self.keys_to_finalized_blocks == other.keys_to_finalized_blocks and
             self.identifiers_to_paymentnetworks == other.identifiers_to_paymentnetworks and
+            self.tokennetworkids_to_paymentnetworkids ==
+            other.tokennetworkids_to_paymentnetworkids and
+            self.channelids_to_tokennetworkids == other.channelids_to_tokennetworkids and
+            self.partneraddresses_to_channelids == other.partneraddresses_to_channelids and
             self.nodeaddresses_to_networkstates == other.nodeaddresses_to_networkstates and
             self.payment_mapping == other.payment_mapping
         )
@@ -140,7 +174,7 @@ class PaymentNetworkState(State):
         if not isinstance(address, typing.T_Address):
             raise ValueError('address must be an address instance')
 
-        self.address = address
+        self.address = intern_address(address)
         self.tokenidentifiers_to_tokennetworks = {
             token_network.address: token_network
             for token_network in token_network_list
@@ -192,8 +226,8 @@ class TokenNetworkState(State):
         if not isinstance(network_graph, TokenNetworkGraphState):
             raise ValueError('network_graph must be a TokenNetworkGraphState instance')
 
-        self.address = address
-        self.token_address = token_address
+        self.address = intern_address(address)
+        self.token_address = intern_address(token_address)
         self.network_graph = network_graph
 
         self.channelidentifiers_to_channels = {
@@ -323,8 +357,8 @@ class RouteState(State):
         if not isinstance(node_address, typing.T_Address):
             raise ValueError('node_address must be an address instance')
 
-        self.node_address = node_address
-        self.channel_identifier = channel_identifier
+        self.node_address = intern_address(node_address)
+        self.channel_identifier = intern_address(channel_identifier)
 
     def __repr__(self):
         return '<RouteState hop:{node} channel:{channel}>'.format(
@@ -353,6 +387,7 @@ class BalanceProofUnsignedState(State):
         'locksroot',
         'token_network_identifier',
         'channel_address',
+        '_balance_hash',
     )
 
     def __init__(
@@ -401,8 +436,9 @@ class BalanceProofUnsignedState(State):
         self.transferred_amount = transferred_amount
         self.locked_amount = locked_amount
         self.locksroot = locksroot
-        self.token_network_identifier = token_network_identifier
-        self.channel_address = channel_address
+        self.token_network_identifier = intern_address(token_network_identifier)
+        self.channel_address = intern_address(channel_address)
+        self._balance_hash = None
 
     def __repr__(self):
         return (
@@ -435,11 +471,16 @@ class BalanceProofUnsignedState(State):
 
     @property
     def balance_hash(self):
-        return hash_balance_data(
-            transferred_amount=self.transferred_amount,
-            locked_amount=self.locked_amount,
-            locksroot=self.locksroot,
-        )
+        # The balance proof is not modified after construction, the hash is
+        # computed once on the first use
+        if self._balance_hash is None:
+            self._balance_hash = hash_balance_data(
+                transferred_amount=self.transferred_amount,
+                locked_amount=self.locked_amount,
+                locksroot=self.locksroot,
+            )
+
+        return self._balance_hash
 
 
 class BalanceProofSignedState(State):
@@ -457,6 +498,7 @@ class BalanceProofSignedState(State):
         'message_hash',
         'signature',
         'sender',
+        '_balance_hash',
     )
 
     def __init__(
@@ -526,11 +568,12 @@ class BalanceProofSignedState(State):
         self.transferred_amount = transferred_amount
         self.locked_amount = locked_amount
         self.locksroot = locksroot
-        self.token_network_identifier = token_network_identifier
-        self.channel_address = channel_address
+        self.token_network_identifier = intern_address(token_network_identifier)
+        self.channel_address = intern_address(channel_address)
         self.message_hash = message_hash
         self.signature = signature
-        self.sender = sender
+        self.sender = intern_address(sender)
+        self._balance_hash = None
 
     def __repr__(self):
         return (
@@ -570,11 +613,16 @@ class BalanceProofSignedState(State):
 
     @property
     def balance_hash(self):
-        return hash_balance_data(
-            transferred_amount=self.transferred_amount,
-            locked_amount=self.locked_amount,
-            locksroot=self.locksroot,
-        )
+        # The balance proof is not modified after construction, the hash is
+        # computed once on the first use
+        if self._balance_hash is None:
+            self._balance_hash = hash_balance_data(
+                transferred_amount=self.transferred_amount,
+                locked_amount=self.locked_amount,
+                locksroot=self.locksroot,
+            )
+
+        return self._balance_hash
 
 
 class HashTimeLockState(State):
@@ -611,7 +659,7 @@ class HashTimeLockState(State):
 
         self.amount = amount
         self.expiration = expiration
-        self.secrethash = secrethash
+        self.secrethash = intern_hash(secrethash)
         self.encoded = encoded
         self.lockhash: typing.LockHash = typing.LockHash(sha3(encoded))
 
@@ -797,6 +845,8 @@ class NettingChannelEndState(State):
         'contract_balance',
         'secrethashes_to_lockedlocks',
         'secrethashes_to_unlockedlocks',
+        'locked_amount',
+        'unlocked_amount',
         'merkletree',
         'balance_proof',
     )
@@ -808,11 +858,18 @@ class NettingChannelEndState(State):
         if not isinstance(balance, typing.T_TokenAmount):
             raise ValueError('balance must be a token_amount isinstance')
 
-        self.address = address
+        self.address = intern_address(address)
         self.contract_balance = balance
 
         self.secrethashes_to_lockedlocks: SecretHashToLock = dict()
         self.secrethashes_to_unlockedlocks: SecretHashToPartialUnlockProof = dict()
+
+        # Running totals of the amounts in secrethashes_to_lockedlocks and
+        # secrethashes_to_unlockedlocks, these are used by the balance checks
+        # and must be updated together with the mappings
+        self.locked_amount: typing.TokenAmount = 0
+        self.unlocked_amount: typing.TokenAmount = 0
+
         self.merkletree = EMPTY_MERKLE_TREE
         self.balance_proof: typing.Optional[BalanceProofSignedState] = None
 
@@ -902,9 +959,9 @@ class NettingChannelState(State):
                 'settle_transaction must be a TransactionExecutionStatus instance or None',
             )
 
-        self.identifier = identifier
-        self.token_address = token_address
-        self.token_network_identifier = token_network_identifier
+        self.identifier = intern_address(identifier)
+        self.token_address = intern_address(token_address)
+        self.token_network_identifier = intern_address(token_network_identifier)
         self.reveal_timeout = reveal_timeout
         self.settle_timeout = settle_timeout
         self.our_state = our_state
@@ -958,7 +1015,7 @@ class TransactionChannelNewBalance(State):
         if not isinstance(deposit_block_number, typing.T_BlockNumber):
             raise ValueError('deposit_block_number must be of type block_number')
 
-        self.participant_address = participant_address
+        self.participant_address = intern_address(participant_address)
         self.contract_balance = contract_balance
         self.deposit_block_number = deposit_block_number
 
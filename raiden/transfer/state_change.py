@@ -371,6 +371,30 @@ class ActionLeaveAllNetworks(StateChange):
         return not self.__eq__(other)
 
 
+class ActionPruneState(StateChange):
+    """ Remove the payment tasks and channels which reached a final state at
+    or before `block_number` from the node state.
+    """
+
+    def __init__(self, block_number: typing.BlockNumber):
+        if not isinstance(block_number, int):
+            raise ValueError('block_number must be int')
+
+        self.block_number = block_number
+
+    def __repr__(self):
+        return '<ActionPruneState block_number:{}>'.format(self.block_number)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ActionPruneState) and
+            self.block_number == other.block_number
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
 class ActionChangeNodeNetworkState(StateChange):
     """ The network state of `node_address` changed. """
 
@@ -736,6 +760,11 @@ class ReceiveDelivered(StateChange):
         self.message_identifier = message_identifier
 
 
+class ReceiveDeliveredBatch(StateChange):
+    def __init__(self, message_identifiers: typing.List[typing.MessageID]):
+        self.message_identifiers = message_identifiers
+
+
 class ReceiveProcessed(StateChange):
     def __init__(self, message_identifier: typing.MessageID):
         self.message_identifier = message_identifier
@@ -12,6 +12,7 @@ from raiden.transfer.state_change import (
     ContractReceiveRouteNew,
     ReceiveTransferDirect,
 )
+from raiden.utils.dispatch import DispatchTable
 
 
 def maybe_update_subtask(new_state, secrethash, secrethashes_to_states):
@@ -203,67 +204,39 @@ def handle_receive_transfer_refund(
     return TransitionResult(token_network_state, events)
 
 
+# All the handlers are called with the arguments
+# (token_network_state, state_change, pseudo_random_generator, block_number)
+TOKEN_NETWORK_STATE_TRANSITIONS = DispatchTable('token_network')
+TOKEN_NETWORK_STATE_TRANSITIONS.register(ActionChannelClose, handle_channel_close)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(
+    ContractReceiveChannelNew,
+    lambda state, change, prng, block: handle_channelnew(state, change),
+)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(ContractReceiveChannelNewBalance, handle_balance)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(ContractReceiveChannelClosed, handle_closed)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(ContractReceiveChannelSettled, handle_settled)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(
+    ContractReceiveRouteNew,
+    lambda state, change, prng, block: handle_newroute(state, change),
+)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(ActionTransferDirect, handle_action_transfer_direct)
+TOKEN_NETWORK_STATE_TRANSITIONS.register(ReceiveTransferDirect, handle_receive_transfer_direct)
+
+
 def state_transition(
         token_network_state,
         state_change,
         pseudo_random_generator,
         block_number,
 ):
-    # pylint: disable=too-many-branches,unidiomatic-typecheck
+    handler = TOKEN_NETWORK_STATE_TRANSITIONS.get(type(state_change))
 
-    if type(state_change) == ActionChannelClose:
-        iteration = handle_channel_close(
-            token_network_state,
-            state_change,
-            pseudo_random_generator,
-            block_number,
-        )
-    elif type(state_change) == ContractReceiveChannelNew:
-        iteration = handle_channelnew(
-            token_network_state,
-            state_change,
-        )
-    elif type(state_change) == ContractReceiveChannelNewBalance:
-        iteration = handle_balance(
-            token_network_state,
-            state_change,
-            pseudo_random_generator,
-            block_number,
-        )
-    elif type(state_change) == ContractReceiveChannelClosed:
-        iteration = handle_closed(
-            token_network_state,
-            state_change,
-            pseudo_random_generator,
-            block_number,
-        )
-    elif type(state_change) == ContractReceiveChannelSettled:
-        iteration = handle_settled(
-            token_network_state,
-            state_change,
-            pseudo_random_generator,
-            block_number,
-        )
-    elif type(state_change) == ContractReceiveRouteNew:
-        iteration = handle_newroute(
-            token_network_state,
-            state_change,
-        )
-    elif type(state_change) == ActionTransferDirect:
-        iteration = handle_action_transfer_direct(
-            token_network_state,
-            state_change,
-            pseudo_random_generator,
-            block_number,
-        )
-    elif type(state_change) == ReceiveTransferDirect:
-        iteration = handle_receive_transfer_direct(
-            token_network_state,
-            state_change,
-            pseudo_random_generator,
-            block_number,
-        )
-    else:
+    if handler is None:
         raise RuntimeError(state_change)
 
-    return iteration
+    return handler(
+        token_network_state,
+        state_change,
+        pseudo_random_generator,
+        block_number,
+    )
@@ -19,14 +19,7 @@ def all_neighbour_nodes(node_state: NodeState) -> typing.Set[typing.Address]:
     """ Return the identifiers for all nodes accross all payment networks which
     have a channel open with this one.
     """
-    addresses = set()
-
-    for payment_network in node_state.identifiers_to_paymentnetworks.values():
-        for token_network in payment_network.tokenidentifiers_to_tokennetworks.values():
-            for channel_state in token_network.partneraddresses_to_channels.values():
-                addresses.add(channel_state.partner_state.address)
-
-    return addresses
+    return set(node_state.partneraddresses_to_channelids.keys())
 
 
 def block_number(node_state: NodeState) -> int:
@@ -52,6 +45,37 @@ def count_token_network_channels(
     return count
 
 
+def get_state_size(node_state: NodeState) -> typing.Dict[str, int]:
+    """ Return the number of entries kept in the live node state, used to
+    report its growth over time.
+    """
+    token_networks = 0
+    channels = 0
+    pending_locks = 0
+
+    for payment_network_state in node_state.identifiers_to_paymentnetworks.values():
+        token_network_states = payment_network_state.tokenidentifiers_to_tokennetworks.values()
+
+        for token_network_state in token_network_states:
+            token_networks += 1
+
+            for channel_state in token_network_state.channelidentifiers_to_channels.values():
+                channels += 1
+
+                for end_state in (channel_state.our_state, channel_state.partner_state):
+                    pending_locks += len(end_state.secrethashes_to_lockedlocks)
+                    pending_locks += len(end_state.secrethashes_to_unlockedlocks)
+
+    return {
+        'token_networks': token_networks,
+        'channels': channels,
+        'pending_locks': pending_locks,
+        'payment_tasks': len(node_state.payment_mapping.secrethashes_to_task),
+        'queued_messages': len(node_state.messageids_to_queueids),
+        'finalized': len(node_state.keys_to_finalized_blocks),
+    }
+
+
 def state_from_raiden(raiden) -> NodeState:
     return raiden.wal.state_manager.current_state
 
@@ -204,15 +228,15 @@ def get_token_network_by_identifier(
         token_network_id: typing.TokenAddress,
 ) -> typing.Optional[TokenNetworkState]:
 
+    payment_network_id = node_state.tokennetworkids_to_paymentnetworkids.get(token_network_id)
+
     token_network_state = None
-    for payment_network_state in node_state.identifiers_to_paymentnetworks.values():
+    if payment_network_id is not None:
+        payment_network_state = node_state.identifiers_to_paymentnetworks[payment_network_id]
         token_network_state = payment_network_state.tokenidentifiers_to_tokennetworks.get(
             token_network_id,
         )
 
-        if token_network_state:
-            return token_network_state
-
     return token_network_state
 
 
@@ -417,13 +441,25 @@ def list_channelstate_for_partner(
         partner_address: typing.Address,
 ) -> typing.List[NettingChannelState]:
 
-    payment_network = node_state.identifiers_to_paymentnetworks.get(payment_network_id)
+    tokennetworkids_to_channelids = node_state.partneraddresses_to_channelids.get(
+        partner_address,
+        dict(),
+    )
 
     result = []
-    if payment_network is not None:
+    for token_network_id, channel_id in tokennetworkids_to_channelids.items():
+        is_same_payment_network = (
+            node_state.tokennetworkids_to_paymentnetworkids.get(token_network_id) ==
+            payment_network_id
+        )
+
+        if is_same_payment_network:
+            channel_state = get_channelstate_by_token_network_identifier(
+                node_state,
+                token_network_id,
+                channel_id,
+            )
 
-        for token_network in payment_network.tokenaddresses_to_tokennetworks.values():
-            channel_state = token_network.partneraddresses_to_channels.get(partner_address)
             if channel_state:
                 # TODO: Either enforce immutability or make a copy
                 result.append(channel_state)
@@ -449,16 +485,21 @@ def search_for_channel(
         channel_id: typing.ChannelID,
 ) -> NettingChannelState:
 
-    payment_network = node_state.identifiers_to_paymentnetworks.get(payment_network_id)
+    token_network_id = node_state.channelids_to_tokennetworkids.get(channel_id)
 
     result = None
-    if payment_network is not None:
-        for token_network in payment_network.tokenaddresses_to_tokennetworks.values():
-            channel_state = token_network.channelidentifiers_to_channels.get(channel_id)
+    if token_network_id is not None:
+        is_same_payment_network = (
+            node_state.tokennetworkids_to_paymentnetworkids.get(token_network_id) ==
+            payment_network_id
+        )
 
-            if channel_state:
-                result = channel_state
-                break
+        if is_same_payment_network:
+            result = get_channelstate_by_token_network_identifier(
+                node_state,
+                token_network_id,
+                channel_id,
+            )
 
     return result
 
@@ -468,14 +509,11 @@ def search_payment_network_by_token_network_id(
         token_network_id: typing.Address,
 ) -> typing.Optional['TokenNetworkState']:
 
-    payment_network_state = None
-    for payment_network in node_state.identifiers_to_paymentnetworks.values():
-        token_network_state = payment_network.tokenidentifiers_to_tokennetworks.get(
-            token_network_id,
-        )
+    payment_network_id = node_state.tokennetworkids_to_paymentnetworkids.get(token_network_id)
 
-        if token_network_state:
-            return payment_network_state
+    payment_network_state = None
+    if payment_network_id is not None:
+        payment_network_state = node_state.identifiers_to_paymentnetworks.get(payment_network_id)
 
     return payment_network_state
 
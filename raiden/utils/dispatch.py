@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import time
+from typing import Any, Callable, Dict, Optional
+
+# All the tables created, used to query the statistics at runtime
+DISPATCH_TABLES = list()
+
+
+class DispatchTable:
+    """ Maps the exact type of a state change or event to its handler.
+
+    All the handlers in a table must accept the same arguments. Each call is
+    counted and timed per type, the time includes the nested dispatches done
+    by the handler.
+    """
+
+    __slots__ = (
+        'name',
+        'types_to_handlers',
+        'types_to_statistics',
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self.types_to_handlers = dict()
+        # type -> [number of calls, cumulative time in seconds]
+        self.types_to_statistics = dict()
+
+        DISPATCH_TABLES.append(self)
+
+    def register(self, type_: type, handler: Callable):
+        if type_ in self.types_to_handlers:
+            raise ValueError('{} is already registered in {}'.format(type_, self.name))
+
+        statistics = [0, 0.0]
+
+        def instrumented_handler(*args):
+            start = time.perf_counter()
+            try:
+                return handler(*args)
+            finally:
+                statistics[0] += 1
+                statistics[1] += time.perf_counter() - start
+
+        self.types_to_handlers[type_] = instrumented_handler
+        self.types_to_statistics[type_] = statistics
+
+    def get(self, type_: type) -> Optional[Callable]:
+        """ Return the handler for `type_` or None if it is not registered. """
+        return self.types_to_handlers.get(type_)
+
+    def get_statistics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            type_.__name__: {'calls': calls, 'time': cumulative_time}
+            for type_, (calls, cumulative_time) in self.types_to_statistics.items()
+            if calls
+        }
+
+    def reset_statistics(self):
+        for statistics in self.types_to_statistics.values():
+            statistics[0] = 0
+            statistics[1] = 0.0
+
+
+def get_dispatch_statistics() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """ Return the number of calls and the cumulative time of the handlers for
+    each dispatch table, only the types that were dispatched are included.
+    """
+    return {
+        table.name: table.get_statistics()
+        for table in DISPATCH_TABLES
+    }
+
+
+def reset_dispatch_statistics():
+    for table in DISPATCH_TABLES:
+        table.reset_statistics()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from typing import Any, Dict
+
+ADDRESS_LENGTH = 20
+
+
+class InternTable:
+    """ Maps a bytes value to the canonical object with the same value.
+
+    The state objects keep the interned value, so that equal addresses and
+    hashes are stored once instead of once per state object, and are pickled
+    once per snapshot. Once the table is full it is cleared, this only stops
+    sharing the values interned before.
+    """
+
+    __slots__ = (
+        'name',
+        'maxsize',
+        'values',
+    )
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.values: Dict[bytes, bytes] = dict()
+
+    def intern(self, value: Any) -> Any:
+        """ Return the canonical object for `value`, values which are not
+        bytes are returned unchanged and are validated by the caller.
+        """
+        if type(value) is not bytes:
+            return value
+
+        canonical = self.values.get(value)
+
+        if canonical is None:
+            if len(self.values) >= self.maxsize:
+                self.values.clear()
+
+            self.values[value] = value
+            canonical = value
+
+        return canonical
+
+
+# Addresses are bounded by the number of nodes, tokens and channels known to
+# the node, the hashes are bounded by the number of pending payments
+ADDRESSES = InternTable('addresses', 2 ** 16)
+HASHES = InternTable('hashes', 2 ** 16)
+
+intern_address = ADDRESSES.intern
+intern_hash = HASHES.intern
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
-import gevent
 import structlog
 
+from raiden.storage.wal import (
+    TOPIC_BLOCK,
+    topic_channel,
+    topic_node,
+)
 from raiden.transfer.state import NODE_NETWORK_REACHABLE
 from raiden.transfer.state import (
     CHANNEL_STATE_SETTLED,
@@ -15,19 +19,58 @@ RaidenService = 'RaidenService'
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
+def wait_until(
+        raiden: RaidenService,
+        topics,
+        condition: typing.Callable,
+        poll_timeout: typing.NetworkTimeout = None,
+) -> None:
+    """ Block until `condition()` is true.
+
+    The condition is checked again when a state change for one of the
+    `topics` is applied, so a waiter costs nothing while the state it depends
+    on does not change. It is also checked every `poll_timeout` seconds, a
+    missed notification, e.g. while the node restarts and replaces its
+    write-ahead log, only delays the check.
+
+    Note:
+        This does not time out, use gevent.Timeout.
+    """
+    wal = None
+    subscription = None
+
+    try:
+        while True:
+            # The write-ahead log is replaced on restart, the subscription
+            # must follow it
+            if raiden.wal is not wal:
+                if subscription is not None:
+                    wal.unsubscribe(subscription)
+
+                wal = raiden.wal
+                subscription = wal.subscribe(topics)
+
+            if condition():
+                return
+
+            subscription.wait(poll_timeout)
+    finally:
+        if subscription is not None:
+            wal.unsubscribe(subscription)
+
+
 def wait_for_block(
         raiden: RaidenService,
         block_number: typing.BlockNumber,
         poll_timeout: typing.NetworkTimeout,
 ) -> None:
-    current_block_number = views.block_number(
-        views.state_from_raiden(raiden),
-    )
-    while current_block_number < block_number:
-        gevent.sleep(poll_timeout)
+    def block_reached():
         current_block_number = views.block_number(
             views.state_from_raiden(raiden),
         )
+        return current_block_number >= block_number
+
+    wait_until(raiden, [TOPIC_BLOCK], block_reached, poll_timeout)
 
 
 def wait_for_newchannel(
@@ -42,21 +85,16 @@ def wait_for_newchannel(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-        partner_address,
-    )
-
-    while channel_state is None:
-        gevent.sleep(poll_timeout)
+    def channel_registered():
         channel_state = views.get_channelstate_for(
             views.state_from_raiden(raiden),
             payment_network_id,
             token_address,
             partner_address,
         )
+        return channel_state is not None
+
+    wait_until(raiden, [topic_node(partner_address)], channel_registered, poll_timeout)
 
 
 def wait_for_participant_newbalance(
@@ -80,22 +118,59 @@ def wait_for_participant_newbalance(
     else:
         raise ValueError('target_address must be one of the channel participants')
 
-    channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-        partner_address,
-    )
-
-    while balance(channel_state) < target_balance:
-        gevent.sleep(poll_timeout)
-        channel_state = views.get_channelstate_for(
+    def get_channel_state():
+        return views.get_channelstate_for(
             views.state_from_raiden(raiden),
             payment_network_id,
             token_address,
             partner_address,
         )
 
+    channel_identifier = get_channel_state().identifier
+
+    wait_until(
+        raiden,
+        [topic_channel(channel_identifier)],
+        lambda: balance(get_channel_state()) >= target_balance,
+        poll_timeout,
+    )
+
+
+def wait_for_channels(
+        raiden: RaidenService,
+        payment_network_id: typing.PaymentNetworkID,
+        token_address: typing.TokenAddress,
+        channel_ids: typing.List[typing.ChannelID],
+        channel_is_done: typing.Callable,
+        poll_timeout: typing.NetworkTimeout = None,
+) -> None:
+    """Wait until `channel_is_done(channel_state)` is true for all the
+    channels, the state of a removed channel is None.
+
+    Note:
+        This does not time out, use gevent.Timeout.
+    """
+    pending_ids = set(channel_ids)
+
+    def all_done():
+        node_state = views.state_from_raiden(raiden)
+
+        for channel_id in list(pending_ids):
+            channel_state = views.get_channelstate_by_id(
+                node_state,
+                payment_network_id,
+                token_address,
+                channel_id,
+            )
+
+            if channel_is_done(channel_state):
+                pending_ids.remove(channel_id)
+
+        return not pending_ids
+
+    topics = [topic_channel(channel_id) for channel_id in pending_ids]
+    wait_until(raiden, topics, all_done, poll_timeout)
+
 
 def wait_for_close(
         raiden: RaidenService,
@@ -109,26 +184,20 @@ def wait_for_close(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    channel_ids = list(channel_ids)
-
-    while channel_ids:
-        first_id = channel_ids[0]
-        channel_state = views.get_channelstate_by_id(
-            views.state_from_raiden(raiden),
-            payment_network_id,
-            token_address,
-            first_id,
-        )
-
-        channel_is_settled = (
+    def channel_is_closed(channel_state):
+        return (
             channel_state is None or
             channel.get_status(channel_state) in CHANNEL_AFTER_CLOSE_STATES
         )
 
-        if channel_is_settled:
-            channel_ids.pop()
-        else:
-            gevent.sleep(poll_timeout)
+    wait_for_channels(
+        raiden,
+        payment_network_id,
+        token_address,
+        channel_ids,
+        channel_is_closed,
+        poll_timeout,
+    )
 
 
 def wait_for_settle(
@@ -146,26 +215,20 @@ def wait_for_settle(
     if not isinstance(channel_ids, list):
         raise ValueError('channel_ids must be a list')
 
-    channel_ids = list(channel_ids)
-
-    while channel_ids:
-        first_id = channel_ids[0]
-        channel_state = views.get_channelstate_by_id(
-            views.state_from_raiden(raiden),
-            payment_network_id,
-            token_address,
-            first_id,
-        )
-
-        channel_is_settled = (
+    def channel_is_settled(channel_state):
+        return (
             channel_state is None or
             channel.get_status(channel_state) == CHANNEL_STATE_SETTLED
         )
 
-        if channel_is_settled:
-            channel_ids.pop()
-        else:
-            gevent.sleep(poll_timeout)
+    wait_for_channels(
+        raiden,
+        payment_network_id,
+        token_address,
+        channel_ids,
+        channel_is_settled,
+        poll_timeout,
+    )
 
 
 def wait_for_settle_all_channels(
@@ -205,12 +268,10 @@ def wait_for_healthy(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    network_statuses = views.get_networkstatuses(
-        views.state_from_raiden(raiden),
-    )
-
-    while network_statuses.get(node_address) != NODE_NETWORK_REACHABLE:
-        gevent.sleep(poll_timeout)
+    def is_healthy():
         network_statuses = views.get_networkstatuses(
             views.state_from_raiden(raiden),
         )
+        return network_statuses.get(node_address) == NODE_NETWORK_REACHABLE
+
+    wait_until(raiden, [topic_node(node_address)], is_healthy, poll_timeout)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" Replay the state changes of a Raiden database through the node state
+machine, without network or blockchain access, and report its performance.
+
+To compare two versions of the code run the tool on each checkout with the
+same database, save the first report with --output and pass it to the
+second run with --baseline.
+"""
+import json
+import os
+import pickle
+import resource
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+
+import click
+
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.transfer import node, views
+from raiden.transfer.architecture import StateManager
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values, percent):
+    index = int(round((len(sorted_values) - 1) * percent / 100))
+    return sorted_values[index]
+
+
+def iterate_state_changes(storage, batch_size):
+    """ Yield the state changes in the order they were written, loading
+    `batch_size` at a time.
+    """
+    cursor = storage.conn.execute('SELECT MAX(identifier) FROM state_changes')
+    last_identifier = cursor.fetchone()[0] or 0
+
+    from_identifier = 1
+    while from_identifier <= last_identifier:
+        to_identifier = from_identifier + batch_size - 1
+        yield from storage.get_statechanges_by_identifier(
+            from_identifier,
+            to_identifier,
+        )
+        from_identifier = to_identifier + 1
+
+
+def get_peak_memory():
+    """ Peak resident memory of the process in bytes. """
+    # ru_maxrss is in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def sample_state_size(state_manager, count):
+    current_state = state_manager.current_state
+
+    sample = {'state_changes': count, 'pickle_bytes': 0}
+    if current_state is not None:
+        sample.update(views.get_state_size(current_state))
+        sample['pickle_bytes'] = len(pickle.dumps(current_state, 4))
+
+    return sample
+
+
+def replay(storage, copy_state, shard_state, limit, sample_interval, batch_size):
+    unchanged_substates = None
+    if shard_state:
+        unchanged_substates = node.get_unchanged_substates
+
+    state_manager = StateManager(node.state_transition, None, unchanged_substates)
+
+    if copy_state:
+        dispatch = state_manager.dispatch
+    else:
+        def dispatch(state_change):
+            iteration = node.state_transition(state_manager.current_state, state_change)
+            state_manager.current_state = iteration.new_state
+            return iteration.events
+
+    types_to_latencies = defaultdict(list)
+    state_size = list()
+    events = 0
+    count = 0
+    total_time = 0.0
+
+    for state_change in iterate_state_changes(storage, batch_size):
+        if limit is not None and count >= limit:
+            break
+
+        start = time.perf_counter()
+        events += len(dispatch(state_change))
+        elapsed = time.perf_counter() - start
+
+        total_time += elapsed
+        types_to_latencies[type(state_change).__name__].append(elapsed)
+        count += 1
+
+        if count % sample_interval == 0:
+            state_size.append(sample_state_size(state_manager, count))
+
+    if count % sample_interval != 0:
+        state_size.append(sample_state_size(state_manager, count))
+
+    per_type = dict()
+    for type_name, latencies in types_to_latencies.items():
+        latencies.sort()
+        latency = {
+            'p{}'.format(percent): percentile(latencies, percent)
+            for percent in PERCENTILES
+        }
+        latency['max'] = latencies[-1]
+        latency['total'] = sum(latencies)
+        latency['count'] = len(latencies)
+        per_type[type_name] = latency
+
+    return {
+        'state_changes': count,
+        'events': events,
+        'time': total_time,
+        'state_changes_per_second': count / total_time if total_time else 0.0,
+        'peak_memory': get_peak_memory(),
+        'per_type': per_type,
+        'state_size': state_size,
+    }
+
+
+def print_report(report, baseline):
+    def ratio(key, value, lookup):
+        if baseline is None:
+            return ''
+
+        previous = lookup(baseline)
+        if not previous or key not in previous or not previous[key]:
+            return ''
+
+        return ' ({:+.1f}%)'.format((value / previous[key] - 1) * 100)
+
+    print('state changes:  {}'.format(report['state_changes']))
+    print('events:         {}'.format(report['events']))
+    print('time:           {:.3f}s{}'.format(
+        report['time'],
+        ratio('time', report['time'], lambda r: r),
+    ))
+    print('throughput:     {:.1f} state changes/s{}'.format(
+        report['state_changes_per_second'],
+        ratio('state_changes_per_second', report['state_changes_per_second'], lambda r: r),
+    ))
+    print('peak memory:    {:.1f} MiB{}'.format(
+        report['peak_memory'] / 2 ** 20,
+        ratio('peak_memory', report['peak_memory'], lambda r: r),
+    ))
+
+    print()
+    header = '{:<40} {:>8} {:>10} {:>10} {:>10} {:>10}'
+    print(header.format('state change', 'count', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+
+    per_type = sorted(
+        report['per_type'].items(),
+        key=lambda item: item[1]['total'],
+        reverse=True,
+    )
+    for type_name, latency in per_type:
+        print('{:<40} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}{}'.format(
+            type_name,
+            latency['count'],
+            latency['p50'] * 1000,
+            latency['p90'] * 1000,
+            latency['p99'] * 1000,
+            latency['max'] * 1000,
+            ratio('p50', latency['p50'], lambda r: r['per_type'].get(type_name)),
+        ))
+
+    print()
+    header = '{:>14} {:>10} {:>10} {:>14} {:>14}'
+    print(header.format('state changes', 'channels', 'tasks', 'pending locks', 'pickle bytes'))
+    for sample in report['state_size']:
+        print(header.format(
+            sample['state_changes'],
+            sample.get('channels', 0),
+            sample.get('payment_tasks', 0),
+            sample.get('pending_locks', 0),
+            sample['pickle_bytes'],
+        ))
+
+
+@click.command()
+@click.argument('database', type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    '--copy-state/--no-copy-state',
+    default=True,
+    help='Dispatch through the StateManager, which copies the state for every state change.',
+)
+@click.option(
+    '--shard-state',
+    is_flag=True,
+    help='Copy only the token network a state change is routed to.',
+)
+@click.option('--limit', type=int, help='Replay at most this many state changes.')
+@click.option(
+    '--sample-interval',
+    default=1000,
+    show_default=True,
+    help='Number of state changes between two samples of the state size.',
+)
+@click.option(
+    '--batch-size',
+    default=1000,
+    show_default=True,
+    help='Number of state changes loaded from the database at once.',
+)
+@click.option('--output', type=click.Path(dir_okay=False), help='Save the report as json.')
+@click.option(
+    '--baseline',
+    type=click.File(),
+    help='Report saved with --output by a previous run, used for comparison.',
+)
+def main(database, copy_state, shard_state, limit, sample_interval, batch_size, output, baseline):
+    baseline_report = None
+    if baseline is not None:
+        baseline_report = json.load(baseline)
+
+    # The storage creates the missing tables, work on a copy to leave the
+    # original database untouched
+    with tempfile.TemporaryDirectory() as directory:
+        database_copy = os.path.join(directory, os.path.basename(database))
+        shutil.copyfile(database, database_copy)
+
+        storage = SQLiteStorage(database_copy, PickleSerializer())
+        report = replay(
+            storage,
+            copy_state,
+            shard_state,
+            limit,
+            sample_interval,
+            batch_size,
+        )
+
+    print_report(report, baseline_report)
+
+    if output:
+        with open(output, 'w') as handler:
+            json.dump(report, handler, indent=2)
+
+
+if __name__ == '__main__':
+    main()